@@ -0,0 +1,252 @@
+"""In-process load test: seeds a database, drives the read routes through an ASGI
+transport with N concurrent clients and reports throughput and p50/p95/p99
+latency per endpoint.
+
+    DB_SQLITE_PATH=/tmp/bench.db python -m benchmarks.load --concurrency 20 \\
+        --output results.json --baseline baseline.json
+
+The app runs against whatever the ``DB_*`` settings point at, so a local Postgres
+is used when ``DB_ENGINE`` is set; the schema is dropped and recreated either way,
+so Postgres and the default SQLite file are only seeded with ``--force``.
+Results are written as JSON; with ``--baseline`` every endpoint is compared to a
+previous run and ``--max-regression`` turns a slowdown into a non-zero exit.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.seed import SeedSize, UnsafeSeedTarget, seed
+from src.main import create_app
+from src.setting import ApiSettings
+
+type Request = tuple[str, dict[str, Any]]
+
+# ids rotate over the first ID_SPREAD rows (capped at the number of banks, the
+# smallest table) so detail routes don't hit one row
+ID_SPREAD = 100
+
+# routes include every relation unless ?expand= narrows it down
+BARE = {"expand": ""}
+
+ENDPOINTS: dict[str, Callable[[int], Request]] = {
+    "GET /bank/": lambda i: ("/bank/", BARE),
+    "GET /bank/?expand=all": lambda i: (
+        "/bank/",
+        {"expand": ["users", "employees", "offices", "atms"]},
+    ),
+    "GET /bank/{id}": lambda i: (f"/bank/{i}", {"pk": i, **BARE}),
+    "GET /bank/name/{name}": lambda i: (f"/bank/name/bank{i}", BARE),
+    "GET /bank/summary/{pk}": lambda i: (f"/bank/summary/{i}", {}),
+    "GET /bank/office/": lambda i: ("/bank/office/", BARE),
+    "GET /bank/atm/": lambda i: ("/bank/atm/", BARE),
+    "GET /employee/": lambda i: ("/employee/", BARE),
+    "GET /user/": lambda i: ("/user/", BARE),
+    "GET /user/?expand=all": lambda i: (
+        "/user/",
+        {"expand": ["banks", "credit_accounts", "payment_accounts"]},
+    ),
+    "GET /user/{id}": lambda i: (f"/user/{i}", {"pk": i, **BARE}),
+    "GET /bank/credit/account/": lambda i: ("/bank/credit/account/", BARE),
+    "GET /bank/credit/account/?expand=all": lambda i: (
+        "/bank/credit/account/",
+        {"expand": ["user", "bank", "employee", "payment_account"]},
+    ),
+    "GET /bank/credit/account/{id}": lambda i: (
+        f"/bank/credit/account/{i}",
+        {"pk": i, **BARE},
+    ),
+    "GET /bank/payment/account/": lambda i: ("/bank/payment/account/", BARE),
+}
+
+
+@dataclass(slots=True)
+class EndpointResult:
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def summarize(latencies: list[float], errors: int, seconds: float) -> EndpointResult:
+    ms = [latency * 1000 for latency in latencies]
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ms[0] if ms else 0.0
+    return EndpointResult(
+        requests=len(ms),
+        errors=errors,
+        seconds=round(seconds, 4),
+        rps=round(len(ms) / seconds, 2) if seconds else 0.0,
+        mean_ms=round(statistics.fmean(ms), 3) if ms else 0.0,
+        p50_ms=round(p50, 3),
+        p95_ms=round(p95, 3),
+        p99_ms=round(p99, 3),
+    )
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    endpoint: Callable[[int], Request],
+    requests: int,
+    concurrency: int,
+    spread: int = ID_SPREAD,
+) -> EndpointResult:
+    latencies: list[float] = []
+    errors = 0
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal errors, issued
+        while issued < requests:
+            issued += 1
+            path, params = endpoint(issued % spread + 1)
+            started = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - started)
+            if not response.is_success:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(
+    size: SeedSize,
+    names: list[str],
+    requests: int,
+    warmup: int,
+    concurrency: int,
+    force: bool = False,
+) -> dict[str, Any]:
+    app = create_app()
+    engine = await app.state.dishka_container.get(AsyncEngine)
+    await seed(engine, size, force=force)
+
+    spread = min(ID_SPREAD, size.banks)
+    results: dict[str, EndpointResult] = {}
+    # runs the app lifespan (pool warm-up) and closes the container afterwards
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for name in names:
+                endpoint = ENDPOINTS[name]
+                await drive(client, endpoint, warmup, concurrency, spread)
+                results[name] = await drive(
+                    client, endpoint, requests, concurrency, spread
+                )
+                print(format_result(name, results[name]), flush=True)
+
+    return {
+        "meta": {
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "fast_json": ApiSettings().fast_json,
+            "seed": asdict(size),
+            "requests": requests,
+            "concurrency": concurrency,
+        },
+        "results": {name: asdict(result) for name, result in results.items()},
+    }
+
+
+def format_result(name: str, result: EndpointResult) -> str:
+    return (
+        f"{name:40} {result.rps:9.1f} {result.p50_ms:8.2f} {result.p95_ms:8.2f} "
+        f"{result.p99_ms:8.2f} {result.errors:6}"
+    )
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> float:
+    """Prints the per-endpoint change against ``baseline`` and returns the worst
+    p95 regression in percent."""
+    print(f"\n{'endpoint':40} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    worst = 0.0
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:40} {'(no baseline)':>9}")
+            continue
+        deltas = {
+            key: (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+        worst = max(worst, deltas["p95_ms"])
+        print(
+            f"{name:40} {deltas['rps']:+8.1f}% {deltas['p50_ms']:+7.1f}% "
+            f"{deltas['p95_ms']:+7.1f}% {deltas['p99_ms']:+7.1f}%"
+        )
+    return worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        choices=ENDPOINTS,
+        help="endpoint to run, repeatable; all by default",
+    )
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="exit non-zero when any p95 is this many percent above the baseline",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="seed even the application database"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'endpoint':40} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} errors"
+    )
+    try:
+        current = asyncio.run(
+            run(
+                SeedSize().scaled(args.scale),
+                args.endpoint or list(ENDPOINTS),
+                args.requests,
+                args.warmup,
+                args.concurrency,
+                args.force,
+            )
+        )
+    except UnsafeSeedTarget as e:
+        parser.error(str(e))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as file:
+            worst = compare(current, json.load(file))
+        if args.max_regression is not None and worst > args.max_regression:
+            print(f"\np95 regressed by {worst:.1f}% (limit {args.max_regression}%)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Runs every GET route against a seeded database, EXPLAINs each SELECT the route
+issued and fails when one of them reads a large table with a sequential scan.
+
+    DB_SQLITE_PATH=/tmp/plans.db python -m benchmarks.query_plans --scale 1
+
+Works against SQLite (``EXPLAIN QUERY PLAN``) and Postgres (``EXPLAIN (FORMAT
+JSON)``); point the usual ``DB_*`` settings at a scratch database, the schema is
+dropped and recreated (Postgres and the default SQLite file need ``--force``). List routes are checked on the first and the second
+(cursor) page, routes with an ``expand`` parameter without and with every
+relation expanded, status filtered list routes also with the filters of
+``FILTER_PARAMS``.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import httpx
+from fastapi import FastAPI
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.seed import SeedSize, UnsafeSeedTarget, seed
+from src.main import create_app
+from src.models.base import Base
+
+# tables with fewer rows than this are cheap to scan and never flagged
+LARGE_TABLE_ROWS = 1000
+# routes that aggregate or dump whole tables by design
+FULL_SCAN_ROUTES = ("/export/", "/summary/")
+SAMPLE_PARAMS: dict[str, Any] = {"pk": 3, "id": 3, "name": "bank3", "q": "first1"}
+# status filtered variants of list routes, checked on top of the plain requests
+FILTER_PARAMS: dict[str, dict[str, Any]] = {
+    "/bank/atm/": {"bank_id": 3, "status_all": "Active,HaveMoney"},
+    "/bank/office/": {"bank_id": 3, "status_any": "AbleToPlaceAtm,CreditAvailable"},
+    "/employee/": {"status_all": "IsRemote,CanGiveLoans"},
+}
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+@dataclass(slots=True)
+class Statement:
+    sql: str
+    parameters: Any
+    plan: list[str] = field(default_factory=list)
+    scans: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RouteCheck:
+    request: str
+    status: int
+    statements: list[Statement] = field(default_factory=list)
+    next_cursor: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return any(statement.scans for statement in self.statements)
+
+
+def _expand_choices(route: APIRoute) -> tuple[str, ...]:
+    for param in route.dependant.query_params:
+        if param.name == "expand":
+            # list[Literal[...]] | None
+            (literal,) = typing.get_args(
+                typing.get_args(param.field_info.annotation)[0]
+            )
+            return tuple(name for name in typing.get_args(literal) if name)
+    return ()
+
+
+def _requests(app: FastAPI) -> Iterator[tuple[str, dict[str, Any]]]:
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        path = route.path_format
+        for param in route.dependant.path_params:
+            path = path.replace(f"{{{param.name}}}", str(SAMPLE_PARAMS[param.name]))
+        params = {
+            param.name: SAMPLE_PARAMS[param.name]
+            # including those of dataclass dependencies
+            for param in get_flat_dependant(route.dependant).query_params
+            if param.required
+        }
+        if expand := _expand_choices(route):
+            yield path, {**params, "expand": ""}
+            yield path, {**params, "expand": list(expand)}
+        else:
+            yield path, params
+        if filters := FILTER_PARAMS.get(path):
+            yield path, {**params, **filters}
+
+
+async def _table_sizes(engine: AsyncEngine) -> dict[str, int]:
+    async with engine.connect() as connection:
+        return {
+            table.name: await connection.scalar(select(func.count()).select_from(table))
+            for table in Base.metadata.sorted_tables
+        }
+
+
+def _outer_query(sql: str) -> str:
+    """``sql`` without its parenthesized parts (subqueries, function arguments)."""
+    depth, kept = 0, []
+    for char in sql:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0:
+            kept.append(char)
+    return "".join(kept)
+
+
+def _sqlite_scans(statement: Statement, rows: list[Any], large: set[str]) -> list[str]:
+    details = [row[3] for row in rows]
+    # an unsorted, unfiltered scan under LIMIT walks the table in id order and
+    # stops after LIMIT rows; with a WHERE clause it may read the whole table
+    # before finding them
+    outer = _outer_query(statement.sql)
+    bounded = (
+        " LIMIT " in outer
+        and not re.search(r"\bWHERE\b", outer)
+        and not any("USE TEMP B-TREE FOR ORDER BY" in detail for detail in details)
+    )
+    scans = []
+    for detail in details:
+        if (match := _SQLITE_SCAN.match(detail)) and match[1] in large:
+            if not bounded:
+                scans.append(match[1])
+    return scans
+
+
+def _postgres_scans(plan: dict[str, Any], large: set[str]) -> list[str]:
+    scans = []
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in large:
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        scans.extend(_postgres_scans(child, large))
+    return scans
+
+
+async def explain(engine: AsyncEngine, statement: Statement, large: set[str]) -> None:
+    async with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement.sql}", statement.parameters
+            )
+            rows = result.all()
+            statement.plan = [row[3] for row in rows]
+            statement.scans = _sqlite_scans(statement, rows, large)
+        else:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement.sql}", statement.parameters
+            )
+            document = result.scalar_one()
+            if isinstance(document, str):
+                document = json.loads(document)
+            plan = document[0]["Plan"]
+            statement.plan = [json.dumps(plan, indent=1)]
+            statement.scans = _postgres_scans(plan, large)
+
+
+async def check_route(
+    client: httpx.AsyncClient,
+    engine: AsyncEngine,
+    path: str,
+    params: dict[str, Any],
+    large: set[str],
+) -> RouteCheck:
+    captured: list[Statement] = []
+
+    def capture(conn, cursor, sql, parameters, context, executemany) -> None:
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append(Statement(sql, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await client.get(path, params=params)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    check = RouteCheck(
+        str(response.request.url.raw_path, "ascii"), response.status_code
+    )
+    if (
+        response.is_success
+        and response.headers.get("content-type", "").startswith("application/json")
+        and isinstance(body := response.json(), dict)
+    ):
+        check.next_cursor = body.get("next_cursor")
+    for statement in captured:
+        await explain(engine, statement, large)
+    check.statements = captured
+    return check
+
+
+async def run(size: SeedSize, verbose: bool, force: bool = False) -> bool:
+    app = create_app()
+    engine = await app.state.dishka_container.get(AsyncEngine)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        await seed(engine, size, force=force)
+        sizes = await _table_sizes(engine)
+        large = {name for name, rows in sizes.items() if rows >= LARGE_TABLE_ROWS}
+        print(f"large tables: {', '.join(sorted(large))}")
+
+        checks = []
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://plans"
+        ) as client:
+            for path, params in _requests(app):
+                if path.endswith(FULL_SCAN_ROUTES):
+                    continue
+                check = await check_route(client, engine, path, params, large)
+                checks.append(check)
+                if check.next_cursor:
+                    params = {**params, "cursor": check.next_cursor}
+                    checks.append(
+                        await check_route(client, engine, path, params, large)
+                    )
+    finally:
+        await app.state.dishka_container.close()
+
+    ok = True
+    for check in checks:
+        mark = "FAIL" if check.failed else "ok"
+        print(
+            f"{mark:4} {check.status} {check.request} ({len(check.statements)} queries)"
+        )
+        for statement in check.statements:
+            if statement.scans or verbose:
+                print(f"     {' '.join(statement.sql.split())[:200]}")
+                for line in statement.plan:
+                    print(f"       {line}")
+            if statement.scans:
+                print(f"     -> sequential scan on {', '.join(statement.scans)}")
+        if check.status >= 500:
+            print("     -> route failed")
+        ok = ok and not check.failed and check.status < 500
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier for the seed size"
+    )
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    parser.add_argument(
+        "--force", action="store_true", help="seed even the application database"
+    )
+    args = parser.parse_args()
+    try:
+        ok = asyncio.run(run(SeedSize().scaled(args.scale), args.verbose, args.force))
+    except UnsafeSeedTarget as e:
+        parser.error(str(e))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Fills a database with a deterministic, realistically shaped data set for the
+query-plan checks and the load benchmarks.
+
+Rows go in through Core ``executemany`` in chunks; the ORM-side defaults
+(``version``, the random ratings and balances) are filled in here.
+"""
+
+import os
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterator
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.models import models
+from src.models.base import Base
+from src.setting import DbSettings
+
+CHUNK_SIZE = 5000
+
+
+@dataclass(slots=True, frozen=True)
+class SeedSize:
+    banks: int = 200
+    offices_per_bank: int = 5
+    atms_per_office: int = 2
+    employees_per_bank: int = 10
+    users: int = 5000
+    banks_per_user: int = 2
+    credit_accounts_per_user: int = 1
+    postings_per_account: int = 2
+
+    def scaled(self, scale: float) -> "SeedSize":
+        return SeedSize(
+            banks=max(1, int(self.banks * scale)),
+            offices_per_bank=self.offices_per_bank,
+            atms_per_office=self.atms_per_office,
+            employees_per_bank=self.employees_per_bank,
+            users=max(1, int(self.users * scale)),
+            banks_per_user=self.banks_per_user,
+            credit_accounts_per_user=self.credit_accounts_per_user,
+            postings_per_account=self.postings_per_account,
+        )
+
+
+def _person(rnd: random.Random, i: int) -> dict[str, Any]:
+    return {
+        "date_of_birth": date(1960, 1, 1) + timedelta(days=rnd.randrange(15000)),
+        "first_name": f"first{i}",
+        "second_name": f"second{i}",
+        "patronymic_name": None if i % 3 else f"patronymic{i}",
+    }
+
+
+def _chunks(rows: list[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start : start + CHUNK_SIZE]
+
+
+async def _insert(
+    connection: AsyncConnection, model: type, rows: list[dict[str, Any]]
+) -> None:
+    for chunk in _chunks(rows):
+        await connection.execute(insert(model.__table__), chunk)
+
+
+class UnsafeSeedTarget(Exception):
+    pass
+
+
+def check_scratch(engine: AsyncEngine) -> None:
+    """Seeding drops every table, so it refuses the application's own SQLite
+    file (the default ``DB_SQLITE_PATH``) and any Postgres database, which
+    can't be told apart from a scratch one."""
+    url = engine.url
+    hint = "point the DB_* settings at a scratch database or pass --force"
+    if url.get_backend_name() != "sqlite":
+        raise UnsafeSeedTarget(
+            f"refusing to drop the schema of {url.render_as_string()}: {hint}"
+        )
+    path = url.database or ""
+    default = DbSettings.model_fields["sqlite_path"].default
+    if path not in ("", ":memory:") and os.path.realpath(path) == os.path.realpath(
+        default
+    ):
+        raise UnsafeSeedTarget(
+            f"refusing to drop the schema of the application database {path}: {hint}"
+        )
+
+
+async def seed(
+    engine: AsyncEngine, size: SeedSize = SeedSize(), seed: int = 0, force: bool = False
+) -> None:
+    """Recreates the schema and inserts ``size`` worth of rows. Ids are assigned
+    here, so children reference their parents without a round trip. Raises
+    ``UnsafeSeedTarget`` on the application database unless ``force``."""
+    if not force:
+        check_scratch(engine)
+    rnd = random.Random(seed)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+        banks = [
+            {
+                "id": b,
+                "version": 1,
+                "name": f"bank{b}",
+                "rating": rnd.randint(0, 100),
+            }
+            for b in range(1, size.banks + 1)
+        ]
+        await _insert(connection, models.Bank, banks)
+
+        offices, atms, employees = [], [], []
+        for bank in banks:
+            for _ in range(size.offices_per_bank):
+                office_id = len(offices) + 1
+                offices.append(
+                    {
+                        "id": office_id,
+                        "version": 1,
+                        "name": f"office{office_id}",
+                        "rental": rnd.randint(100, 10000),
+                        "bank_id": bank["id"],
+                        "status": models.BankOfficeStatus(rnd.randrange(8)),
+                    }
+                )
+                for _ in range(size.atms_per_office):
+                    atm_id = len(atms) + 1
+                    atms.append(
+                        {
+                            "id": atm_id,
+                            "version": 1,
+                            "name": f"atm{atm_id}",
+                            "amortization": rnd.randint(0, 1000),
+                            "bank_id": bank["id"],
+                            "office_id": office_id,
+                            "status": models.BankAtmStatus(rnd.randrange(16)),
+                        }
+                    )
+            for _ in range(size.employees_per_bank):
+                employee_id = len(employees) + 1
+                employees.append(
+                    {
+                        "id": employee_id,
+                        "version": 1,
+                        **_person(rnd, employee_id),
+                        "position": "clerk",
+                        "salary": rnd.randint(1000, 10000),
+                        "bank_id": bank["id"],
+                        "office_id": offices[-1 - rnd.randrange(size.offices_per_bank)][
+                            "id"
+                        ],
+                        "status": models.EmployeeStatus(rnd.randrange(4)),
+                    }
+                )
+        await _insert(connection, models.BankOffice, offices)
+        await _insert(connection, models.BankAtm, atms)
+        await _insert(connection, models.Employee, employees)
+
+        users, bank_users, payment_accounts, credit_accounts = [], [], [], []
+        for user_id in range(1, size.users + 1):
+            users.append(
+                {
+                    "id": user_id,
+                    "version": 1,
+                    **_person(rnd, user_id),
+                    "work_place": None if user_id % 5 else f"work{user_id}",
+                    "bank_credit_score": rnd.randint(0, 100),
+                    "monthly_income": round(rnd.uniform(0.0, 10000), 2),
+                }
+            )
+            for bank_id in rnd.sample(
+                range(1, size.banks + 1), min(size.banks_per_user, size.banks)
+            ):
+                bank_users.append({"user_id": user_id, "bank_id": bank_id})
+                payment_accounts.append(
+                    {
+                        "id": len(payment_accounts) + 1,
+                        "version": 1,
+                        "balance": rnd.randint(0, 100000),
+                        "user_id": user_id,
+                        "bank_id": bank_id,
+                    }
+                )
+            for _ in range(size.credit_accounts_per_user):
+                account = payment_accounts[-1]
+                start = date(2020, 1, 1) + timedelta(days=rnd.randrange(1500))
+                months = rnd.choice((12, 24, 36, 60))
+                amount = rnd.randint(1000, 1000000)
+                credit_accounts.append(
+                    {
+                        "id": len(credit_accounts) + 1,
+                        "version": 1,
+                        "loan_start_date": start,
+                        "loan_end_date": start + timedelta(days=30 * months),
+                        "load_duration_mounts": months,
+                        "loan_amount": amount,
+                        "mounthly_payment": amount // months,
+                        "interest_rate": rnd.randint(5, 25),
+                        "user_id": user_id,
+                        "bank_id": account["bank_id"],
+                        "employee_id": rnd.randint(1, len(employees)),
+                        "payment_account_id": account["id"],
+                    }
+                )
+        await _insert(connection, models.User, users)
+        await _insert(connection, models.BankUser, bank_users)
+        await _insert(connection, models.PaymentAccount, payment_accounts)
+        await _insert(connection, models.CreditAccount, credit_accounts)
+
+        # the older postings of every account are already compacted
+        postings = [
+            {
+                "payment_account_id": account["id"],
+                "amount": rnd.randint(-1000, 1000) or 1,
+                "compacted": n < size.postings_per_account - 1,
+            }
+            for n in range(size.postings_per_account)
+            for account in payment_accounts
+        ]
+        await _insert(connection, models.LedgerPosting, postings)
+
+        if connection.dialect.name == "postgresql":
+            # explicit ids don't advance the serial sequences
+            for table in Base.metadata.sorted_tables:
+                if "id" in table.c and table.c.id.autoincrement is True:
+                    await connection.execute(
+                        text(
+                            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+                            f'(SELECT coalesce(max(id), 1) FROM "{table.name}"))'
+                        )
+                    )
+
+        # fresh statistics, otherwise the planners guess from empty tables
+        await connection.execute(text("ANALYZE"))
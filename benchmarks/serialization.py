@@ -0,0 +1,130 @@
+"""Compares the default and the fast (API_FAST_JSON) response paths per list route.
+
+    python -m benchmarks.serialization --items 500 --repeat 20
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.models import models
+from src.routes import response_models
+from src.routes.serialization import ResponseRenderer
+from src.services.pagination import CursorPage
+
+
+def person(cls: type, i: int, **extra: Any) -> Any:
+    return cls(
+        date_of_birth=date(1990, 1, 1 + i % 28),
+        first_name=f"first{i}",
+        second_name=f"second{i}",
+        patronymic_name=None if i % 2 else f"patronymic{i}",
+        **extra,
+    )
+
+
+def make_bank(i: int, children: int) -> models.Bank:
+    bank = models.Bank(name=f"bank{i}")
+    bank.offices = [models.BankOffice(name=f"o{j}", rental=j) for j in range(children)]
+    bank.atms = [
+        models.BankAtm(
+            name=f"a{j}",
+            amortization=j,
+            bank_id=i,
+            office_id=j,
+            status=models.BankAtmStatus.Active,
+        )
+        for j in range(children)
+    ]
+    bank.users = [person(models.User, j, work_place=None) for j in range(children)]
+    bank.employees = [
+        person(models.Employee, j, position="clerk", salary=j) for j in range(children)
+    ]
+    return bank
+
+
+def make_credit_account(i: int) -> models.CreditAccount:
+    account = models.CreditAccount(
+        loan_start_date=date(2024, 1, 1),
+        loan_end_date=date(2026, 1, 1),
+        load_duration_mounts=24,
+        loan_amount=random.randint(1000, 100000),
+        mounthly_payment=500,
+        interest_rate=12,
+        user_id=i,
+        bank_id=i,
+        employee_id=i,
+        payment_account_id=i,
+    )
+    account.user = person(models.User, i, work_place="w")
+    account.bank = models.Bank(name=f"bank{i}")
+    account.employee = person(models.Employee, i, position="p", salary=1)
+    account.payment_account = models.PaymentAccount(balance=i, user_id=i, bank_id=i)
+    return account
+
+
+def make_user(i: int) -> models.User:
+    user = person(models.User, i, work_place="w")
+    user.banks = [models.Bank(name=f"bank{j}") for j in range(3)]
+    user.payment_accounts = [
+        models.PaymentAccount(balance=j, user_id=i, bank_id=j) for j in range(3)
+    ]
+    return user
+
+
+ROUTES: dict[str, tuple[type, Callable[[int], Any]]] = {
+    "GET /bank/": (response_models.BankDetail, lambda i: make_bank(i, 5)),
+    "GET /user/": (response_models.UserDetail, make_user),
+    "GET /bank/credit/account/": (
+        response_models.CreditAccountDetail,
+        make_credit_account,
+    ),
+    "GET /bank/atm/": (
+        response_models.BankAtmDetail,
+        lambda i: models.BankAtm(name=f"a{i}", amortization=i, bank_id=1, office_id=1),
+    ),
+}
+
+
+def default_path(shape: type, page: CursorPage) -> bytes:
+    # what FastAPI does with a returned model when response_model is None
+    content = ResponseRenderer(fast=False).render_page(shape, page)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_path(shape: type, page: CursorPage) -> bytes:
+    return ResponseRenderer(fast=True).render_page(shape, page).body
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'route':32} {'default ms':>11} {'fast ms':>9} {'speedup':>8}")
+    for route, (detail, factory) in ROUTES.items():
+        page = CursorPage(items=[factory(i) for i in range(args.items)])
+        shape = response_models.expanded(
+            detail, detail.model_fields.keys() - detail.__base__.model_fields.keys()
+        )
+        slow = timed(lambda: default_path(shape, page), args.repeat)
+        fast = timed(lambda: fast_path(shape, page), args.repeat)
+        print(f"{route:32} {slow:11.2f} {fast:9.2f} {slow / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
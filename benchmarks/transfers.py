@@ -0,0 +1,125 @@
+"""Transfer throughput under contention: N concurrent clients move money between
+a small set of hot payment accounts, then the totals are checked.
+
+    DB_SQLITE_PATH=/tmp/bench.db python -m benchmarks.transfers --hot 4 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.load import format_result, summarize
+from benchmarks.seed import SeedSize, UnsafeSeedTarget, seed
+from src.main import create_app
+from src.models import models
+from src.services.ledger import pending_total
+
+
+async def balances(engine: AsyncEngine, ids: list[int]) -> tuple[int, int]:
+    account = models.PaymentAccount
+    # pending ledger postings included, compaction may run meanwhile
+    balance = account.balance + pending_total(account.id)
+    async with engine.connect() as connection:
+        row = (
+            await connection.execute(
+                select(func.sum(balance), func.min(balance)).where(account.id.in_(ids))
+            )
+        ).one()
+    return row[0], row[1]
+
+
+async def run(
+    size: SeedSize,
+    hot: int,
+    transfers: int,
+    concurrency: int,
+    max_amount: int,
+    force: bool = False,
+) -> bool:
+    app = create_app()
+    engine = await app.state.dishka_container.get(AsyncEngine)
+    await seed(engine, size, force=force)
+    ids = list(range(1, hot + 1))
+    total_before, _ = await balances(engine, ids)
+
+    rnd = random.Random(0)
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    retries = 0
+    issued = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal issued, retries
+        while issued < transfers:
+            issued += 1
+            source_id, target_id = rnd.sample(ids, 2)
+            started = time.perf_counter()
+            response = await client.post(
+                "/bank/payment/account/transfer",
+                json={
+                    "source_id": source_id,
+                    "target_id": target_id,
+                    "amount": rnd.randint(1, max_amount),
+                },
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+            if response.is_success:
+                retries += response.json()["attempts"] - 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+        total_after, lowest = await balances(engine, ids)
+
+    result = summarize(latencies, transfers - statuses[200], elapsed)
+    print(f"{'':40} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} failed")
+    print(format_result(f"transfer ({hot} hot accounts)", result))
+    print(f"statuses: {dict(sorted(statuses.items()))}, retries: {retries}")
+    print(f"total before {total_before}, after {total_after}, lowest {lowest}")
+    ok = total_before == total_after and lowest >= 0 and not statuses[500]
+    print("consistent" if ok else "INCONSISTENT")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--hot", type=int, default=4, help="accounts to contend on")
+    parser.add_argument("--transfers", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-amount", type=int, default=1000)
+    parser.add_argument(
+        "--force", action="store_true", help="seed even the application database"
+    )
+    args = parser.parse_args()
+    try:
+        ok = asyncio.run(
+            run(
+                SeedSize().scaled(args.scale),
+                args.hot,
+                args.transfers,
+                args.concurrency,
+                args.max_amount,
+                args.force,
+            )
+        )
+    except UnsafeSeedTarget as e:
+        parser.error(str(e))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+import sys
+
+from src.main import create_container
+from src.services import services
+from src.services.bank_totals import BankTotalsDrift
+
+
+async def run(rebuild: bool) -> tuple[list[BankTotalsDrift], int]:
+    container = create_container()
+    try:
+        async with container() as request_container:
+            service = await request_container.get(services.BankService)
+            drift = await service.verify_totals()
+            rebuilt = await service.rebuild_totals() if rebuild and drift else 0
+            return drift, rebuilt
+    finally:
+        await container.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check the maintained bank totals against a full recomputation."
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="rewrite the totals that are off"
+    )
+    args = parser.parse_args()
+
+    drift, rebuilt = asyncio.run(run(args.rebuild))
+    for item in drift:
+        print(
+            f"bank {item.bank_id}: {item.column} is {item.stored}, "
+            f"expected {item.expected}",
+            file=sys.stderr,
+        )
+    if args.rebuild:
+        print(f"{len(drift)} totals off, {rebuilt} banks rebuilt")
+    else:
+        print(f"{len(drift)} totals off")
+        sys.exit(1 if drift else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from src.main import create_container
+from src.services import services
+from src.services.importing import (
+    DEFAULT_IMPORT_CHUNK_SIZE,
+    ImportReport,
+    parse_rows,
+)
+
+SERVICES = {
+    "user": services.UserService,
+    "employee": services.EmployeeService,
+    "bank_atm": services.BankAtmService,
+    "credit_account": services.CreditAccountService,
+    "payment_account": services.PaymentAccountService,
+}
+
+
+def print_progress(report: ImportReport) -> None:
+    print(
+        f"\r{report.rows_imported} imported, {report.rows_failed} failed, "
+        f"{report.rows_per_second:.0f} rows/s",
+        end="",
+        file=sys.stderr,
+    )
+
+
+async def run(
+    entity: str, path: Path, fmt: str, checkpoint: str, chunk_size: int
+) -> ImportReport:
+    container = create_container()
+    try:
+        async with container() as request_container:
+            service = await request_container.get(SERVICES[entity])
+            with path.open(encoding="utf-8", newline="") as stream:
+                return await service.import_rows(
+                    parse_rows(stream, fmt),
+                    checkpoint=checkpoint,
+                    chunk_size=chunk_size,
+                    on_progress=print_progress,
+                )
+    finally:
+        await container.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a CSV or NDJSON file.")
+    parser.add_argument("entity", choices=SERVICES)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"))
+    parser.add_argument(
+        "--checkpoint", help="resume key, defaults to '<entity>:<file name>'"
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.suffix == ".csv" else "ndjson")
+    checkpoint = args.checkpoint or f"{args.entity}:{args.path.name}"
+    report = asyncio.run(run(args.entity, args.path, fmt, checkpoint, args.chunk_size))
+    print(file=sys.stderr)
+    for error in report.errors:
+        print(f"row {error.index}: {error.errors}", file=sys.stderr)
+    print(
+        f"skipped {report.rows_skipped}, imported {report.rows_imported}, "
+        f"failed {report.rows_failed} in {report.elapsed:.2f}s "
+        f"({report.rows_per_second:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,69 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 import uvicorn
-from dishka import make_async_container
+from dishka import AsyncContainer, make_async_container
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from src import providers as main_providers
+from src.metrics import Metrics, MetricsMiddleware
+from src.query_debug import StatementLogMiddleware
 from src.repositories.providers import RepositoryProvider
 from src.routes import routes as handlers
+from src.services.ledger import compaction_loop
 from src.services.providers import ServiceProvider
+from src.services.scoring import ScoringJob
+from src.setting import DbSettings, LedgerSettings
+
+
+def create_container(metrics: Metrics | None = None) -> AsyncContainer:
+    return make_async_container(
+        main_providers.MetricsProvider(),
+        main_providers.DbSettingProvider(),
+        main_providers.ApiProvider(),
+        main_providers.CacheProvider(),
+        main_providers.AsyncDatabaseProvider(),
+        ServiceProvider(),
+        RepositoryProvider(),
+        context={Metrics: metrics or Metrics()},
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    container = app.state.dishka_container
+    setting = await container.get(DbSettings)
+    engine = await container.get(AsyncEngine)
+    await main_providers.warm_up_pool(
+        engine, min(setting.pool_warmup, setting.pool_size)
+    )
+    ledger = await container.get(LedgerSettings)
+    compaction = None
+    if ledger.compaction_interval > 0:
+        compaction = asyncio.create_task(
+            compaction_loop(
+                await container.get(async_sessionmaker[AsyncSession]),
+                ledger.compaction_interval,
+                ledger.compaction_batch_size,
+            )
+        )
+    yield
+    await (await container.get(ScoringJob)).cancel()
+    if compaction is not None:
+        compaction.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await compaction
+    await container.close()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(debug=True, title="Specification Subject")
+    app = FastAPI(debug=True, title="Specification Subject", lifespan=lifespan)
+    metrics = Metrics()
     origins = (
         "http://0.0.0.0",
         "http://0.0.0.0:8001",
@@ -25,6 +77,14 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    setting = DbSettings()
+    if setting.query_debug != "off":
+        app.add_middleware(
+            StatementLogMiddleware,
+            threshold=setting.query_repeat_threshold,
+            mode=setting.query_debug,
+        )
     routes = (
         handlers.bank_route,
         handlers.bank_office_route,
@@ -33,17 +93,12 @@ def create_app() -> FastAPI:
         handlers.user_route,
         handlers.credit_account_route,
         handlers.payment_account_route,
+        handlers.metrics_route,
     )
     for route in routes:
         app.include_router(route)
 
-    container = make_async_container(
-        main_providers.DbSettingProvider(),
-        main_providers.AsyncDatabaseProvider(),
-        ServiceProvider(),
-        RepositoryProvider(),
-    )
-    setup_dishka(container, app)
+    setup_dishka(create_container(metrics), app)
     return app
 
 
@@ -0,0 +1,142 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram
+from sqlalchemy import AsyncAdaptedQueuePool, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "unmatched"
+METRICS_PATH = "/metrics"
+
+
+@dataclass(slots=True)
+class RequestStats:
+    statements: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    _started: float = 0.0
+
+
+# set by MetricsMiddleware for the duration of a request; SQLAlchemy runs the
+# sync engine in a greenlet that shares the caller's context
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Adds the time spent waiting for (or opening) a connection to the stats of
+    the current request."""
+
+    def _do_get(self):
+        stats = _request_stats.get()
+        if stats is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats.pool_wait += time.perf_counter() - started
+
+
+class Metrics:
+    def __init__(self, registry: CollectorRegistry | None = None) -> None:
+        self.registry = registry or CollectorRegistry()
+        labels = ("method", "route")
+        self.request_latency = Histogram(
+            "http_request_duration_seconds",
+            "Request latency by route template",
+            (*labels, "status"),
+            registry=self.registry,
+        )
+        self.statements = Histogram(
+            "http_request_sql_statements",
+            "SQL statements executed per request",
+            labels,
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+            registry=self.registry,
+        )
+        self.db_time = Histogram(
+            "http_request_db_duration_seconds",
+            "Time spent executing SQL per request",
+            labels,
+            registry=self.registry,
+        )
+        self.pool_wait = Histogram(
+            "http_request_pool_wait_seconds",
+            "Time spent checking out pooled connections per request",
+            labels,
+            buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+            registry=self.registry,
+        )
+        self.connections_in_use = Gauge(
+            "db_pool_connections_in_use",
+            "Connections currently checked out of the pool",
+            registry=self.registry,
+        )
+        self.pool_size = Gauge(
+            "db_pool_size", "Configured size of the pool", registry=self.registry
+        )
+
+    def observe(
+        self, method: str, route: str, status: int, elapsed: float, stats: RequestStats
+    ) -> None:
+        self.request_latency.labels(method, route, str(status)).observe(elapsed)
+        self.statements.labels(method, route).observe(stats.statements)
+        self.db_time.labels(method, route).observe(stats.db_time)
+        self.pool_wait.labels(method, route).observe(stats.pool_wait)
+
+    def instrument_engine(self, engine: AsyncEngine) -> None:
+        pool = engine.pool
+        # read on scrape, nothing to do on the request path
+        self.connections_in_use.set_function(pool.checkedout)
+        self.pool_size.set_function(pool.size)
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, params, context, many):
+            if (stats := _request_stats.get()) is not None:
+                stats._started = time.perf_counter()
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, params, context, many):
+            if (stats := _request_stats.get()) is not None:
+                stats.statements += 1
+                stats.db_time += time.perf_counter() - stats._started
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: times each request and records it, with the SQL
+    stats collected meanwhile, under the template of the route that served it."""
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            # the router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path_format", UNMATCHED_ROUTE)
+            if template != METRICS_PATH:
+                self.metrics.observe(scope["method"], template, status, elapsed, stats)
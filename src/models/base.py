@@ -1,8 +1,9 @@
 from datetime import date
-from typing import Annotated
+from enum import Flag
+from typing import Annotated, Any
 
 from inflection import underscore
-from sqlalchemy import String, Date
+from sqlalchemy import Dialect, Integer, String, Date, TypeDecorator
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -15,6 +16,24 @@ from sqlalchemy.orm import (
 type PrimaryKey = Annotated[int, mapped_column(primary_key=True, autoincrement=True)]
 
 
+class FlagType[F: Flag](TypeDecorator[F]):
+    """Stores an ``enum.Flag`` as its integer value, so any combination of members
+    round-trips and single bits can be tested with bitwise SQL."""
+
+    impl = Integer
+    cache_ok = True
+
+    def __init__(self, flag: type[F]) -> None:
+        super().__init__()
+        self.flag = flag
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> int | None:
+        return None if value is None else self.flag(value).value
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> F | None:
+        return None if value is None else self.flag(value)
+
+
 class Base(DeclarativeBase, AsyncAttrs):
     __abstract__ = True
 
@@ -28,6 +47,12 @@ class WithPK(MappedAsDataclass, Base):
     id: Mapped[int] = mapped_column(
         primary_key=True, unique=True, autoincrement=True, init=False
     )
+    # row version, set to 1 on insert and bumped by the ORM on every UPDATE
+    version: Mapped[int] = mapped_column(init=False)
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict[str, Any]:
+        return {"version_id_col": cls.__table__.c.version}
 
 
 class PersonModel(MappedAsDataclass, Base):
@@ -1,25 +1,33 @@
 import random
-from datetime import date
+from datetime import date, datetime
 from enum import Flag, auto
 
 from sqlalchemy import (
+    DDL,
     String,
     ForeignKey,
-    Enum,
+    Index,
     PrimaryKeyConstraint,
+    event,
+    false,
+    func,
+    select,
 )
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
+    query_expression,
     relationship,
 )
 
-from src.models.base import WithPK, PersonModel, Base
+from src.models.base import FlagType, WithPK, PersonModel, Base
 
 
 class BankUser(Base):
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
-    bank_id: Mapped[int] = mapped_column(ForeignKey("bank.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+    bank_id: Mapped[int] = mapped_column(
+        ForeignKey("bank.id", ondelete="CASCADE"), index=True
+    )
 
     __table_args__ = (PrimaryKeyConstraint("user_id", "bank_id"),)
 
@@ -29,23 +37,27 @@ class Bank(WithPK):
     rating: Mapped[int] = mapped_column(
         default_factory=lambda: random.randint(0, 100), init=False
     )
-    total_sum: Mapped[int] = mapped_column(
-        default_factory=lambda: random.randint(0, int(1e6)), init=False
-    )
+    # maintained by the bank_totals triggers below: sum of the compacted payment
+    # account balances, number of clients and sum of the loan amounts
+    total_sum: Mapped[int] = mapped_column(default=0, init=False)
+    client_count: Mapped[int] = mapped_column(default=0, init=False)
+    loan_total: Mapped[int] = mapped_column(default=0, init=False)
     users: Mapped[list["User"]] = relationship(
         back_populates="banks",
         default_factory=list,
         secondary="bank_user",
     )
 
+    # children are removed by the ondelete rules of their foreign keys, the ORM
+    # doesn't load them to delete them itself
     atms: Mapped[list["BankAtm"]] = relationship(
-        back_populates="bank", default_factory=list
+        back_populates="bank", default_factory=list, passive_deletes=True
     )
     offices: Mapped[list["BankOffice"]] = relationship(
-        back_populates="bank", default_factory=list
+        back_populates="bank", default_factory=list, passive_deletes=True
     )
     employees: Mapped[list["Employee"]] = relationship(
-        back_populates="bank", default_factory=list
+        back_populates="bank", default_factory=list, passive_deletes=True
     )
 
     def count_atms(self) -> int:
@@ -55,7 +67,7 @@ class Bank(WithPK):
         return len(self.offices)
 
     def count_clients(self) -> int:
-        return len(self.offices)
+        return len(self.users)
 
 
 class User(WithPK, PersonModel):
@@ -74,10 +86,10 @@ class User(WithPK, PersonModel):
     )
 
     credit_accounts: Mapped[list["CreditAccount"]] = relationship(
-        back_populates="user", default_factory=list
+        back_populates="user", default_factory=list, passive_deletes=True
     )
     payment_accounts: Mapped[list["PaymentAccount"]] = relationship(
-        back_populates="user", default_factory=list
+        back_populates="user", default_factory=list, passive_deletes=True
     )
 
 
@@ -90,18 +102,22 @@ class Employee(WithPK, PersonModel):
     position: Mapped[str] = mapped_column(String(30))
     salary: Mapped[int]
 
+    # indexed by the composite (bank_id, status) below
     bank_id: Mapped[int | None] = mapped_column(
         ForeignKey("bank.id", ondelete="CASCADE"), init=False
     )
     office_id: Mapped[int | None] = mapped_column(
-        ForeignKey("bank_office.id", ondelete="SET NULL"), init=False
+        ForeignKey("bank_office.id", ondelete="SET NULL"), init=False, index=True
     )
     bank: Mapped["Bank | None"] = relationship(back_populates="employees", default=None)
     office: Mapped["BankOffice | None"] = relationship(default=None)
     status: Mapped[EmployeeStatus | None] = mapped_column(
-        Enum(EmployeeStatus), default=None
+        FlagType(EmployeeStatus), default=None, index=True
     )
 
+    # per-bank lookups and status filters within a bank
+    __table_args__ = (Index("ix_employee_bank_id_status", "bank_id", "status"),)
+
 
 class CreditAccount(WithPK):
     loan_start_date: Mapped[date]
@@ -112,12 +128,14 @@ class CreditAccount(WithPK):
     interest_rate: Mapped[int]
 
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id", ondelete="CASCADE"),
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
     )
-    bank_id: Mapped[int] = mapped_column(ForeignKey("bank.id", ondelete="CASCADE"))
-    employee_id: Mapped[int] = mapped_column(ForeignKey("employee.id"))
+    bank_id: Mapped[int] = mapped_column(
+        ForeignKey("bank.id", ondelete="CASCADE"), index=True
+    )
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employee.id"), index=True)
     payment_account_id: Mapped[int] = mapped_column(
-        ForeignKey("payment_account.id"),
+        ForeignKey("payment_account.id"), index=True
     )
     user: Mapped["User | None"] = relationship(
         back_populates="credit_accounts", init=False
@@ -128,10 +146,16 @@ class CreditAccount(WithPK):
 
 
 class PaymentAccount(WithPK):
+    # balance as of the last ledger compaction; the current balance adds the
+    # uncompacted LedgerPosting rows of the account
     balance: Mapped[int]
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
-    bank_id: Mapped[int] = mapped_column(ForeignKey("bank.id", ondelete="CASCADE"))
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
+    )
+    bank_id: Mapped[int] = mapped_column(
+        ForeignKey("bank.id", ondelete="CASCADE"), index=True
+    )
     user: Mapped["User | None"] = relationship(
         back_populates="payment_accounts", init=False
     )
@@ -149,9 +173,10 @@ class BankAtm(WithPK):
     name: Mapped[str] = mapped_column(String(50))
     amortization: Mapped[int]
 
+    # indexed by the composite (bank_id, status) below
     bank_id: Mapped[int] = mapped_column(ForeignKey("bank.id", ondelete="CASCADE"))
     office_id: Mapped[int] = mapped_column(
-        ForeignKey("bank_office.id", ondelete="CASCADE")
+        ForeignKey("bank_office.id", ondelete="CASCADE"), index=True
     )
     office: Mapped["BankOffice | None"] = relationship(
         back_populates="atms", init=False
@@ -159,9 +184,12 @@ class BankAtm(WithPK):
     bank: Mapped["Bank | None"] = relationship(back_populates="atms", init=False)
 
     status: Mapped[BankAtmStatus | None] = mapped_column(
-        Enum(BankAtmStatus), default=None
+        FlagType(BankAtmStatus), default=None, index=True
     )
 
+    # per-bank lookups and status filters within a bank
+    __table_args__ = (Index("ix_bank_atm_bank_id_status", "bank_id", "status"),)
+
 
 class BankOfficeStatus(Flag):
     Active = auto()
@@ -173,14 +201,194 @@ class BankOffice(WithPK):
     name: Mapped[str] = mapped_column(String(100))
     rental: Mapped[int]
 
+    # indexed by the composite (bank_id, status) below
     bank_id: Mapped[int | None] = mapped_column(
         ForeignKey("bank.id", ondelete="CASCADE"), init=False
     )
     bank: Mapped["Bank | None"] = relationship(back_populates="offices", default=None)
     atms: Mapped[list["BankAtm"]] = relationship(
-        back_populates="office", default_factory=list
+        back_populates="office", default_factory=list, passive_deletes=True
     )
 
     status: Mapped[BankOfficeStatus | None] = mapped_column(
-        Enum(BankOfficeStatus), default=None
+        FlagType(BankOfficeStatus), default=None, index=True
+    )
+
+    # per-bank lookups and status filters within a bank
+    __table_args__ = (Index("ix_bank_office_bank_id_status", "bank_id", "status"),)
+
+
+class ImportCheckpoint(Base):
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    entity: Mapped[str] = mapped_column(String(50))
+    rows_done: Mapped[int] = mapped_column(default=0)
+    rows_failed: Mapped[int] = mapped_column(default=0)
+
+
+class LedgerPosting(Base):
+    """Append-only credit (positive) or debit (negative) to a payment account.
+    Compaction folds it into ``PaymentAccount.balance`` and sets ``compacted``;
+    the amount never changes."""
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    payment_account_id: Mapped[int] = mapped_column(
+        ForeignKey("payment_account.id", ondelete="CASCADE")
+    )
+    amount: Mapped[int]
+    compacted: Mapped[bool] = mapped_column(default=False)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    __table_args__ = (
+        # account history, newest first
+        Index("ix_ledger_posting_payment_account_id_id", "payment_account_id", "id"),
+    )
+
+
+# covers the pending sum of an account; only uncompacted postings are indexed
+Index(
+    "ix_ledger_posting_pending",
+    LedgerPosting.payment_account_id,
+    LedgerPosting.amount,
+    sqlite_where=LedgerPosting.compacted == false(),
+    postgresql_where=LedgerPosting.compacted == false(),
+)
+
+# the balance reads serve: the compacted balance plus the pending postings,
+# summed from the index above. Loaded with every SELECT of the account, left
+# None by INSERT/UPDATE/DELETE ... RETURNING
+PaymentAccount.current_balance = query_expression(
+    PaymentAccount.balance
+    + select(func.coalesce(func.sum(LedgerPosting.amount), 0))
+    .where(
+        LedgerPosting.payment_account_id == PaymentAccount.id,
+        LedgerPosting.compacted == false(),
+    )
+    .scalar_subquery()
+)
+
+
+# (bank column, source table, value added per row). Row triggers keep the bank
+# columns in step with every insert, update and delete of the source rows in the
+# same transaction, whichever path (ORM flush, bulk statement, FK cascade) wrote
+# them; they also bump the bank version so its ETag changes. Ledger postings
+# reach total_sum only when compaction folds them into the account balance.
+BANK_TOTALS = (
+    ("total_sum", PaymentAccount.__table__, "balance"),
+    ("client_count", BankUser.__table__, "1"),
+    ("loan_total", CreditAccount.__table__, "loan_amount"),
+)
+
+
+def _bank_delta(column: str, sign: str, row: str, value: str) -> str:
+    value = value if value == "1" else f"{row}.{value}"
+    return (
+        f"UPDATE bank SET {column} = {column} {sign} {value}, version = version + 1"
+        f" WHERE id = {row}.bank_id;"
+    )
+
+
+def _sqlite_triggers(column: str, table: str, value: str) -> list[str]:
+    watched = "bank_id" if value == "1" else f"{value}, bank_id"
+    changed = " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in watched.split(", "))
+    name = f"{table}_bank_totals"
+    return [
+        f"CREATE TRIGGER {name}_insert AFTER INSERT ON {table} BEGIN "
+        f"{_bank_delta(column, '+', 'NEW', value)} END",
+        f"CREATE TRIGGER {name}_delete AFTER DELETE ON {table} BEGIN "
+        f"{_bank_delta(column, '-', 'OLD', value)} END",
+        f"CREATE TRIGGER {name}_update AFTER UPDATE OF {watched} ON {table} "
+        f"WHEN {changed} BEGIN {_bank_delta(column, '-', 'OLD', value)} "
+        f"{_bank_delta(column, '+', 'NEW', value)} END",
+    ]
+
+
+def _postgresql_triggers(column: str, table: str, value: str) -> list[str]:
+    watched = "bank_id" if value == "1" else f"{value}, bank_id"
+    name = f"{table}_bank_totals"
+    return [
+        f"CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$ BEGIN "
+        f"IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+        f"{_bank_delta(column, '-', 'OLD', value)} END IF; "
+        f"IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+        f"{_bank_delta(column, '+', 'NEW', value)} END IF; "
+        f"RETURN NULL; END $$ LANGUAGE plpgsql",
+        f"CREATE TRIGGER {name} AFTER INSERT OR DELETE OR UPDATE OF {watched} "
+        f"ON {table} FOR EACH ROW EXECUTE FUNCTION {name}()",
+    ]
+
+
+for _column, _table, _value in BANK_TOTALS:
+    for _statement in _sqlite_triggers(_column, _table.name, _value):
+        event.listen(
+            _table, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+        )
+    for _statement in _postgresql_triggers(_column, _table.name, _value):
+        event.listen(
+            _table, "after_create", DDL(_statement).execute_if(dialect="postgresql")
+        )
+
+
+# People are found by name through an index the database keeps in step with
+# the rows: a trigram index on the normalized full name on Postgres, an
+# external-content FTS5 table on SQLite (see services.search).
+PERSON_NAME_COLUMNS = ("first_name", "second_name", "patronymic_name")
+# queries must repeat this exact expression for the trigram index to serve them
+PERSON_SEARCH_NAME = (
+    "lower(first_name || ' ' || second_name || ' ' || coalesce(patronymic_name, ''))"
+)
+SEARCHABLE = (User.__table__, Employee.__table__)
+
+
+def search_table(table: str) -> str:
+    return f"{table}_search"
+
+
+def _sqlite_search(table: str) -> list[str]:
+    fts = search_table(table)
+    columns = ", ".join(PERSON_NAME_COLUMNS)
+    new = ", ".join(f"NEW.{c}" for c in PERSON_NAME_COLUMNS)
+    old = ", ".join(f"OLD.{c}" for c in PERSON_NAME_COLUMNS)
+    insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (NEW.id, {new});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', OLD.id, {old});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON "{table}" BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON "{table}" BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE OF {columns} ON "{table}" '
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def _postgresql_search(table: str) -> list[str]:
+    return [
+        f'CREATE INDEX ix_{table}_search_name ON "{table}" '
+        f"USING gin (({PERSON_SEARCH_NAME}) gin_trgm_ops)"
+    ]
+
+
+for _table in SEARCHABLE:
+    event.listen(
+        _table,
+        "before_create",
+        DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+    )
+    # the shadow table is not part of the metadata and outlives a dropped table
+    event.listen(
+        _table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {search_table(_table.name)}").execute_if(
+            dialect="sqlite"
+        ),
     )
+    for _statement in _sqlite_search(_table.name):
+        event.listen(
+            _table, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+        )
+    for _statement in _postgresql_search(_table.name):
+        event.listen(
+            _table, "after_create", DDL(_statement).execute_if(dialect="postgresql")
+        )
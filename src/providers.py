@@ -1,6 +1,8 @@
+import asyncio
 from typing import AsyncIterable
 
-from dishka import Provider, provide, Scope
+from dishka import Provider, from_context, provide, Scope
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -8,7 +10,19 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from src.setting import DbSettings
+from src import query_debug
+from src.metrics import Metrics, TimedQueuePool
+from src.routes.idempotency import IdempotencyStore
+from src.routes.serialization import ResponseRenderer
+from src.services.cache import EntityCache, invalidating_session_class
+from src.setting import (
+    DbSettings,
+    CacheSettings,
+    IdempotencySettings,
+    ApiSettings,
+    LedgerSettings,
+    ScoringSettings,
+)
 
 
 class DbSettingProvider(Provider):
@@ -16,18 +30,87 @@ class DbSettingProvider(Provider):
     def get_setting(self) -> DbSettings:
         return DbSettings()
 
+    @provide(scope=Scope.APP)
+    def get_cache_setting(self) -> CacheSettings:
+        return CacheSettings()
+
+    @provide(scope=Scope.APP)
+    def get_idempotency_setting(self) -> IdempotencySettings:
+        return IdempotencySettings()
+
+    @provide(scope=Scope.APP)
+    def get_ledger_setting(self) -> LedgerSettings:
+        return LedgerSettings()
+
+    @provide(scope=Scope.APP)
+    def get_scoring_setting(self) -> ScoringSettings:
+        return ScoringSettings()
+
+
+class ApiProvider(Provider):
+    @provide(scope=Scope.APP)
+    def get_api_setting(self) -> ApiSettings:
+        return ApiSettings()
+
+    @provide(scope=Scope.APP)
+    def get_renderer(self, setting: ApiSettings) -> ResponseRenderer:
+        return ResponseRenderer(fast=setting.fast_json)
+
+
+class CacheProvider(Provider):
+    @provide(scope=Scope.APP)
+    def get_entity_cache(self, setting: CacheSettings) -> EntityCache:
+        return EntityCache(
+            maxsize=setting.maxsize,
+            ttl=setting.ttl,
+            negative_ttl=setting.negative_ttl,
+        )
+
+    @provide(scope=Scope.APP)
+    def get_idempotency_store(self, setting: IdempotencySettings) -> IdempotencyStore:
+        return IdempotencyStore(maxsize=setting.maxsize, ttl=setting.ttl)
+
+
+class MetricsProvider(Provider):
+    metrics = from_context(provides=Metrics, scope=Scope.APP)
+
 
 class AsyncDatabaseProvider(Provider):
     @provide(scope=Scope.APP)
-    def get_async_engine(self, setting: DbSettings) -> AsyncEngine:
-        return create_async_engine(url=setting.url, echo=setting.echo)
+    async def get_async_engine(
+        self, setting: DbSettings, metrics: Metrics
+    ) -> AsyncIterable[AsyncEngine]:
+        options = setting.engine_options
+        # the default queue pool plus checkout timing; also keeps aiosqlite off
+        # its default NullPool, which reconnects (and re-runs the pragmas) on
+        # every checkout
+        options["poolclass"] = TimedQueuePool
+        engine = create_async_engine(url=setting.url, **options)
+        metrics.instrument_engine(engine)
+        query_debug.instrument_engine(engine)
+        if setting.is_sqlite:
+            pragmas = setting.sqlite_pragmas
+
+            @event.listens_for(engine.sync_engine, "connect")
+            def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+                cursor = dbapi_connection.cursor()
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+                cursor.close()
+
+        yield engine
+        await engine.dispose()
 
     @provide(scope=Scope.APP)
     def get_session_factory(
-        self, engine: AsyncEngine
+        self, engine: AsyncEngine, cache: EntityCache
     ) -> async_sessionmaker[AsyncSession]:
         return async_sessionmaker(
-            bind=engine, autoflush=False, autocommit=False, expire_on_commit=False
+            bind=engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+            sync_session_class=invalidating_session_class(cache),
         )
 
     @provide(scope=Scope.REQUEST)
@@ -36,3 +119,19 @@ class AsyncDatabaseProvider(Provider):
     ) -> AsyncIterable[AsyncSession]:
         async with factory() as session:
             yield session
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> None:
+    """Opens ``connections`` pooled connections at once so the first requests
+    after a deploy don't each pay for connection setup."""
+
+    async def checkout() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            # hold the connection until every checkout is open
+            await barrier.wait()
+
+    if connections <= 0:
+        return
+    barrier = asyncio.Barrier(connections)
+    await asyncio.gather(*(checkout() for _ in range(connections)))
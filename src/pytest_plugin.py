@@ -0,0 +1,14 @@
+"""Statement budget fixtures. Enable with ``pytest -p src.pytest_plugin`` or
+``pytest_plugins = ["src.pytest_plugin"]`` in a conftest."""
+
+import pytest
+
+from src import query_debug
+
+
+@pytest.fixture
+def max_statements():
+    """``with max_statements(3, "GET /bank/"): await client.get("/bank/")`` fails
+    the test, listing the statements by shape, when the block runs more than 3.
+    The app must be driven in the test's context (e.g. httpx.ASGITransport)."""
+    return query_debug.max_statements
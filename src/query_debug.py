@@ -0,0 +1,125 @@
+import re
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Literal
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+type DebugMode = Literal["off", "warn", "raise"]
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \([^()]*\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+
+
+class RepeatedStatementError(Exception):
+    pass
+
+
+class RepeatedStatementWarning(UserWarning):
+    pass
+
+
+def normalize(statement: str) -> str:
+    """The shape of a statement: literals, bind markers and IN lists collapsed so
+    the N queries of an N+1 compare equal."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _LITERAL.sub("?", statement)
+
+
+@dataclass(slots=True)
+class StatementLog:
+    """Statements executed while the log is active, grouped by shape. Repeating
+    a shape more than ``threshold`` times warns or raises, per ``mode``."""
+
+    threshold: int | None = None
+    mode: DebugMode = "off"
+    label: str = ""
+    shapes: Counter[str] = field(default_factory=Counter)
+    parent: "StatementLog | None" = None
+
+    @property
+    def total(self) -> int:
+        return self.shapes.total()
+
+    def record(self, shape: str) -> None:
+        self.shapes[shape] += 1
+        if self.threshold is not None and self.shapes[shape] == self.threshold + 1:
+            message = (
+                f"{self.label or 'statement'} repeated more than {self.threshold}"
+                f" times: {shape}"
+            )
+            if self.mode == "raise":
+                raise RepeatedStatementError(message)
+            if self.mode == "warn":
+                warnings.warn(message, RepeatedStatementWarning, stacklevel=2)
+
+    def report(self) -> str:
+        return "\n".join(
+            f"{count:4} x {shape}" for shape, count in self.shapes.most_common()
+        )
+
+
+_statement_log: ContextVar[StatementLog | None] = ContextVar(
+    "statement_log", default=None
+)
+
+
+@contextmanager
+def track_statements(
+    threshold: int | None = None, mode: DebugMode = "off", label: str = ""
+) -> Iterator[StatementLog]:
+    """Collects the statements executed in the current context, including the
+    ones of enclosing logs."""
+    log = StatementLog(threshold, mode, label, parent=_statement_log.get())
+    token = _statement_log.set(log)
+    try:
+        yield log
+    finally:
+        _statement_log.reset(token)
+
+
+@contextmanager
+def max_statements(limit: int, label: str = "") -> Iterator[StatementLog]:
+    with track_statements(label=label) as log:
+        yield log
+    assert log.total <= limit, (
+        f"{label or 'block'} executed {log.total} statements, expected at most"
+        f" {limit}:\n{log.report()}"
+    )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record_statement(conn, cursor, statement, params, context, many):
+        log = _statement_log.get()
+        if log is None:
+            return
+        shape = normalize(statement)
+        while log is not None:
+            log.record(shape)
+            log = log.parent
+
+
+class StatementLogMiddleware:
+    """Development aid: tracks the statements of every request and warns or
+    raises once one statement shape repeats more than ``threshold`` times."""
+
+    def __init__(self, app: ASGIApp, threshold: int, mode: DebugMode) -> None:
+        self.app = app
+        self.threshold = threshold
+        self.mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        label = f"{scope['method']} {scope['path']}"
+        with track_statements(self.threshold, self.mode, label):
+            await self.app(scope, receive, send)
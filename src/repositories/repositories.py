@@ -1,4 +1,6 @@
+from advanced_alchemy.filters import StatementFilter
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from sqlalchemy import ColumnElement, StatementLambdaElement, and_
 
 from src.models.models import (
     Bank,
@@ -11,29 +13,54 @@ from src.models.models import (
 )
 
 
-class BankRepository(SQLAlchemyAsyncRepository[Bank]):
+class Repository[TModel](SQLAlchemyAsyncRepository[TModel]):
+    """advanced_alchemy adds every filter expression as its own cached lambda
+    step, and on a cache hit SQLAlchemy re-binds such a step's values against a
+    parameter list it has grown with those of the steps before it: an expression
+    following a step with bound values (another expression, ``LIMIT``/``OFFSET``)
+    is executed with shifted values. Every query gets its expressions as a single
+    conjunction applied first, right on the base statement, instead."""
+
+    def _apply_filters(
+        self,
+        *filters: StatementFilter | ColumnElement[bool],
+        apply_pagination: bool = True,
+        statement: StatementLambdaElement,
+    ) -> StatementLambdaElement:
+        expressions = [f for f in filters if isinstance(f, ColumnElement)]
+        if expressions:
+            filters = (
+                and_(*expressions) if len(expressions) > 1 else expressions[0],
+                *(f for f in filters if not isinstance(f, ColumnElement)),
+            )
+        return super()._apply_filters(
+            *filters, apply_pagination=apply_pagination, statement=statement
+        )
+
+
+class BankRepository(Repository[Bank]):
     model_type = Bank
 
 
-class BankOfficeRepository(SQLAlchemyAsyncRepository[BankOffice]):
+class BankOfficeRepository(Repository[BankOffice]):
     model_type = BankOffice
 
 
-class BankAtmRepository(SQLAlchemyAsyncRepository[BankAtm]):
+class BankAtmRepository(Repository[BankAtm]):
     model_type = BankAtm
 
 
-class UserRepository(SQLAlchemyAsyncRepository[User]):
+class UserRepository(Repository[User]):
     model_type = User
 
 
-class EmployeeRepository(SQLAlchemyAsyncRepository[Employee]):
+class EmployeeRepository(Repository[Employee]):
     model_type = Employee
 
 
-class CreditAccountRepository(SQLAlchemyAsyncRepository[CreditAccount]):
+class CreditAccountRepository(Repository[CreditAccount]):
     model_type = CreditAccount
 
 
-class PaymentAccountRepository(SQLAlchemyAsyncRepository[PaymentAccount]):
+class PaymentAccountRepository(Repository[PaymentAccount]):
     model_type = PaymentAccount
@@ -1,25 +1,70 @@
-from typing import Annotated
+from dataclasses import dataclass
+from datetime import date
+from typing import Annotated, Literal
 
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.database import db_helper
+from fastapi import Header, Query
 
-from src.services.services import UserService, BankService, BankOfficeService
+from src.services.amortization import MAX_PROJECTION_MONTHS
+from src.services.deleting import DEFAULT_DELETE_BATCH_SIZE, MAX_DELETE_BATCH_SIZE
+from src.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.services.upserting import OnConflict as ConflictMode
 
 
-async def get_bank_service(
-    session: Annotated[AsyncSession, Depends(db_helper.get_async_session)]
-) -> BankService:
-    return BankService(session)
+@dataclass(slots=True)
+class PageParams:
+    cursor: Annotated[str | None, Query()] = None
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE
+    reverse: Annotated[bool, Query()] = False
 
 
-async def get_user_service(
-    session: Annotated[AsyncSession, Depends(db_helper.get_async_session)]
-) -> UserService:
-    return UserService(session)
+@dataclass(slots=True)
+class SearchParams:
+    q: Annotated[str, Query(min_length=1, max_length=100)]
+    cursor: Annotated[str | None, Query()] = None
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE
 
 
-async def get_office_service(
-    session: Annotated[AsyncSession, Depends(db_helper.get_async_session)]
-) -> BankOfficeService:
-    return BankOfficeService(session)
+@dataclass(slots=True)
+class StatusFilterParams:
+    bank_id: Annotated[int | None, Query()] = None
+    # comma separated flag names, e.g. "Active,HaveMoney"
+    status_all: Annotated[str | None, Query()] = None
+    status_any: Annotated[str | None, Query()] = None
+
+
+@dataclass(slots=True)
+class DeleteBatchParams:
+    batch_size: Annotated[int, Query(ge=1, le=MAX_DELETE_BATCH_SIZE)] = (
+        DEFAULT_DELETE_BATCH_SIZE
+    )
+
+
+@dataclass(slots=True)
+class ProjectionParams:
+    start: Annotated[date | None, Query()] = None
+    months: Annotated[int | None, Query(ge=1, le=MAX_PROJECTION_MONTHS)] = None
+
+
+# see idempotency.IdempotencyStore
+IdempotencyKey = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
+
+# see upserting.OnConflict
+OnConflict = Annotated[ConflictMode, Query()]
+
+# without ?expand= every relation is included; the listed names narrow that
+# down and a bare ?expand= (the empty name) leaves them all out
+BankExpand = Annotated[
+    list[Literal["", "users", "employees", "offices", "atms"]] | None, Query()
+]
+BankOfficeExpand = Annotated[list[Literal["", "bank", "atms"]] | None, Query()]
+BankAtmExpand = Annotated[list[Literal["", "office", "bank"]] | None, Query()]
+UserExpand = Annotated[
+    list[Literal["", "banks", "credit_accounts", "payment_accounts"]] | None, Query()
+]
+EmployeeExpand = Annotated[list[Literal["", "bank", "office"]] | None, Query()]
+CreditAccountExpand = Annotated[
+    list[Literal["", "user", "bank", "employee", "payment_account"]] | None, Query()
+]
+PaymentAccountExpand = Annotated[list[Literal["", "user", "bank"]] | None, Query()]
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Mapping
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from starlette import status
+
+
+def _fingerprint(request: BaseModel, query: Mapping[str, Any]) -> str:
+    # request schemas are distinct per route, so the type tells routes apart
+    payload = (
+        f"{type(request).__qualname__}:{request.model_dump_json()}"
+        f":{sorted(query.items())!r}"
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _mismatch(key: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"Idempotency-Key {key!r} was already used with another request",
+    )
+
+
+class IdempotencyStore:
+    """Responses of writes sent with an ``Idempotency-Key`` header, so a client
+    retrying after a timeout gets the first response back instead of a second
+    row. Completed responses live in a process-wide LRU with TTL; a request
+    arriving while the first one with its key is still running waits for that
+    one instead of running the handler again. Failures are not stored: nothing
+    was written, so a retry runs anew."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expiry, request fingerprint, encoded response)
+        self._done: OrderedDict[str, tuple[float, str, Any]] = OrderedDict()
+        self._running: dict[str, tuple[str, asyncio.Future[Any]]] = {}
+
+    async def run(
+        self,
+        key: str | None,
+        request: BaseModel,
+        shape: type[BaseModel],
+        handler: Callable[[], Awaitable[Any]],
+        query: Mapping[str, Any] | None = None,
+    ) -> Any:
+        """Runs ``handler`` once per ``key`` and returns its result encoded with
+        ``shape``; without a key it simply runs. ``query`` holds the parameters
+        besides the body that change what the handler does."""
+        if key is None:
+            return await handler()
+        fingerprint = _fingerprint(request, query or {})
+        while True:
+            done = self._done.get(key)
+            if done is not None and done[0] >= time.monotonic():
+                if done[1] != fingerprint:
+                    raise _mismatch(key)
+                self._done.move_to_end(key)
+                return done[2]
+            running = self._running.get(key)
+            if running is None:
+                break
+            if running[0] != fingerprint:
+                raise _mismatch(key)
+            try:
+                return await asyncio.shield(running[1])
+            except asyncio.CancelledError:
+                if not running[1].cancelled():
+                    raise
+                # the first request went away before finishing: take over
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        # waiters retrieve the outcome; without any, don't warn about it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._running[key] = (fingerprint, future)
+        try:
+            response = shape.model_validate(await handler()).model_dump(mode="json")
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._running[key]
+        future.set_result(response)
+        self._put(key, fingerprint, response)
+        return response
+
+    def _put(self, key: str, fingerprint: str, response: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._done.pop(key, None)
+        self._done[key] = (time.monotonic() + self.ttl, fingerprint, response)
+        while len(self._done) > self.maxsize:
+            self._done.popitem(last=False)
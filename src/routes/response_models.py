@@ -1,8 +1,47 @@
-from datetime import date
+from datetime import date, datetime
+from functools import cache
+from typing import Any, Generic, TypeVar, Iterable
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, create_model
 
 from src.models.models import EmployeeStatus, BankAtmStatus, BankOfficeStatus
+from src.services.loading import expansion
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    model_config = ConfigDict(from_attributes=True)
+    items: list[T]
+    next_cursor: str | None
+
+
+class BulkItemError(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class BulkCreateResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    ids: list[int]
+    errors: list[BulkItemError]
+
+
+class BulkDeleteResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    deleted: int
+    batches: int
+
+
+class ImportReport(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    rows_skipped: int
+    rows_imported: int
+    rows_failed: int
+    elapsed: float
+    rows_per_second: float
+    errors: list[BulkItemError]
 
 
 class PersonModel(BaseModel):
@@ -12,11 +51,39 @@ class PersonModel(BaseModel):
     patronymic_name: str | None
 
 
+_AS_OF_COMPACTION = (
+    "Sum of the payment account balances as of the last ledger compaction; "
+    "pending postings are not included yet."
+)
+
+
 class Bank(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     name: str
     rating: int
-    total_sum: int
+    total_sum: int = Field(description=_AS_OF_COMPACTION)
+    client_count: int
+    loan_total: int
+
+
+class BankSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str
+    atms: int
+    offices: int
+    employees: int
+    clients: int
+    payment_balance: int = Field(description=_AS_OF_COMPACTION)
+    loan_total: int
+
+
+class CacheStats(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
 
 
 class BankDetail(Bank):
@@ -34,6 +101,17 @@ class User(PersonModel):
     monthly_income: float
 
 
+class ScoringProgress(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    status: str
+    users_total: int
+    users_done: int
+    users_changed: int
+    elapsed: float
+    users_per_second: float
+    error: str | None
+
+
 class UserDetail(User):
     model_config = ConfigDict(from_attributes=True)
     banks: list["Bank"]
@@ -64,6 +142,40 @@ class CreditAccount(BaseModel):
     interest_rate: int
 
 
+class ScheduleRow(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    number: int
+    month: date
+    payment: float
+    interest: float
+    principal: float
+    balance: float
+
+
+class AmortizationSchedule(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    credit_account_id: int
+    payment: float
+    total_interest: float
+    rows: list[ScheduleRow]
+
+
+class CashFlowMonth(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    month: date
+    payment: float
+    interest: float
+    principal: float
+    outstanding: float
+
+
+class PortfolioCashFlows(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    bank_id: int
+    loans: int
+    months: list[CashFlowMonth]
+
+
 class CreditAccountDetail(CreditAccount):
     model_config = ConfigDict(from_attributes=True)
     user: User | None
@@ -74,12 +186,45 @@ class CreditAccountDetail(CreditAccount):
 
 class PaymentAccount(BaseModel):
     model_config = ConfigDict(from_attributes=True)
-    balance: int
+    # the current balance, pending ledger postings included; the second alias of
+    # each field reads a dump of this model back (e.g. a replayed response)
+    balance: int = Field(validation_alias=AliasChoices("current_balance", "balance"))
+    # the balance as of the last ledger compaction, ``balance`` on the ORM account
+    snapshot_balance: int = Field(
+        validation_alias=AliasChoices("snapshot_balance", "balance")
+    )
 
     user_id: int
     bank_id: int
 
 
+class TransferResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    source_id: int
+    target_id: int
+    amount: int
+    source_balance: int
+    target_balance: int
+    attempts: int
+
+
+class LedgerPosting(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    payment_account_id: int
+    amount: int
+    compacted: bool
+    created_at: datetime
+
+
+class LedgerBalance(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    payment_account_id: int
+    balance: int
+    snapshot_balance: int
+    pending_postings: int
+
+
 class PaymentAccountDetail(PaymentAccount):
     model_config = ConfigDict(from_attributes=True)
     user: "User| None"
@@ -110,3 +255,32 @@ class BankOfficeDetail(BankOffice):
     model_config = ConfigDict(from_attributes=True)
     bank: "Bank | None"
     atms: list["BankAtm"]
+
+
+@cache
+def _expanded(detail: type[BaseModel], expand: frozenset[str]) -> type[BaseModel]:
+    base = detail.__base__
+    if not expand:
+        return base
+    relations = detail.model_fields.keys() - base.model_fields.keys()
+    if expand == relations:
+        return detail
+    fields = {name: (detail.model_fields[name].annotation, ...) for name in expand}
+    return create_model(
+        f"{base.__name__}With{''.join(n.title() for n in sorted(expand))}",
+        __base__=base,
+        **fields,
+    )
+
+
+def expanded(detail: type[BaseModel], expand: Iterable[str] | None) -> type[BaseModel]:
+    """Shape of ``detail`` carrying only the requested relationships; the plain
+    model when nothing is expanded and ``detail`` itself when everything is (or
+    ``expand`` is absent, see ``loading.expansion``)."""
+    relations = detail.model_fields.keys() - detail.__base__.model_fields.keys()
+    return _expanded(detail, frozenset(expansion(expand, relations)))
+
+
+@cache
+def with_id(model: type[BaseModel]) -> type[BaseModel]:
+    return create_model(f"{model.__name__}WithId", __base__=model, id=(int, ...))
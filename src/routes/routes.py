@@ -1,74 +1,219 @@
-from typing import Iterable
+from dataclasses import asdict
+from typing import Annotated, Any
 
-from advanced_alchemy.exceptions import NotFoundError
+from advanced_alchemy.exceptions import IntegrityError, NotFoundError
 from dishka.integrations.fastapi import DishkaRoute, FromDishka
-from fastapi import APIRouter, HTTPException
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from starlette import status
 
-from src.routes import response_models
+from src.metrics import METRICS_PATH, Metrics
+from src.routes import conditional, dependencies, response_models
+from src.routes.idempotency import IdempotencyStore
+from src.routes.serialization import ResponseRenderer
+from src.routes.streaming import ndjson_response, upload_rows
 from src.schemas import schemas as request_schemas
 from src.services import exceptions as services_exceptions
 from src.services import services
+from src.services.importing import ImportFormat
+from src.services.scoring import ScoringJob
 
 bank_route = APIRouter(prefix="/bank", tags=["Bank"], route_class=DishkaRoute)
 
 
+@bank_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_banks(service: FromDishka[services.BankService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.Bank)
+    )
+
+
 @bank_route.get(
     "/",
-    response_model=Iterable[response_models.BankDetail],
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.BankDetail]}},
+    status_code=status.HTTP_200_OK,
+)
+async def get_all_banks(
+    service: FromDishka[services.BankService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    expand: dependencies.BankExpand = None,
+):
+    try:
+        result = await service.paginate(
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except services_exceptions.InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.BankDetail, expand)
+    return renderer.render_page(shape, result)
+
+
+@bank_route.get(
+    "/cache/stats/",
+    response_model=response_models.CacheStats | None,
+    status_code=status.HTTP_200_OK,
+)
+async def get_bank_cache_stats(service: FromDishka[services.BankService]):
+    return service.cache_stats()
+
+
+@bank_route.get(
+    "/summary/",
+    response_model=list[response_models.BankSummary],
     status_code=status.HTTP_200_OK,
 )
-async def get_all_banks(service: FromDishka[services.BankService]):
-    return await service.list()
+async def get_bank_summaries(service: FromDishka[services.BankService]):
+    return await service.summaries()
+
+
+@bank_route.get(
+    "/summary/{pk}",
+    response_model=response_models.BankSummary,
+    status_code=status.HTTP_200_OK,
+)
+async def get_bank_summary(service: FromDishka[services.BankService], pk: int):
+    try:
+        return await service.summary_by_id(pk)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@bank_route.get(
+    "/portfolio/{pk}",
+    response_model=response_models.PortfolioCashFlows,
+    status_code=status.HTTP_200_OK,
+)
+async def get_bank_portfolio(
+    service: FromDishka[services.CreditAccountService],
+    pk: int,
+    projection: Annotated[dependencies.ProjectionParams, Depends()],
+):
+    try:
+        return await service.portfolio(
+            pk, start=projection.start, months=projection.months
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @bank_route.get(
-    "/{id}", response_model=response_models.BankDetail, status_code=status.HTTP_200_OK
+    "/{id}",
+    response_model=None,
+    responses={200: {"model": response_models.BankDetail}},
+    status_code=status.HTTP_200_OK,
 )
-async def get_bank_by_id(service: FromDishka[services.BankService], pk: int):
+async def get_bank_by_id(
+    service: FromDishka[services.BankService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.BankExpand = None,
+):
     try:
-        return await service.get_by_id(pk)
+        result = service.cached("id", pk, expand)
+        if result is None:
+            etag = await service.etag_by_id(pk, expand)
+            if conditional.is_not_modified(request, etag):
+                return conditional.not_modified(etag)
+            result = await service.get_by_id(pk, expand)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # from the bank served, so the tag always matches the body
+    etag = service.etag_of(result, expand)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.BankDetail, expand)
+    return renderer.render(shape, result, response)
 
 
 @bank_route.get(
     "/name/{name}",
-    response_model=response_models.BankDetail,
+    response_model=None,
+    responses={200: {"model": response_models.BankDetail}},
     status_code=status.HTTP_200_OK,
 )
-async def get_bank_by_name(service: FromDishka[services.BankService], name: str):
+async def get_bank_by_name(
+    service: FromDishka[services.BankService],
+    renderer: FromDishka[ResponseRenderer],
+    name: str,
+    request: Request,
+    response: Response,
+    expand: dependencies.BankExpand = None,
+):
     try:
-        return await service.get_by_name(name)
+        result = service.cached("name", name, expand)
+        if result is None:
+            etag = await service.etag_by_name(name, expand)
+            if conditional.is_not_modified(request, etag):
+                return conditional.not_modified(etag)
+            result = await service.get_by_name(name, expand)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    etag = service.etag_of(result, expand)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.BankDetail, expand)
+    return renderer.render(shape, result, response)
 
 
 @bank_route.put(
     "/", response_model=response_models.Bank, status_code=status.HTTP_201_CREATED
 )
 async def create_bank(
-    service: FromDishka[services.BankService], schema: request_schemas.BankCreate
+    service: FromDishka[services.BankService],
+    idempotency: FromDishka[IdempotencyStore],
+    schema: request_schemas.BankCreate,
+    key: dependencies.IdempotencyKey = None,
+    on_conflict: dependencies.OnConflict = "raise",
 ):
     try:
-        return await service.create(schema)
+        return await idempotency.run(
+            key,
+            schema,
+            response_models.Bank,
+            lambda: service.create(schema, on_conflict),
+            query={"on_conflict": on_conflict},
+        )
     except services_exceptions.AlreadyExistsError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @bank_route.delete(
-    "/{pk}", response_model=response_models.BankDetail, status_code=status.HTTP_200_OK
+    "/{pk}",
+    response_model=response_models.with_id(response_models.Bank),
+    status_code=status.HTTP_200_OK,
 )
 async def delete_bank_by_id(service: FromDishka[services.BankService], pk: int):
     try:
         return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except services_exceptions.StillReferencedError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @bank_route.delete(
     "/name/{name}",
-    response_model=response_models.BankDetail,
+    response_model=response_models.with_id(response_models.Bank),
     status_code=status.HTTP_200_OK,
 )
 async def delete_bank_by_name(service: FromDishka[services.BankService], name: str):
@@ -76,6 +221,8 @@ async def delete_bank_by_name(service: FromDishka[services.BankService], name: s
         return await service.delete_by_name(name)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except services_exceptions.StillReferencedError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @bank_route.patch(
@@ -95,25 +242,71 @@ bank_office_route = APIRouter(
 )
 
 
+@bank_office_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_offices(service: FromDishka[services.BankOfficeService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.BankOffice)
+    )
+
+
 @bank_office_route.get(
     "/",
-    response_model=Iterable[response_models.BankOfficeDetail],
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.BankOfficeDetail]}},
     status_code=status.HTTP_200_OK,
 )
-async def get_all_offices(service: FromDishka[services.BankOfficeService]):
-    return await service.list(load="*")
+async def get_all_offices(
+    service: FromDishka[services.BankOfficeService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    filters: Annotated[dependencies.StatusFilterParams, Depends()],
+    expand: dependencies.BankOfficeExpand = None,
+):
+    try:
+        result = await service.paginate(
+            *service.status_filters(
+                filters.bank_id, filters.status_all, filters.status_any
+            ),
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except (
+        services_exceptions.InvalidCursorError,
+        services_exceptions.InvalidFilterError,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.BankOfficeDetail, expand)
+    return renderer.render_page(shape, result)
 
 
 @bank_office_route.get(
     "/{pk}",
-    response_model=response_models.BankOfficeDetail,
+    response_model=None,
+    responses={200: {"model": response_models.BankOfficeDetail}},
     status_code=status.HTTP_200_OK,
 )
-async def get_by_office_id(service: FromDishka[services.BankOfficeService], pk: int):
+async def get_by_office_id(
+    service: FromDishka[services.BankOfficeService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.BankOfficeExpand = None,
+):
     try:
-        return await service.get(pk, load="*")
+        etag = await service.etag_by_id(pk, expand)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+        result = await service.get(pk, load=service.loads(expand))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.BankOfficeDetail, expand)
+    return renderer.render(shape, result, response)
 
 
 @bank_office_route.put(
@@ -123,19 +316,47 @@ async def get_by_office_id(service: FromDishka[services.BankOfficeService], pk:
 )
 async def create_office(
     service: FromDishka[services.BankOfficeService],
+    idempotency: FromDishka[IdempotencyStore],
     schema: request_schemas.BankOfficeCreate,
+    key: dependencies.IdempotencyKey = None,
 ):
-    return await service.create(schema.model_dump(), auto_commit=True)
+    return await idempotency.run(
+        key,
+        schema,
+        response_models.BankOffice,
+        lambda: service.create(schema.model_dump(), auto_commit=True),
+    )
+
+
+@bank_office_route.delete(
+    "/",
+    response_model=response_models.BulkDeleteResult,
+    status_code=status.HTTP_200_OK,
+)
+async def delete_offices(
+    service: FromDishka[services.BankOfficeService],
+    filters: Annotated[dependencies.StatusFilterParams, Depends()],
+    batch: Annotated[dependencies.DeleteBatchParams, Depends()],
+):
+    try:
+        return await service.delete_in_batches(
+            *service.status_filters(
+                filters.bank_id, filters.status_all, filters.status_any
+            ),
+            batch_size=batch.batch_size,
+        )
+    except services_exceptions.InvalidFilterError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @bank_office_route.delete(
     "/{pk}",
-    response_model=response_models.BankOfficeDetail,
+    response_model=response_models.with_id(response_models.BankOffice),
     status_code=status.HTTP_200_OK,
 )
 async def delete_office_by_id(service: FromDishka[services.BankOfficeService], pk: int):
     try:
-        return await service.delete(pk, load="*", auto_commit=True)
+        return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -151,7 +372,9 @@ async def update_office(
 ):
     try:
         return await service.partial_update(
-            schema.id, **schema.model_dump(exclude={"id"}, exclude_none=True)
+            schema.id,
+            load=service.loads(["bank", "atms"]),
+            **schema.model_dump(exclude={"id"}, exclude_none=True),
         )
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -162,25 +385,71 @@ bank_atm_route = APIRouter(
 )
 
 
+@bank_atm_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_bank_atms(service: FromDishka[services.BankAtmService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.BankAtm)
+    )
+
+
 @bank_atm_route.get(
     "/",
-    response_model=Iterable[response_models.BankAtmDetail],
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.BankAtmDetail]}},
     status_code=status.HTTP_200_OK,
 )
-async def get_all_bank_atms(service: FromDishka[services.BankAtmService]):
-    return await service.list(load="*")
+async def get_all_bank_atms(
+    service: FromDishka[services.BankAtmService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    filters: Annotated[dependencies.StatusFilterParams, Depends()],
+    expand: dependencies.BankAtmExpand = None,
+):
+    try:
+        result = await service.paginate(
+            *service.status_filters(
+                filters.bank_id, filters.status_all, filters.status_any
+            ),
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except (
+        services_exceptions.InvalidCursorError,
+        services_exceptions.InvalidFilterError,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.BankAtmDetail, expand)
+    return renderer.render_page(shape, result)
 
 
 @bank_atm_route.get(
     "/{pk}",
-    response_model=response_models.BankAtmDetail,
+    response_model=None,
+    responses={200: {"model": response_models.BankAtmDetail}},
     status_code=status.HTTP_200_OK,
 )
-async def get_bank_atm_by_id(service: FromDishka[services.BankAtmService], pk: int):
+async def get_bank_atm_by_id(
+    service: FromDishka[services.BankAtmService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.BankAtmExpand = None,
+):
     try:
-        return await service.get(pk, load="*")
+        etag = await service.etag_by_id(pk, expand)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+        result = await service.get(pk, load=service.loads(expand))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.BankAtmDetail, expand)
+    return renderer.render(shape, result, response)
 
 
 @bank_atm_route.put(
@@ -190,19 +459,89 @@ async def get_bank_atm_by_id(service: FromDishka[services.BankAtmService], pk: i
 )
 async def create_bank_atm(
     service: FromDishka[services.BankAtmService],
+    idempotency: FromDishka[IdempotencyStore],
     schema: request_schemas.BankAtmCreate,
+    key: dependencies.IdempotencyKey = None,
+):
+    return await idempotency.run(
+        key,
+        schema,
+        response_models.BankAtm,
+        lambda: service.create(schema.model_dump(), auto_commit=True),
+    )
+
+
+@bank_atm_route.put(
+    "/bulk",
+    response_model=response_models.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_bank_atms(
+    service: FromDishka[services.BankAtmService],
+    items: Annotated[list[Any], Body()],
+    atomic: bool = False,
+):
+    try:
+        return await service.bulk_create(items, atomic=atomic)
+    except services_exceptions.BulkValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[asdict(error) for error in e.errors],
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@bank_atm_route.put(
+    "/import",
+    response_model=response_models.ImportReport,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_bank_atms(
+    service: FromDishka[services.BankAtmService],
+    file: UploadFile,
+    fmt: ImportFormat | None = None,
+    checkpoint: str | None = None,
 ):
-    return await service.create(schema.model_dump(), auto_commit=True)
+    try:
+        return await service.import_rows(upload_rows(file, fmt), checkpoint=checkpoint)
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@bank_atm_route.delete(
+    "/",
+    response_model=response_models.BulkDeleteResult,
+    status_code=status.HTTP_200_OK,
+)
+async def delete_bank_atms(
+    service: FromDishka[services.BankAtmService],
+    filters: Annotated[dependencies.StatusFilterParams, Depends()],
+    batch: Annotated[dependencies.DeleteBatchParams, Depends()],
+    office_id: int | None = None,
+):
+    try:
+        return await service.delete_in_batches(
+            *service.status_filters(
+                filters.bank_id,
+                filters.status_all,
+                filters.status_any,
+                office_id=office_id,
+            ),
+            batch_size=batch.batch_size,
+        )
+    except services_exceptions.InvalidFilterError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @bank_atm_route.delete(
     "/{pk}",
-    response_model=response_models.BankAtmDetail,
+    response_model=response_models.with_id(response_models.BankAtm),
     status_code=status.HTTP_200_OK,
 )
 async def bank_atm_by_id(service: FromDishka[services.BankAtmService], pk: int):
     try:
-        return await service.delete(pk, load="*", auto_commit=True)
+        return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -214,11 +553,13 @@ async def bank_atm_by_id(service: FromDishka[services.BankAtmService], pk: int):
 )
 async def update_bank_atm(
     service: FromDishka[services.BankAtmService],
-    schema: request_schemas.BankOfficeUpdate,
+    schema: request_schemas.BankAtmPartialUpdate,
 ):
     try:
         return await service.partial_update(
-            schema.id, **schema.model_dump(exclude={"id"}, exclude_none=True)
+            schema.id,
+            load=service.loads(["office", "bank"]),
+            **schema.model_dump(exclude={"id"}, exclude_none=True),
         )
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -227,40 +568,175 @@ async def update_bank_atm(
 user_route = APIRouter(prefix="/user", tags=["User"], route_class=DishkaRoute)
 
 
+@user_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_users(service: FromDishka[services.UserService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.User)
+    )
+
+
 @user_route.get(
     "/",
-    response_model=Iterable[response_models.UserDetail],
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.UserDetail]}},
     status_code=status.HTTP_200_OK,
 )
-async def get_all_users(service: FromDishka[services.UserService]):
-    return await service.list(load="*")
+async def get_all_users(
+    service: FromDishka[services.UserService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    expand: dependencies.UserExpand = None,
+):
+    try:
+        result = await service.paginate(
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except services_exceptions.InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.UserDetail, expand)
+    return renderer.render_page(shape, result)
 
 
 @user_route.get(
-    "/{id}", response_model=response_models.UserDetail, status_code=status.HTTP_200_OK
+    "/search",
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.UserDetail]}},
+    status_code=status.HTTP_200_OK,
+)
+async def search_users(
+    service: FromDishka[services.UserService],
+    renderer: FromDishka[ResponseRenderer],
+    search: Annotated[dependencies.SearchParams, Depends()],
+    expand: dependencies.UserExpand = None,
+):
+    try:
+        result = await service.search(
+            search.q,
+            cursor=search.cursor,
+            limit=search.limit,
+            load=service.loads(expand),
+        )
+    except (
+        services_exceptions.InvalidCursorError,
+        services_exceptions.InvalidFilterError,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.UserDetail, expand)
+    return renderer.render_page(shape, result)
+
+
+@user_route.get(
+    "/{id}",
+    response_model=None,
+    responses={200: {"model": response_models.UserDetail}},
+    status_code=status.HTTP_200_OK,
 )
-async def get_user_by_id(service: FromDishka[services.UserService], pk: int):
+async def get_user_by_id(
+    service: FromDishka[services.UserService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.UserExpand = None,
+):
     try:
-        return await service.get(pk, load="*")
+        etag = await service.etag_by_id(pk, expand)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+        result = await service.get(pk, load=service.loads(expand))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.UserDetail, expand)
+    return renderer.render(shape, result, response)
+
+
+@user_route.post(
+    "/scores/recompute",
+    response_model=response_models.ScoringProgress,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def recompute_credit_scores(job: FromDishka[ScoringJob]):
+    return job.start()
+
+
+@user_route.get(
+    "/scores/progress",
+    response_model=response_models.ScoringProgress | None,
+    status_code=status.HTTP_200_OK,
+)
+async def get_credit_scoring_progress(job: FromDishka[ScoringJob]):
+    return job.progress
 
 
 @user_route.put(
     "/", response_model=response_models.User, status_code=status.HTTP_201_CREATED
 )
 async def create_user(
-    service: FromDishka[services.UserService], schema: request_schemas.UserCreate
+    service: FromDishka[services.UserService],
+    idempotency: FromDishka[IdempotencyStore],
+    schema: request_schemas.UserCreate,
+    key: dependencies.IdempotencyKey = None,
 ):
-    return await service.create(schema.model_dump(), auto_commit=True)
+    return await idempotency.run(
+        key,
+        schema,
+        response_models.User,
+        lambda: service.create(schema.model_dump(), auto_commit=True),
+    )
+
+
+@user_route.put(
+    "/bulk",
+    response_model=response_models.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_users(
+    service: FromDishka[services.UserService],
+    items: Annotated[list[Any], Body()],
+    atomic: bool = False,
+):
+    try:
+        return await service.bulk_create(items, atomic=atomic)
+    except services_exceptions.BulkValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[asdict(error) for error in e.errors],
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@user_route.put(
+    "/import",
+    response_model=response_models.ImportReport,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_users(
+    service: FromDishka[services.UserService],
+    file: UploadFile,
+    fmt: ImportFormat | None = None,
+    checkpoint: str | None = None,
+):
+    try:
+        return await service.import_rows(upload_rows(file, fmt), checkpoint=checkpoint)
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @user_route.delete(
-    "/{id}", response_model=response_models.UserDetail, status_code=status.HTTP_200_OK
+    "/{id}",
+    response_model=response_models.with_id(response_models.User),
+    status_code=status.HTTP_200_OK,
 )
 async def delete_user_by_id(service: FromDishka[services.UserService], pk: int):
     try:
-        return await service.delete(pk, load="*", auto_commit=True)
+        return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -284,25 +760,99 @@ employee_route = APIRouter(
 )
 
 
+@employee_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_employees(service: FromDishka[services.EmployeeService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.Employee)
+    )
+
+
 @employee_route.get(
     "/",
-    response_model=Iterable[response_models.EmployeeDetail],
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.EmployeeDetail]}},
+    status_code=status.HTTP_200_OK,
+)
+async def get_all_employees(
+    service: FromDishka[services.EmployeeService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    filters: Annotated[dependencies.StatusFilterParams, Depends()],
+    expand: dependencies.EmployeeExpand = None,
+):
+    try:
+        result = await service.paginate(
+            *service.status_filters(
+                filters.bank_id, filters.status_all, filters.status_any
+            ),
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except (
+        services_exceptions.InvalidCursorError,
+        services_exceptions.InvalidFilterError,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.EmployeeDetail, expand)
+    return renderer.render_page(shape, result)
+
+
+@employee_route.get(
+    "/search",
+    response_model=None,
+    responses={200: {"model": response_models.Page[response_models.EmployeeDetail]}},
     status_code=status.HTTP_200_OK,
 )
-async def get_all_employees(service: FromDishka[services.EmployeeService]):
-    return await service.list(load="*")
+async def search_employees(
+    service: FromDishka[services.EmployeeService],
+    renderer: FromDishka[ResponseRenderer],
+    search: Annotated[dependencies.SearchParams, Depends()],
+    expand: dependencies.EmployeeExpand = None,
+):
+    try:
+        result = await service.search(
+            search.q,
+            cursor=search.cursor,
+            limit=search.limit,
+            load=service.loads(expand),
+        )
+    except (
+        services_exceptions.InvalidCursorError,
+        services_exceptions.InvalidFilterError,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.EmployeeDetail, expand)
+    return renderer.render_page(shape, result)
 
 
 @employee_route.get(
     "/{id}",
-    response_model=response_models.EmployeeDetail,
+    response_model=None,
+    responses={200: {"model": response_models.EmployeeDetail}},
     status_code=status.HTTP_200_OK,
 )
-async def get_employee_by_id(service: FromDishka[services.EmployeeService], pk: int):
+async def get_employee_by_id(
+    service: FromDishka[services.EmployeeService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.EmployeeExpand = None,
+):
     try:
-        return await service.get(pk, load="*")
+        etag = await service.etag_by_id(pk, expand)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+        result = await service.get(pk, load=service.loads(expand))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.EmployeeDetail, expand)
+    return renderer.render(shape, result, response)
 
 
 @employee_route.put(
@@ -310,21 +860,68 @@ async def get_employee_by_id(service: FromDishka[services.EmployeeService], pk:
 )
 async def create_employee(
     service: FromDishka[services.EmployeeService],
+    idempotency: FromDishka[IdempotencyStore],
     schema: request_schemas.EmployeeCreate,
+    key: dependencies.IdempotencyKey = None,
+):
+    return await idempotency.run(
+        key,
+        schema,
+        response_models.Employee,
+        lambda: service.create(schema.model_dump(), auto_commit=True),
+    )
+
+
+@employee_route.put(
+    "/bulk",
+    response_model=response_models.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_employees(
+    service: FromDishka[services.EmployeeService],
+    items: Annotated[list[Any], Body()],
+    atomic: bool = False,
+):
+    try:
+        return await service.bulk_create(items, atomic=atomic)
+    except services_exceptions.BulkValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[asdict(error) for error in e.errors],
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@employee_route.put(
+    "/import",
+    response_model=response_models.ImportReport,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_employees(
+    service: FromDishka[services.EmployeeService],
+    file: UploadFile,
+    fmt: ImportFormat | None = None,
+    checkpoint: str | None = None,
 ):
-    return await service.create(schema.model_dump(), auto_commit=True)
+    try:
+        return await service.import_rows(upload_rows(file, fmt), checkpoint=checkpoint)
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @employee_route.delete(
     "/{id}",
-    response_model=response_models.EmployeeDetail,
+    response_model=response_models.with_id(response_models.Employee),
     status_code=status.HTTP_200_OK,
 )
 async def delete_employee_by_id(service: FromDishka[services.EmployeeService], pk: int):
     try:
-        return await service.get(pk, load="*")
+        return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except services_exceptions.StillReferencedError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @employee_route.patch(
@@ -347,25 +944,78 @@ credit_account_route = APIRouter(
 )
 
 
+@credit_account_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_credit_accounts(service: FromDishka[services.CreditAccountService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.CreditAccount)
+    )
+
+
 @credit_account_route.get(
     "/",
-    response_model=Iterable[response_models.CreditAccountDetail],
+    response_model=None,
+    responses={
+        200: {"model": response_models.Page[response_models.CreditAccountDetail]}
+    },
     status_code=status.HTTP_200_OK,
 )
-async def get_all_credit_accounts(service: FromDishka[services.CreditAccountService]):
-    return await service.list()
+async def get_all_credit_accounts(
+    service: FromDishka[services.CreditAccountService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    expand: dependencies.CreditAccountExpand = None,
+):
+    try:
+        result = await service.paginate(
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except services_exceptions.InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.CreditAccountDetail, expand)
+    return renderer.render_page(shape, result)
 
 
 @credit_account_route.get(
     "/{id}",
-    response_model=response_models.CreditAccountDetail,
+    response_model=None,
+    responses={200: {"model": response_models.CreditAccountDetail}},
     status_code=status.HTTP_200_OK,
 )
 async def get_credit_account_by_id(
+    service: FromDishka[services.CreditAccountService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.CreditAccountExpand = None,
+):
+    try:
+        etag = await service.etag_by_id(pk, expand)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+        result = await service.get(pk, load=service.loads(expand))
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.CreditAccountDetail, expand)
+    return renderer.render(shape, result, response)
+
+
+@credit_account_route.get(
+    "/schedule/{pk}",
+    response_model=response_models.AmortizationSchedule,
+    status_code=status.HTTP_200_OK,
+)
+async def get_credit_account_schedule(
     service: FromDishka[services.CreditAccountService], pk: int
 ):
     try:
-        return await service.get(pk, load="*")
+        return await service.schedule(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -377,21 +1027,66 @@ async def get_credit_account_by_id(
 )
 async def create_credit_account(
     service: FromDishka[services.CreditAccountService],
+    idempotency: FromDishka[IdempotencyStore],
     schema: request_schemas.CreditAccountCreate,
+    key: dependencies.IdempotencyKey = None,
 ):
-    return await service.create(schema.model_dump(), auto_commit=True)
+    return await idempotency.run(
+        key,
+        schema,
+        response_models.CreditAccount,
+        lambda: service.create(schema.model_dump(), auto_commit=True),
+    )
+
+
+@credit_account_route.put(
+    "/bulk",
+    response_model=response_models.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_credit_accounts(
+    service: FromDishka[services.CreditAccountService],
+    items: Annotated[list[Any], Body()],
+    atomic: bool = False,
+):
+    try:
+        return await service.bulk_create(items, atomic=atomic)
+    except services_exceptions.BulkValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[asdict(error) for error in e.errors],
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@credit_account_route.put(
+    "/import",
+    response_model=response_models.ImportReport,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_credit_accounts(
+    service: FromDishka[services.CreditAccountService],
+    file: UploadFile,
+    fmt: ImportFormat | None = None,
+    checkpoint: str | None = None,
+):
+    try:
+        return await service.import_rows(upload_rows(file, fmt), checkpoint=checkpoint)
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @credit_account_route.delete(
     "/{id}",
-    response_model=response_models.CreditAccountDetail,
+    response_model=response_models.with_id(response_models.CreditAccount),
     status_code=status.HTTP_200_OK,
 )
 async def delete_credit_account_by_id(
     service: FromDishka[services.CreditAccountService], pk: int
 ):
     try:
-        return await service.get(pk, load="*")
+        return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -416,27 +1111,66 @@ payment_account_route = APIRouter(
 )
 
 
+@payment_account_route.get(
+    "/export/", response_class=StreamingResponse, status_code=status.HTTP_200_OK
+)
+async def export_payment_accounts(service: FromDishka[services.PaymentAccountService]):
+    return ndjson_response(
+        service.stream(), response_models.with_id(response_models.PaymentAccount)
+    )
+
+
 @payment_account_route.get(
     "/",
-    response_model=Iterable[response_models.PaymentAccountDetail],
+    response_model=None,
+    responses={
+        200: {"model": response_models.Page[response_models.PaymentAccountDetail]}
+    },
     status_code=status.HTTP_200_OK,
 )
-async def get_all_credit_accounts(service: FromDishka[services.PaymentAccountService]):
-    return await service.list(load="*")
+async def get_all_payment_accounts(
+    service: FromDishka[services.PaymentAccountService],
+    renderer: FromDishka[ResponseRenderer],
+    page: Annotated[dependencies.PageParams, Depends()],
+    expand: dependencies.PaymentAccountExpand = None,
+):
+    try:
+        result = await service.paginate(
+            cursor=page.cursor,
+            limit=page.limit,
+            reverse=page.reverse,
+            load=service.loads(expand),
+        )
+    except services_exceptions.InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shape = response_models.expanded(response_models.PaymentAccountDetail, expand)
+    return renderer.render_page(shape, result)
 
 
 @payment_account_route.get(
     "/{id}",
-    response_model=response_models.PaymentAccountDetail,
+    response_model=None,
+    responses={200: {"model": response_models.PaymentAccountDetail}},
     status_code=status.HTTP_200_OK,
 )
 async def get_credit_account_by_id(
-    service: FromDishka[services.PaymentAccountService], pk: int
+    service: FromDishka[services.PaymentAccountService],
+    renderer: FromDishka[ResponseRenderer],
+    pk: int,
+    request: Request,
+    response: Response,
+    expand: dependencies.PaymentAccountExpand = None,
 ):
     try:
-        return await service.get(pk, load="*")
+        etag = await service.etag_by_id(pk, expand)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+        result = await service.get(pk, load=service.loads(expand))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers["ETag"] = etag
+    shape = response_models.expanded(response_models.PaymentAccountDetail, expand)
+    return renderer.render(shape, result, response)
 
 
 @payment_account_route.put(
@@ -446,35 +1180,155 @@ async def get_credit_account_by_id(
 )
 async def create_payment_account(
     service: FromDishka[services.PaymentAccountService],
+    idempotency: FromDishka[IdempotencyStore],
     schema: request_schemas.PaymentAccountCreate,
+    key: dependencies.IdempotencyKey = None,
+):
+    return await idempotency.run(
+        key,
+        schema,
+        response_models.PaymentAccount,
+        lambda: service.create(schema.model_dump(), auto_commit=True),
+    )
+
+
+@payment_account_route.put(
+    "/bulk",
+    response_model=response_models.BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_payment_accounts(
+    service: FromDishka[services.PaymentAccountService],
+    items: Annotated[list[Any], Body()],
+    atomic: bool = False,
 ):
-    return await service.create(schema.model_dump(), auto_commit=True)
+    try:
+        return await service.bulk_create(items, atomic=atomic)
+    except services_exceptions.BulkValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[asdict(error) for error in e.errors],
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@payment_account_route.put(
+    "/import",
+    response_model=response_models.ImportReport,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_payment_accounts(
+    service: FromDishka[services.PaymentAccountService],
+    file: UploadFile,
+    fmt: ImportFormat | None = None,
+    checkpoint: str | None = None,
+):
+    try:
+        return await service.import_rows(upload_rows(file, fmt), checkpoint=checkpoint)
+    except IntegrityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @payment_account_route.delete(
     "/{id}",
-    response_model=response_models.PaymentAccountDetail,
+    response_model=response_models.with_id(response_models.PaymentAccount),
     status_code=status.HTTP_200_OK,
 )
 async def delete_payment_account_by_id(
     service: FromDishka[services.PaymentAccountService], pk: int
 ):
     try:
-        return await service.get(pk, load="*")
+        return await service.delete_by_id(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except services_exceptions.StillReferencedError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
-@payment_account_route.patch(
-    "/", response_model=response_models.PaymentAccount, status_code=status.HTTP_200_OK
+@payment_account_route.post(
+    "/transfer",
+    response_model=response_models.TransferResult,
+    status_code=status.HTTP_200_OK,
 )
-async def update_payment_account(
-    service: FromDishka[services.CreditAccountService],
-    schema: request_schemas.CreditAccountPartialUpdate,
+async def transfer_between_payment_accounts(
+    service: FromDishka[services.PaymentAccountService],
+    idempotency: FromDishka[IdempotencyStore],
+    schema: request_schemas.Transfer,
+    key: dependencies.IdempotencyKey = None,
 ):
     try:
-        return await service.partial_update(
-            schema.id, **schema.model_dump(exclude={"id"}, exclude_none=True)
+        return await idempotency.run(
+            key,
+            schema,
+            response_models.TransferResult,
+            lambda: service.transfer(schema.source_id, schema.target_id, schema.amount),
         )
+    except (
+        NotFoundError,
+        services_exceptions.InvalidTransferError,
+        services_exceptions.InsufficientFundsError,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except services_exceptions.TransferConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@payment_account_route.post(
+    "/postings",
+    response_model=response_models.LedgerPosting,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_posting(
+    service: FromDishka[services.PaymentAccountService],
+    idempotency: FromDishka[IdempotencyStore],
+    schema: request_schemas.Posting,
+    key: dependencies.IdempotencyKey = None,
+):
+    try:
+        return await idempotency.run(
+            key,
+            schema,
+            response_models.LedgerPosting,
+            lambda: service.post(schema.payment_account_id, schema.amount),
+        )
+    except (NotFoundError, services_exceptions.InsufficientFundsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@payment_account_route.get(
+    "/postings/{pk}",
+    response_model=response_models.Page[response_models.LedgerPosting],
+    status_code=status.HTTP_200_OK,
+)
+async def get_postings(
+    service: FromDishka[services.PaymentAccountService],
+    pk: int,
+    page: Annotated[dependencies.PageParams, Depends()],
+):
+    try:
+        return await service.postings(pk, cursor=page.cursor, limit=page.limit)
+    except services_exceptions.InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@payment_account_route.get(
+    "/balance/{pk}",
+    response_model=response_models.LedgerBalance,
+    status_code=status.HTTP_200_OK,
+)
+async def get_ledger_balance(
+    service: FromDishka[services.PaymentAccountService], pk: int
+):
+    try:
+        return await service.ledger_balance(pk)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+metrics_route = APIRouter(tags=["Metrics"], route_class=DishkaRoute)
+
+
+@metrics_route.get(METRICS_PATH, include_in_schema=False)
+async def get_metrics(metrics: FromDishka[Metrics]):
+    return Response(generate_latest(metrics.registry), media_type=CONTENT_TYPE_LATEST)
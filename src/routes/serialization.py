@@ -0,0 +1,108 @@
+import types
+from functools import cache
+from operator import attrgetter
+from typing import Any, Callable, Union, get_args, get_origin
+
+import orjson
+from fastapi import Response
+from pydantic import AliasChoices, BaseModel
+from pydantic.fields import FieldInfo
+
+from src.routes.response_models import Page
+
+Dumper = Callable[[Any], Any]
+
+_MISSING = object()
+
+
+def _field_dumper(annotation: Any) -> Dumper | None:
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        inner = [arg for arg in get_args(annotation) if arg is not type(None)]
+        dump = _field_dumper(inner[0]) if len(inner) == 1 else None
+        return (lambda v: None if v is None else dump(v)) if dump else None
+    if origin is list:
+        dump = _field_dumper(get_args(annotation)[0])
+        return (lambda v: [dump(item) for item in v]) if dump else list
+    if annotation is float:
+        return float
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return dumper(annotation)
+    return None
+
+
+def _field_reader(name: str, field: FieldInfo) -> Dumper:
+    """Reads a field off an object the way ``from_attributes`` validation does:
+    from its validation alias, the first of ``AliasChoices`` the object has."""
+    alias = field.validation_alias
+    if not isinstance(alias, AliasChoices):
+        return attrgetter(alias if isinstance(alias, str) else name)
+    choices = [choice for choice in alias.choices if isinstance(choice, str)]
+
+    def read(obj: Any) -> Any:
+        for choice in choices:
+            value = getattr(obj, choice, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise AttributeError(choices[0])
+
+    return read
+
+
+@cache
+def dumper(model: type[BaseModel]) -> Dumper:
+    """Compiles ``model`` into a function turning an ORM object (or any object with
+    the same attributes) into JSON-ready builtins without pydantic validation."""
+    model.model_rebuild()
+    plan = [
+        (name, _field_reader(name, field), _field_dumper(field.annotation))
+        for name, field in model.model_fields.items()
+    ]
+
+    def dump(obj: Any) -> dict[str, Any]:
+        return {
+            name: convert(read(obj)) if convert else read(obj)
+            for name, read, convert in plan
+        }
+
+    return dump
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+class ResponseRenderer:
+    """Turns service results into responses. The default path validates through
+    the pydantic shape; with ``fast`` the precompiled dumper output is encoded by
+    orjson directly, skipping re-validation of data that came from our own ORM."""
+
+    def __init__(self, fast: bool = False) -> None:
+        self.fast = fast
+
+    def render(
+        self, shape: type[BaseModel], obj: Any, response: Response | None = None
+    ) -> Any:
+        if not self.fast:
+            return shape.model_validate(obj)
+        # a returned Response bypasses FastAPI's merge of the injected one
+        headers = {
+            k: v
+            for k, v in (response.headers.items() if response else ())
+            if k != "content-length"
+        }
+        return ORJSONResponse(dumper(shape)(obj), headers=headers)
+
+    def render_page(self, shape: type[BaseModel], page: Any) -> Any:
+        if not self.fast:
+            return Page[shape].model_validate(page)
+        dump = dumper(shape)
+        return ORJSONResponse(
+            {
+                "items": [dump(item) for item in page.items],
+                "next_cursor": page.next_cursor,
+            }
+        )
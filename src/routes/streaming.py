@@ -0,0 +1,34 @@
+import io
+from pathlib import PurePath
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from fastapi import UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.services.importing import ImportFormat, parse_rows
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _ndjson_lines(
+    partitions: AsyncIterator[Sequence[Any]], model: type[BaseModel]
+) -> AsyncIterator[bytes]:
+    async for partition in partitions:
+        yield "".join(
+            model.model_validate(item).model_dump_json() + "\n" for item in partition
+        ).encode()
+
+
+def ndjson_response(
+    partitions: AsyncIterator[Sequence[Any]], model: type[BaseModel]
+) -> StreamingResponse:
+    return StreamingResponse(
+        _ndjson_lines(partitions, model), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+def upload_rows(file: UploadFile, fmt: ImportFormat | None = None) -> Iterator[Any]:
+    if fmt is None:
+        fmt = "csv" if PurePath(file.filename or "").suffix == ".csv" else "ndjson"
+    return parse_rows(io.TextIOWrapper(file.file, encoding="utf-8", newline=""), fmt)
@@ -1,6 +1,6 @@
 from datetime import date
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from pydantic.fields import Field
 
 from src.models.models import BankOfficeStatus, BankAtmStatus
@@ -98,8 +98,23 @@ class PaymentAccountCreate(BaseModel):
     bank_id: int
 
 
-class PaymentAccountPartialUpdate(BaseModel):
-    balance: int | None = None
+class Transfer(BaseModel):
+    source_id: int
+    target_id: int
+    amount: int = Field(gt=0)
+
+
+class Posting(BaseModel):
+    payment_account_id: int
+    # credit when positive, debit when negative
+    amount: int
+
+    @field_validator("amount")
+    @classmethod
+    def amount_not_zero(cls, amount: int) -> int:
+        if amount == 0:
+            raise ValueError("amount must not be zero")
+        return amount
 
 
 class BankAtmCreate(BaseModel):
@@ -112,6 +127,8 @@ class BankAtmCreate(BaseModel):
 
 
 class BankAtmPartialUpdate(BaseModel):
+    id: int
+
     name: str | None = None
     amortization: int | None = None
     status: BankAtmStatus | None = None
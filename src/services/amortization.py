@@ -0,0 +1,267 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from advanced_alchemy.exceptions import NotFoundError
+from sqlalchemy import exists, extract, select
+
+from src.models import models
+
+MAX_PROJECTION_MONTHS = 600
+PORTFOLIO_CHUNK_SIZE = 50_000
+
+
+@dataclass(slots=True)
+class ScheduleRow:
+    number: int
+    month: date
+    payment: float
+    interest: float
+    principal: float
+    balance: float
+
+
+@dataclass(slots=True)
+class AmortizationSchedule:
+    credit_account_id: int
+    payment: float
+    total_interest: float
+    rows: list[ScheduleRow]
+
+
+@dataclass(slots=True)
+class CashFlowMonth:
+    month: date
+    payment: float
+    interest: float
+    principal: float
+    outstanding: float
+
+
+@dataclass(slots=True)
+class PortfolioCashFlows:
+    bank_id: int
+    loans: int
+    months: list[CashFlowMonth]
+
+
+def monthly_rate(interest_rate: np.ndarray) -> np.ndarray:
+    """``CreditAccount.interest_rate`` is a yearly percentage."""
+    return np.asarray(interest_rate, dtype=np.float64) / 1200
+
+
+def annuity_payment(
+    principal: np.ndarray, rate: np.ndarray, months: np.ndarray
+) -> np.ndarray:
+    """Level monthly payment repaying ``principal`` over ``months`` at the monthly
+    ``rate``; element-wise over loans."""
+    principal = np.asarray(principal, dtype=np.float64)
+    months = np.maximum(np.asarray(months), 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = principal * rate / -np.expm1(-months * np.log1p(rate))
+    return np.where(rate == 0, principal / months, payment)
+
+
+def remaining_balance(
+    principal: np.ndarray, rate: np.ndarray, payment: np.ndarray, paid: np.ndarray
+) -> np.ndarray:
+    """Balance left after ``paid`` payments; element-wise over loans or months."""
+    growth = (1 + rate) ** paid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        repaid = np.where(rate == 0, payment * paid, payment * (growth - 1) / rate)
+    return np.maximum(principal * growth - repaid, 0)
+
+
+def _months(first: int, count: int) -> list[date]:
+    """``count`` month starts from ``first``, a month number (year * 12 + month - 1)."""
+    start = np.datetime64("0000-01", "M") + first
+    return (start + np.arange(count)).astype("datetime64[D]").tolist()
+
+
+def _month_number(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def _active_sum(
+    values: np.ndarray, start: np.ndarray, end: np.ndarray, horizon: int
+) -> np.ndarray:
+    """Per month of the horizon, the sum of ``values`` over the loans running in
+    it (``start`` inclusive, ``end`` exclusive): a difference array, O(loans +
+    months) instead of a loans x months matrix."""
+    start = np.clip(start, 0, horizon)
+    end = np.clip(end, 0, horizon)
+    size = horizon + 1
+    delta = np.bincount(start, values, minlength=size) - np.bincount(
+        end, values, minlength=size
+    )
+    return np.cumsum(delta[:horizon])
+
+
+def schedule(
+    principal: int, interest_rate: int, months: int
+) -> tuple[float, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Payment and per-month interest, principal and closing balance of one loan."""
+    rate = monthly_rate(np.array([interest_rate]))
+    payment = annuity_payment(np.array([principal]), rate, np.array([months]))
+    balance = remaining_balance(principal, rate, payment, np.arange(months + 1))
+    interest = balance[:-1] * rate
+    repaid = balance[:-1] - balance[1:]
+    return float(payment[0]), interest + repaid, interest, repaid, balance[1:]
+
+
+def project(
+    principal: np.ndarray,
+    interest_rate: np.ndarray,
+    months: np.ndarray,
+    start: np.ndarray,
+    horizon: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Monthly payments, interest, principal and outstanding balance summed over
+    a portfolio of annuity loans; ``start`` is each loan's first month relative to
+    the projection's first month and may be negative.
+
+    A loan's interest in its k-th month is ``(rP - A)(1 + r)^(k - 1) + A``, so
+    loans sharing a rate add up through one difference array of
+    ``(rP - A)(1 + r)^-start`` scaled by ``(1 + r)^month``: the cost is linear in
+    the number of loans plus months times distinct rates, never loans x months."""
+    principal = np.asarray(principal, dtype=np.float64)
+    rate = monthly_rate(interest_rate)
+    payment = annuity_payment(principal, rate, months)
+    end = start + months
+    month = np.arange(horizon)
+
+    payments = _active_sum(payment, start, end, horizon)
+    interest = payments.copy()
+    for value in np.unique(rate):
+        loans = rate == value
+        growth = 1 + value
+        interest += _active_sum(
+            (value * principal[loans] - payment[loans])
+            * growth ** -start[loans].astype(np.float64),
+            start[loans],
+            end[loans],
+            horizon,
+        ) * growth ** month.astype(np.float64)
+    repaid = payments - interest
+
+    # balance at the projection start: loans already running have paid
+    # -start instalments, the ones starting later are added when they do
+    running = start <= 0
+    opening = remaining_balance(
+        principal[running],
+        rate[running],
+        payment[running],
+        np.minimum(-start[running], months[running]),
+    ).sum()
+    starting = np.bincount(
+        np.minimum(start[~running], horizon), principal[~running], horizon + 1
+    )[:horizon]
+    outstanding = np.maximum(opening + np.cumsum(starting) - np.cumsum(repaid), 0)
+    return payments, interest, repaid, outstanding
+
+
+class AmortizationMixin:
+    """Loan arithmetic on ``CreditAccount`` columns with NumPy: one loan's schedule
+    and the cash flows of a bank's whole portfolio, fetched as column arrays."""
+
+    async def schedule(self, pk: int) -> AmortizationSchedule:
+        loan = models.CreditAccount
+        row = (
+            await self.repository.session.execute(  # type: ignore[attr-defined]
+                select(
+                    loan.loan_amount,
+                    loan.interest_rate,
+                    loan.load_duration_mounts,
+                    loan.loan_start_date,
+                ).where(loan.id == pk)
+            )
+        ).one_or_none()
+        if row is None:
+            raise NotFoundError(f"No item found when filtering by id={pk}")
+        principal, interest_rate, months, start = row
+        months = max(months, 1)
+        payment, payments, interest, repaid, balance = schedule(
+            principal, interest_rate, months
+        )
+        # the first instalment is due the month after the loan starts
+        due = _months(_month_number(start) + 1, months)
+        rows = [
+            ScheduleRow(number, *values)
+            for number, values in enumerate(
+                zip(
+                    due,
+                    payments.round(2).tolist(),
+                    interest.round(2).tolist(),
+                    repaid.round(2).tolist(),
+                    balance.round(2).tolist(),
+                ),
+                start=1,
+            )
+        ]
+        return AmortizationSchedule(
+            credit_account_id=pk,
+            payment=round(payment, 2),
+            total_interest=round(float(interest.sum()), 2),
+            rows=rows,
+        )
+
+    async def portfolio(
+        self,
+        bank_id: int,
+        start: date | None = None,
+        months: int | None = None,
+        chunk_size: int = PORTFOLIO_CHUNK_SIZE,
+    ) -> PortfolioCashFlows:
+        """Cash flows of every loan of a bank from ``start`` (this month by
+        default) for ``months`` months (until the last loan ends by default).
+        The bank is only looked up when it has no loans, to tell it from a
+        missing one."""
+        loan = models.CreditAccount
+        statement = (
+            select(
+                loan.loan_amount,
+                loan.interest_rate,
+                loan.load_duration_mounts,
+                # first instalment month, as a month number
+                extract("year", loan.loan_start_date) * 12
+                + extract("month", loan.loan_start_date),
+            )
+            .where(loan.bank_id == bank_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        session = self.repository.session  # type: ignore[attr-defined]
+        result = await session.stream(statement)
+        chunks = [
+            np.array(partition, dtype=np.int64)
+            async for partition in result.partitions()
+        ]
+        if not chunks and not await session.scalar(
+            select(exists().where(models.Bank.id == bank_id))
+        ):
+            raise NotFoundError(f"No item found when filtering by id={bank_id}")
+        columns = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+        principal, interest_rate, duration, first = columns.T
+        duration = np.maximum(duration, 1)
+
+        origin = _month_number(start or date.today())
+        offset = first - origin
+        if months is None:
+            last = int((offset + duration).max(initial=0))
+            months = min(max(last, 1), MAX_PROJECTION_MONTHS)
+        payments, interest, repaid, outstanding = project(
+            principal, interest_rate, duration, offset, months
+        )
+        return PortfolioCashFlows(
+            bank_id=bank_id,
+            loans=len(columns),
+            months=[
+                CashFlowMonth(*values)
+                for values in zip(
+                    _months(origin, months),
+                    payments.round(2).tolist(),
+                    interest.round(2).tolist(),
+                    repaid.round(2).tolist(),
+                    outstanding.round(2).tolist(),
+                )
+            ],
+        )
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import models
+from src.services.cache import bank_tags, invalidate_on_commit
+
+TOTALS = ("total_sum", "client_count", "loan_total")
+
+
+@dataclass(slots=True)
+class BankTotalsDrift:
+    bank_id: int
+    column: str
+    stored: int
+    expected: int
+
+
+def _recomputed() -> dict[str, Any]:
+    """Correlated subqueries recomputing each maintained column from scratch."""
+
+    def per_bank(model, aggregate):
+        return func.coalesce(
+            select(aggregate).where(model.bank_id == models.Bank.id).scalar_subquery(),
+            0,
+        )
+
+    return {
+        "total_sum": per_bank(
+            models.PaymentAccount, func.sum(models.PaymentAccount.balance)
+        ),
+        "client_count": per_bank(models.BankUser, func.count()),
+        "loan_total": per_bank(
+            models.CreditAccount, func.sum(models.CreditAccount.loan_amount)
+        ),
+    }
+
+
+async def lock_banks(
+    session: AsyncSession, payment_account_ids: Iterable[Any] | Select[Any]
+) -> None:
+    """Row-locks, in id order, the banks whose totals a write to these payment
+    accounts will change, before the accounts themselves: the totals triggers
+    would otherwise lock them in account order and two writers touching the same
+    banks through different accounts could deadlock."""
+    account = models.PaymentAccount
+    await lock_bank_ids(
+        session, select(account.bank_id).where(account.id.in_(payment_account_ids))
+    )
+
+
+async def lock_bank_ids(
+    session: AsyncSession, bank_ids: Iterable[Any] | Select[Any]
+) -> None:
+    """``lock_banks`` for writes that know the bank ids, e.g. new accounts."""
+    locked = await session.scalars(
+        select(models.Bank.id)
+        .where(models.Bank.id.in_(bank_ids))
+        .order_by(models.Bank.id)
+        .with_for_update()
+    )
+    invalidate_on_commit(
+        session, (tag for pk in locked for tag in bank_tags(bank_id=pk))
+    )
+
+
+class BankTotalsMixin:
+    """Checks and repairs the trigger-maintained ``Bank`` totals against a full
+    recomputation, e.g. after rows were changed with the triggers disabled.
+    ``total_sum`` follows the compacted ``PaymentAccount.balance``, so pending
+    ledger postings are not drift: they reach it when compaction folds them in."""
+
+    async def verify_totals(self) -> list[BankTotalsDrift]:
+        bank = models.Bank
+        recomputed = _recomputed()
+        columns = [
+            (getattr(bank, name), recomputed[name].label(f"expected_{name}"))
+            for name in TOTALS
+        ]
+        result = await self.repository.session.execute(  # type: ignore[attr-defined]
+            select(bank.id, *(c for pair in columns for c in pair)).order_by(bank.id)
+        )
+        drift = []
+        for row in result:
+            for index, name in enumerate(TOTALS):
+                stored, expected = row[1 + 2 * index], row[2 + 2 * index]
+                if stored != expected:
+                    drift.append(BankTotalsDrift(row[0], name, stored, expected))
+        return drift
+
+    async def rebuild_totals(self) -> int:
+        """Recomputes every bank's totals in one statement; returns the number of
+        banks that were off."""
+        bank = models.Bank
+        recomputed = _recomputed()
+        session = self.repository.session  # type: ignore[attr-defined]
+        result = await session.execute(
+            update(bank)
+            .where(
+                (bank.total_sum != recomputed["total_sum"])
+                | (bank.client_count != recomputed["client_count"])
+                | (bank.loan_total != recomputed["loan_total"])
+            )
+            .values(**recomputed, version=bank.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return result.rowcount
@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Mapping, Sequence
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+
+from src.services import exceptions
+from src.services.bank_totals import lock_bank_ids
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass(slots=True)
+class BulkItemError:
+    index: int
+    errors: list[dict[str, Any]]
+
+
+@dataclass(slots=True)
+class BulkCreateResult:
+    ids: list[int] = field(default_factory=list)
+    errors: list[BulkItemError] = field(default_factory=list)
+
+
+class BulkCreateMixin:
+    """Validates raw items against ``create_schema`` and inserts the valid ones in
+    batches of ``batch_size`` (one multi-row ``INSERT`` per batch) inside a single
+    transaction. Foreign keys are checked up front, so a row pointing at a
+    missing row fails on its own instead of failing its whole batch."""
+
+    create_schema: ClassVar[type[BaseModel]]
+    # inserts fire the bank totals triggers, see bank_totals.lock_banks
+    locks_banks: ClassVar[bool] = False
+
+    def validate_many(
+        self, items: Sequence[Any], offset: int = 0
+    ) -> tuple[dict[int, dict[str, Any]], list[BulkItemError]]:
+        """Valid rows by item index, and the errors of the invalid items."""
+        valid, errors = {}, []
+        for index, item in enumerate(items, start=offset):
+            try:
+                valid[index] = self.create_schema.model_validate(item).model_dump()
+            except ValidationError as e:
+                errors.append(
+                    BulkItemError(
+                        index=index,
+                        errors=e.errors(include_url=False, include_context=False),
+                    )
+                )
+        return valid, errors
+
+    async def check_references(
+        self, rows: Mapping[int, dict[str, Any]]
+    ) -> list[BulkItemError]:
+        """Errors for the rows whose foreign keys point at no row, one lookup
+        per foreign key. The rows found are key-share locked on Postgres so they
+        can't be deleted before the insert."""
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        session = self.repository.session  # type: ignore[attr-defined]
+        missing: dict[int, list[dict[str, Any]]] = {}
+        for key in sorted(model.__table__.foreign_keys, key=lambda k: k.parent.key):
+            name, target = key.parent.key, key.column
+            wanted = {row[name] for row in rows.values() if row.get(name) is not None}
+            if not wanted:
+                continue
+            found = set(
+                await session.scalars(
+                    select(target)
+                    .where(target.in_(wanted))
+                    .with_for_update(key_share=True)
+                )
+            )
+            for index, row in rows.items():
+                if row.get(name) is not None and row[name] not in found:
+                    missing.setdefault(index, []).append(
+                        {
+                            "type": "foreign_key",
+                            "loc": [name],
+                            "msg": f"{target.table.name} {row[name]} does not exist",
+                            "input": row[name],
+                        }
+                    )
+        return [BulkItemError(index=i, errors=missing[i]) for i in sorted(missing)]
+
+    async def insert_many(
+        self,
+        rows: Mapping[int, dict[str, Any]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> tuple[list[int], list[BulkItemError]]:
+        """Inserts the rows whose references exist; returns their ids and the
+        errors of the others."""
+        session = self.repository.session  # type: ignore[attr-defined]
+        if self.locks_banks:
+            await lock_bank_ids(session, {row["bank_id"] for row in rows.values()})
+        errors = await self.check_references(rows)
+        failed = {error.index for error in errors}
+        insertable = [row for index, row in rows.items() if index not in failed]
+        ids = []
+        for start in range(0, len(insertable), batch_size):
+            created = await self.create_many(  # type: ignore[attr-defined]
+                insertable[start : start + batch_size], auto_commit=False
+            )
+            ids.extend(m.id for m in created)
+        return ids, errors
+
+    async def bulk_create(
+        self,
+        items: Sequence[Any],
+        atomic: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> BulkCreateResult:
+        rows, errors = self.validate_many(items)
+        if errors and atomic:
+            raise exceptions.BulkValidationError(errors)
+        session = self.repository.session  # type: ignore[attr-defined]
+        try:
+            ids, failed = await self.insert_many(rows, batch_size)
+            if failed and atomic:
+                raise exceptions.BulkValidationError(failed)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        errors = sorted(errors + failed, key=lambda error: error.index)
+        return BulkCreateResult(ids=ids, errors=errors)
@@ -0,0 +1,241 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable, Mapping
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from src.models import models
+
+NEGATIVE = object()
+
+type Tag = tuple[str, Hashable]
+
+
+@dataclass(slots=True)
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+
+
+class EntityCache:
+    """Process-wide LRU with per-entry TTL. Entries carry tags so every key
+    derived from one entity (by id, by name, any ``expand`` variant) can be
+    invalidated at once. ``NEGATIVE`` marks a cached miss."""
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        # bumped on every invalidation, so a load that raced a write is not stored
+        self.version = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any, frozenset[Tag]]] = (
+            OrderedDict()
+        )
+        self._tagged: dict[Tag, set[Hashable]] = {}
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[Tag],
+        version: int | None = None,
+    ) -> None:
+        if self.maxsize <= 0 or version is not None and version != self.version:
+            return
+        ttl = self.negative_ttl if value is NEGATIVE else self.ttl
+        if key in self._entries:
+            self._drop(key)
+        tags = frozenset(tags)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *tags: Tag) -> None:
+        self.version += 1
+        for tag in tags:
+            for key in self._tagged.pop(tag, ()):
+                self._drop(key)
+
+    def clear(self) -> None:
+        self.version += 1
+        self._entries.clear()
+        self._tagged.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+
+def bank_tags(bank_id: Any = None, name: str | None = None) -> list[Tag]:
+    tags: list[Tag] = []
+    if bank_id is not None:
+        tags.append(("bank", bank_id))
+    if name is not None:
+        tags.append(("bank-name", name))
+    return tags
+
+
+CLEAR_ALL: Tag = ("*", None)
+
+# entities rendered inside a cached bank; writes to them invalidate that bank
+_BANK_CHILDREN = (models.BankOffice, models.BankAtm, models.Employee)
+# rows summed into the bank totals columns
+_BANK_TOTALS_SOURCES = (models.PaymentAccount, models.CreditAccount)
+
+
+def invalidate_on_commit(session: Session | AsyncSession, tags: Iterable[Tag]) -> None:
+    """Evicts ``tags`` once the session's transaction commits, for writes the
+    flush events can't see (bulk statements issued with known ids)."""
+    session.info.setdefault("cache_invalidations", set()).update(tags)
+
+
+async def invalidate_updated(
+    session: AsyncSession,
+    item: Any,
+    values: Mapping[str, Any],
+    previous: Mapping[str, Any] | None = None,
+) -> None:
+    """Evicts on commit what an ``INSERT`` or ``UPDATE ... RETURNING`` of ``item``
+    affects. ``values`` are the columns written; a bank name or bank_id they
+    overwrite is only known from ``previous``, without it the whole cache goes."""
+    previous = previous or {}
+    tags: list[Tag] = []
+    if isinstance(item, models.Bank):
+        tags += bank_tags(item.id, item.name)
+        if "name" in values:
+            tags += (
+                bank_tags(name=previous["name"]) if "name" in previous else [CLEAR_ALL]
+            )
+    elif isinstance(item, (*_BANK_CHILDREN, *_BANK_TOTALS_SOURCES)):
+        tags += bank_tags(bank_id=item.bank_id)
+        if "bank_id" in values:
+            tags += (
+                bank_tags(bank_id=previous["bank_id"])
+                if "bank_id" in previous
+                else [CLEAR_ALL]
+            )
+    elif isinstance(item, models.User):
+        bank_ids = await session.scalars(
+            select(models.BankUser.bank_id).where(models.BankUser.user_id == item.id)
+        )
+        tags += (tag for bank_id in bank_ids for tag in bank_tags(bank_id=bank_id))
+    invalidate_on_commit(session, tags)
+
+
+def invalidate_deleted(session: Session | AsyncSession, items: Iterable[Any]) -> None:
+    """Evicts on commit what a ``DELETE ... RETURNING`` of ``items`` affects. A
+    deleted user's bank memberships are gone along with it, so that clears the
+    whole cache."""
+    tags: list[Tag] = []
+    for item in items:
+        if isinstance(item, models.Bank):
+            tags += bank_tags(item.id, item.name)
+        elif isinstance(item, (*_BANK_CHILDREN, *_BANK_TOTALS_SOURCES)):
+            tags += bank_tags(bank_id=item.bank_id)
+        elif isinstance(item, models.User):
+            tags.append(CLEAR_ALL)
+    invalidate_on_commit(session, tags)
+
+
+def _current_and_previous(obj: Any, attr: str) -> list[Any]:
+    return [getattr(obj, attr), *inspect(obj).attrs[attr].history.deleted]
+
+
+def invalidating_session_class(cache: EntityCache) -> type[Session]:
+    """A ``Session`` subclass that collects the banks touched by a flush and
+    evicts them from ``cache`` once the transaction commits."""
+
+    class InvalidatingSession(Session):
+        pass
+
+    def pending(session: Session) -> set[Tag]:
+        return session.info.setdefault("cache_invalidations", set())
+
+    @event.listens_for(InvalidatingSession, "before_flush")
+    def collect_users(session: Session, flush_context: UOWTransaction, _) -> None:
+        # bank_user rows of deleted users are gone after the flush, look them up now
+        user_ids = [
+            obj.id
+            for obj in (*session.dirty, *session.deleted)
+            if isinstance(obj, models.User)
+        ]
+        if user_ids:
+            tags = pending(session)
+            bank_ids = session.scalars(
+                select(models.BankUser.bank_id).where(
+                    models.BankUser.user_id.in_(user_ids)
+                )
+            )
+            for bank_id in bank_ids:
+                tags.update(bank_tags(bank_id=bank_id))
+
+    @event.listens_for(InvalidatingSession, "after_flush")
+    def collect(session: Session, flush_context: UOWTransaction) -> None:
+        tags = pending(session)
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, models.Bank):
+                tags.update(bank_tags(bank_id=obj.id))
+                for name in _current_and_previous(obj, "name"):
+                    tags.update(bank_tags(name=name))
+            elif isinstance(obj, (*_BANK_CHILDREN, *_BANK_TOTALS_SOURCES)):
+                for bank_id in _current_and_previous(obj, "bank_id"):
+                    tags.update(bank_tags(bank_id=bank_id))
+
+    @event.listens_for(InvalidatingSession, "do_orm_execute")
+    def collect_statement(state: ORMExecuteState) -> None:
+        mapper = state.bind_mapper
+        if (
+            (state.is_insert or state.is_update or state.is_delete)
+            # the caller collected its tags (invalidate_updated, invalidate_deleted)
+            and not state.execution_options.get("invalidated_explicitly")
+            and mapper is not None
+            and issubclass(mapper.class_, (models.Bank, models.User, *_BANK_CHILDREN))
+        ):
+            pending(state.session).add(CLEAR_ALL)
+
+    @event.listens_for(InvalidatingSession, "after_commit")
+    def apply(session: Session) -> None:
+        tags = session.info.pop("cache_invalidations", set())
+        if CLEAR_ALL in tags:
+            cache.clear()
+        else:
+            cache.invalidate(*tags)
+
+    @event.listens_for(InvalidatingSession, "after_rollback")
+    def discard(session: Session) -> None:
+        session.info.pop("cache_invalidations", None)
+
+    return InvalidatingSession
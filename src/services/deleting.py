@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Any
+
+from advanced_alchemy.exceptions import NotFoundError
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from src.services import exceptions
+from src.services.cache import invalidate_deleted
+
+DEFAULT_DELETE_BATCH_SIZE = 1000
+MAX_DELETE_BATCH_SIZE = 10000
+
+
+@dataclass(slots=True)
+class BulkDeleteResult:
+    deleted: int = 0
+    batches: int = 0
+
+
+class ReturningDeleteMixin:
+    """Deletes with ``DELETE ... RETURNING``: one statement removes the row and
+    hands it back, and the ``ondelete`` rules of the foreign keys remove or
+    detach the dependent rows inside the database. Deleting through the ORM
+    loads the whole graph first and then deletes it row by row."""
+
+    async def delete_by_id(self, pk: Any) -> Any:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        return await self.delete_returning(model.id == pk)
+
+    async def delete_returning(self, *filters: Any) -> Any:
+        """Deletes the one row matching ``filters`` and returns it."""
+        items = await self._delete(*filters)
+        if not items:
+            await self.repository.session.rollback()  # type: ignore[attr-defined]
+            raise NotFoundError("No item found when one was expected")
+        await self.repository.session.commit()  # type: ignore[attr-defined]
+        return items[0]
+
+    async def delete_in_batches(
+        self, *filters: Any, batch_size: int = DEFAULT_DELETE_BATCH_SIZE
+    ) -> BulkDeleteResult:
+        """Deletes every row matching ``filters``, ``batch_size`` rows per
+        statement and transaction so that no single one holds its locks, or
+        cascades, for long. Batches committed before a failure stay deleted."""
+        if not filters:
+            raise exceptions.InvalidFilterError("a bulk delete needs a filter")
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        batch = select(model.id).where(*filters).order_by(model.id).limit(batch_size)
+        result = BulkDeleteResult()
+        while True:
+            items = await self._delete(model.id.in_(batch))
+            await self.repository.session.commit()  # type: ignore[attr-defined]
+            if items:
+                result.deleted += len(items)
+                result.batches += 1
+            if len(items) < batch_size:
+                return result
+
+    async def _delete(self, *filters: Any) -> list[Any]:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        session = self.repository.session  # type: ignore[attr-defined]
+        try:
+            items = (
+                await session.scalars(
+                    delete(model)
+                    .where(*filters)
+                    .returning(model)
+                    .execution_options(invalidated_explicitly=True)
+                )
+            ).all()
+        except IntegrityError as e:
+            await session.rollback()
+            raise exceptions.StillReferencedError(
+                f"{model.__tablename__} is still referenced by other rows"
+            ) from e
+        invalidate_deleted(session, items)
+        return list(items)
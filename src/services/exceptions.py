@@ -0,0 +1,32 @@
+class AlreadyExistsError(Exception):
+    pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class BulkValidationError(Exception):
+    def __init__(self, errors) -> None:
+        super().__init__(f"{len(errors)} item(s) failed validation")
+        self.errors = errors
+
+
+class InvalidTransferError(Exception):
+    pass
+
+
+class InsufficientFundsError(Exception):
+    pass
+
+
+class TransferConflictError(Exception):
+    pass
+
+
+class InvalidFilterError(Exception):
+    pass
+
+
+class StillReferencedError(Exception):
+    pass
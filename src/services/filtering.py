@@ -0,0 +1,59 @@
+from enum import Flag
+from typing import Any
+
+from sqlalchemy import ColumnElement
+
+from src.services import exceptions
+
+
+def parse_flags[F: Flag](flag: type[F], names: str) -> F:
+    """``"Active,HaveMoney"`` -> ``flag.Active | flag.HaveMoney``."""
+    value = flag(0)
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        try:
+            value |= flag[name]
+        except KeyError:
+            raise exceptions.InvalidFilterError(
+                f"unknown {flag.__name__} {name!r}, expected one of "
+                f"{', '.join(member.name for member in flag)}"  # type: ignore[misc]
+            ) from None
+    return value
+
+
+def _values(mask: Flag) -> range:
+    """Every value of the flag type of ``mask``, from no member to all of them."""
+    return range((~type(mask)(0)).value + 1)
+
+
+def has_all(column: Any, mask: Flag) -> list[ColumnElement[bool]]:
+    # the few values holding every bit of the mask, listed: equality seeks on the
+    # status index, which (unlike a range) also returns one value's rows in id
+    # order, so a page needs no sort
+    return [column.in_([v for v in _values(mask) if v & mask.value == mask.value])]
+
+
+def has_any(column: Any, mask: Flag) -> list[ColumnElement[bool]]:
+    # ... and those holding any of its bits
+    return [column.in_([v for v in _values(mask) if v & mask.value])]
+
+
+class StatusFilterMixin:
+    """Filters on the bank and the ``status`` flags of the model, as predicates
+    the ``(bank_id, status)`` index serves."""
+
+    def status_filters(
+        self,
+        bank_id: int | None = None,
+        status_all: str | None = None,
+        status_any: str | None = None,
+    ) -> list[ColumnElement[bool]]:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        flag = model.status.type.flag
+        filters = []
+        if bank_id is not None:
+            filters.append(model.bank_id == bank_id)
+        if status_all and (mask := parse_flags(flag, status_all)):
+            filters += has_all(model.status, mask)
+        if status_any and (mask := parse_flags(flag, status_any)):
+            filters += has_any(model.status, mask)
+        return filters
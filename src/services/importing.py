@@ -0,0 +1,99 @@
+import csv
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Literal, TextIO
+
+from src.models import models
+from src.services.bulk import BulkItemError
+
+ImportFormat = Literal["csv", "ndjson"]
+
+DEFAULT_IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+def parse_rows(stream: TextIO, fmt: ImportFormat) -> Iterator[Any]:
+    """Yields one raw record at a time; the file is never read into memory.
+    Malformed NDJSON lines are passed through as strings so they fail schema
+    validation and get reported like any other invalid row."""
+    if fmt == "csv":
+        for record in csv.DictReader(stream):
+            yield {k: v if v != "" else None for k, v in record.items()}
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+
+
+@dataclass(slots=True)
+class ImportReport:
+    rows_skipped: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    elapsed: float = 0.0
+    errors: list[BulkItemError] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        processed = self.rows_imported + self.rows_failed
+        return processed / self.elapsed if self.elapsed else 0.0
+
+
+class ImportMixin:
+    """Chunked import on top of ``BulkCreateMixin``. Every chunk is validated,
+    inserted and committed together with its ``ImportCheckpoint``, so an
+    interrupted import resumes right after the last committed chunk."""
+
+    async def import_rows(
+        self,
+        rows: Iterable[Any],
+        checkpoint: str | None = None,
+        chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+        on_progress: Callable[[ImportReport], None] | None = None,
+    ) -> ImportReport:
+        session = self.repository.session  # type: ignore[attr-defined]
+        state = None
+        if checkpoint is not None:
+            state = await session.get(models.ImportCheckpoint, checkpoint)
+            if state is None:
+                state = models.ImportCheckpoint(
+                    name=checkpoint,
+                    entity=self.repository.model_type.__tablename__,  # type: ignore[attr-defined]
+                    rows_done=0,
+                    rows_failed=0,
+                )
+                session.add(state)
+        report = ImportReport(rows_skipped=state.rows_done if state else 0)
+        rows = iter(rows)
+        # consume already committed rows without validating them
+        for _ in itertools.islice(rows, report.rows_skipped):
+            pass
+        offset = report.rows_skipped
+        started = time.perf_counter()
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            valid, errors = self.validate_many(chunk, offset)  # type: ignore[attr-defined]
+            ids, failed = await self.insert_many(valid, chunk_size)  # type: ignore[attr-defined]
+            errors = sorted(errors + failed, key=lambda error: error.index)
+            offset += len(chunk)
+            report.rows_imported += len(ids)
+            report.rows_failed += len(errors)
+            room = MAX_REPORTED_ERRORS - len(report.errors)
+            report.errors.extend(errors[:room])
+            if state is not None:
+                state.rows_done = offset
+                state.rows_failed += len(errors)
+            await session.commit()
+            session.expunge_all()
+            if state is not None:
+                session.add(state)
+            report.elapsed = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(report)
+        report.elapsed = time.perf_counter() - started
+        return report
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+from advanced_alchemy.exceptions import NotFoundError
+from sqlalchemy import bindparam, exists, false, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import models
+from src.services import exceptions
+from src.services.bank_totals import lock_banks
+from src.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    CursorPage,
+    decode_cursor,
+    encode_cursor,
+)
+
+DEFAULT_COMPACTION_BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class LedgerBalance:
+    payment_account_id: int
+    balance: int
+    snapshot_balance: int
+    pending_postings: int
+
+
+def pending_total(payment_account_id: Any) -> Any:
+    """Scalar subquery: sum of the uncompacted postings of an account."""
+    posting = models.LedgerPosting
+    return (
+        select(func.coalesce(func.sum(posting.amount), 0))
+        .where(
+            posting.payment_account_id == payment_account_id,
+            posting.compacted == false(),
+        )
+        .scalar_subquery()
+    )
+
+
+async def debit_failure(session: AsyncSession, payment_account_id: int) -> Exception:
+    """Why a conditional debit matched no account: it is missing or short of funds."""
+    found = await session.scalar(
+        select(exists().where(models.PaymentAccount.id == payment_account_id))
+    )
+    if not found:
+        return NotFoundError(f"No payment account found with id={payment_account_id}")
+    return exceptions.InsufficientFundsError(
+        f"Payment account {payment_account_id} has insufficient funds"
+    )
+
+
+async def compact(
+    session: AsyncSession, batch_size: int = DEFAULT_COMPACTION_BATCH_SIZE
+) -> int:
+    """Folds up to ``batch_size`` pending postings into their accounts' balance in
+    one transaction and returns how many were folded. Postings are claimed by the
+    ``UPDATE ... RETURNING`` itself, so concurrent compactors never fold one twice
+    and postings committed meanwhile simply wait for the next run."""
+    posting = models.LedgerPosting
+    account = models.PaymentAccount
+    pending = (
+        select(posting.id)
+        .where(posting.compacted == false())
+        .order_by(posting.id)
+        .limit(batch_size)
+    )
+    claimed = await session.execute(
+        update(posting)
+        .where(posting.id.in_(pending), posting.compacted == false())
+        .values(compacted=True)
+        .returning(posting.payment_account_id, posting.amount)
+        .execution_options(synchronize_session=False)
+    )
+    totals: defaultdict[int, int] = defaultdict(int)
+    folded = 0
+    for payment_account_id, amount in claimed:
+        totals[payment_account_id] += amount
+        folded += 1
+    if totals:
+        await lock_banks(session, totals)
+        await session.execute(
+            update(account.__table__)
+            .where(account.__table__.c.id == bindparam("account_id"))
+            .values(
+                balance=account.__table__.c.balance + bindparam("delta"),
+                version=account.__table__.c.version + 1,
+            ),
+            # banks, then accounts in id order: the same lock order as transfers
+            [
+                {"account_id": pk, "delta": delta}
+                for pk, delta in sorted(totals.items())
+            ],
+        )
+    await session.commit()
+    return folded
+
+
+async def compaction_loop(
+    session_factory: async_sessionmaker[AsyncSession],
+    interval: float,
+    batch_size: int = DEFAULT_COMPACTION_BATCH_SIZE,
+) -> None:
+    """Background task: compacts until the ledger is drained, then sleeps."""
+    while True:
+        try:
+            async with session_factory() as session:
+                while await compact(session, batch_size) == batch_size:
+                    pass
+        except Exception:
+            logger.exception("ledger compaction failed")
+        await asyncio.sleep(interval)
+
+
+class LedgerMixin:
+    """Contention-free balance changes for payment accounts: every credit or debit
+    is an inserted ``LedgerPosting``; the balance is the compacted
+    ``PaymentAccount.balance`` plus the pending postings. Debits are inserted
+    conditionally, so they can't overdraw the balance."""
+
+    async def post(self, payment_account_id: int, amount: int) -> models.LedgerPosting:
+        session = self.repository.session  # type: ignore[attr-defined]
+        account = models.PaymentAccount
+        statement = insert(models.LedgerPosting)
+        if amount < 0:
+            # a debit is only inserted while the balance, pending postings included,
+            # covers it (the transfers' condition); the account row lock serializes
+            # it with transfers and other debits of the account, credits stay free
+            statement = statement.from_select(
+                ["payment_account_id", "amount"],
+                select(account.id, literal(amount)).where(
+                    account.id == payment_account_id,
+                    account.balance + pending_total(account.id) >= -amount,
+                ),
+            )
+        else:
+            statement = statement.values(
+                payment_account_id=payment_account_id, amount=amount
+            )
+        try:
+            if amount < 0:
+                await session.execute(
+                    select(account.id)
+                    .where(account.id == payment_account_id)
+                    .with_for_update()
+                )
+            posting = (
+                await session.scalars(statement.returning(models.LedgerPosting))
+            ).one_or_none()
+            if posting is None:
+                raise await debit_failure(session, payment_account_id)
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            raise NotFoundError(
+                f"No payment account found with id={payment_account_id}"
+            ) from e
+        except BaseException:
+            await session.rollback()
+            raise
+        return posting
+
+    async def ledger_balance(self, payment_account_id: int) -> LedgerBalance:
+        account = models.PaymentAccount
+        posting = models.LedgerPosting
+        pending_count = (
+            select(func.count())
+            .where(
+                posting.payment_account_id == account.id,
+                posting.compacted == false(),
+            )
+            .scalar_subquery()
+        )
+        row = (
+            await self.repository.session.execute(  # type: ignore[attr-defined]
+                select(account.balance, pending_total(account.id), pending_count).where(
+                    account.id == payment_account_id
+                )
+            )
+        ).one_or_none()
+        if row is None:
+            raise NotFoundError(
+                f"No payment account found with id={payment_account_id}"
+            )
+        snapshot, pending, count = row
+        return LedgerBalance(
+            payment_account_id=payment_account_id,
+            balance=snapshot + pending,
+            snapshot_balance=snapshot,
+            pending_postings=count,
+        )
+
+    async def postings(
+        self,
+        payment_account_id: int,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> CursorPage[models.LedgerPosting]:
+        """History of an account, newest first."""
+        posting = models.LedgerPosting
+        statement = (
+            select(posting)
+            .where(posting.payment_account_id == payment_account_id)
+            .order_by(posting.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            statement = statement.where(posting.id < decode_cursor(cursor))
+        result = await self.repository.session.scalars(  # type: ignore[attr-defined]
+            statement
+        )
+        items = list(result)
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].id)
+        return CursorPage(items=items, next_cursor=next_cursor)
+
+    async def compact_ledger(
+        self, batch_size: int = DEFAULT_COMPACTION_BATCH_SIZE
+    ) -> int:
+        return await compact(
+            self.repository.session, batch_size  # type: ignore[attr-defined]
+        )
@@ -0,0 +1,29 @@
+from typing import Any, ClassVar, Iterable, Mapping
+
+from sqlalchemy.orm import QueryableAttribute, raiseload, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+
+def expansion(expand: Iterable[str] | None, names: Iterable[str]) -> list[str]:
+    """The relations ``?expand=`` asks for out of ``names``: all of them when it
+    is absent (``None``), none for a bare ``?expand=``."""
+    if expand is None:
+        return sorted(names)
+    return sorted(set(expand) - {""})
+
+
+class RelationExpansionMixin:
+    """Maps ``?expand=`` names to relationships. Only the requested relations are
+    ``selectinload``-ed, everything else is ``raiseload``-ed so an unrequested
+    relation can never reach the database."""
+
+    relations: ClassVar[Mapping[str, QueryableAttribute[Any]]] = {}
+
+    def expansion(self, expand: Iterable[str] | None) -> list[str]:
+        return expansion(expand, self.relations)
+
+    def loads(self, expand: Iterable[str] | None = ()) -> list[_AbstractLoad]:
+        return [
+            *(selectinload(self.relations[name]) for name in self.expansion(expand)),
+            raiseload("*"),
+        ]
@@ -0,0 +1,57 @@
+import base64
+import binascii
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from advanced_alchemy.filters import LimitOffset, OrderBy
+
+from src.services import exceptions
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+@dataclass(slots=True)
+class CursorPage[TModel]:
+    items: Sequence[TModel] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def encode_cursor(pk: int) -> str:
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise exceptions.InvalidCursorError(f"invalid cursor {cursor!r}") from e
+
+
+class KeysetPaginationMixin:
+    """Cursor pagination on ``id``: each page is an index range scan, so its cost
+    does not depend on how deep the page is (unlike ``OFFSET``)."""
+
+    async def paginate(
+        self,
+        *filters: Any,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        reverse: bool = False,
+        **kwargs: Any,
+    ) -> CursorPage:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        if cursor is not None:
+            last_pk = decode_cursor(cursor)
+            filters += (model.id < last_pk if reverse else model.id > last_pk,)
+        items = await self.list(  # type: ignore[attr-defined]
+            *filters,
+            OrderBy(field_name="id", sort_order="desc" if reverse else "asc"),
+            LimitOffset(limit=limit + 1, offset=0),
+            **kwargs,
+        )
+        if len(items) <= limit:
+            return CursorPage(items=items)
+        items = items[:limit]
+        return CursorPage(items=items, next_cursor=encode_cursor(items[-1].id))
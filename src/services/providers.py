@@ -1,15 +1,20 @@
 from dishka import Provider, provide, Scope
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.services import services
+from src.services.cache import EntityCache
+from src.services.scoring import ScoringJob
+from src.setting import ScoringSettings
 
 
 class ServiceProvider(Provider):
     scope = Scope.REQUEST
 
     @provide
-    def get_bank(self, session: AsyncSession) -> services.BankService:
-        return services.BankService(session=session)
+    def get_bank(
+        self, session: AsyncSession, cache: EntityCache
+    ) -> services.BankService:
+        return services.BankService(session=session, cache=cache)
 
     @provide
     def get_bank_office(self, session: AsyncSession) -> services.BankOfficeService:
@@ -38,3 +43,9 @@ class ServiceProvider(Provider):
         self, session: AsyncSession
     ) -> services.PaymentAccountService:
         return services.PaymentAccountService(session=session)
+
+    @provide(scope=Scope.APP)
+    def get_scoring_job(
+        self, factory: async_sessionmaker[AsyncSession], setting: ScoringSettings
+    ) -> ScoringJob:
+        return ScoringJob(factory, chunk_size=setting.chunk_size)
@@ -0,0 +1,212 @@
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal
+
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import models
+from src.services.cache import bank_tags, invalidate_on_commit
+
+DEFAULT_SCORING_CHUNK_SIZE = 5000
+# obligations at this share of the income score zero affordability
+MAX_DEBT_TO_INCOME = 0.6
+# months of income or obligations covered by the balances for a full reserve
+FULL_RESERVE_MONTHS = 6
+# monthly_income at which the income component saturates
+FULL_INCOME = 10000
+WEIGHTS = (0.5, 0.3, 0.2)
+
+logger = logging.getLogger(__name__)
+
+type JobStatus = Literal["running", "done", "failed", "cancelled"]
+
+
+@dataclass(slots=True)
+class ScoringProgress:
+    status: JobStatus
+    users_total: int
+    users_done: int = 0
+    users_changed: int = 0
+    started_at: float = 0.0
+    elapsed: float = 0.0
+    error: str | None = None
+
+    @property
+    def users_per_second(self) -> float:
+        return self.users_done / self.elapsed if self.elapsed else 0.0
+
+
+def credit_scores(
+    income: np.ndarray, obligations: np.ndarray, balances: np.ndarray
+) -> np.ndarray:
+    """Scores 0-100 from monthly income, monthly payments of running loans and
+    payment account balances; element-wise over users."""
+    income = np.maximum(income, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # infinite for obligations without income
+        debt_to_income = np.where(obligations > 0, obligations / income, 0)
+        reserve = np.maximum(balances, 0) / np.maximum(
+            np.maximum(income, obligations), 1
+        )
+    affordability = np.clip(1 - debt_to_income / MAX_DEBT_TO_INCOME, 0, 1)
+    reserve_score = np.clip(reserve / FULL_RESERVE_MONTHS, 0, 1)
+    income_score = np.clip(np.log1p(income) / np.log1p(FULL_INCOME), 0, 1)
+    score = np.dot(WEIGHTS, np.stack((affordability, reserve_score, income_score)))
+    return np.rint(score * 100).astype(np.int64)
+
+
+def _features(after: int, chunk_size: int, today: date):
+    user = models.User
+    loan = models.CreditAccount
+    account = models.PaymentAccount
+    obligations = (
+        select(func.coalesce(func.sum(loan.mounthly_payment), 0))
+        .where(loan.user_id == user.id, loan.loan_end_date >= today)
+        .scalar_subquery()
+    )
+    # compacted balances; pending ledger postings wait for the next run
+    balances = (
+        select(func.coalesce(func.sum(account.balance), 0))
+        .where(account.user_id == user.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            user.id,
+            user.bank_credit_score,
+            user.monthly_income,
+            obligations,
+            balances,
+        )
+        .where(user.id > after)
+        .order_by(user.id)
+        .limit(chunk_size)
+    )
+
+
+async def _score_chunk(
+    session: AsyncSession, after: int, chunk_size: int, today: date
+) -> tuple[int, int, int]:
+    """Rescores the ``chunk_size`` users after id ``after`` in one short
+    transaction; returns the last id, the users read and the users changed."""
+    rows = (await session.execute(_features(after, chunk_size, today))).all()
+    if not rows:
+        await session.rollback()
+        return after, 0, 0
+    columns = np.array(rows, dtype=np.float64)
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    scores = credit_scores(columns[:, 2], columns[:, 3], columns[:, 4])
+    changed = scores != columns[:, 1]
+    if changed.any():
+        table = models.User.__table__
+        changed_ids = ids[changed].tolist()
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("user_id"))
+            .values(bank_credit_score=bindparam("score"), version=table.c.version + 1),
+            [
+                {"user_id": pk, "score": score}
+                for pk, score in zip(changed_ids, scores[changed].tolist())
+            ],
+        )
+        # cached banks render their users
+        bank_ids = await session.scalars(
+            select(models.BankUser.bank_id)
+            .where(models.BankUser.user_id.in_(changed_ids))
+            .distinct()
+        )
+        invalidate_on_commit(
+            session, (tag for pk in bank_ids for tag in bank_tags(bank_id=pk))
+        )
+    await session.commit()
+    return int(ids[-1]), len(rows), int(changed.sum())
+
+
+async def rescore(
+    session_factory: async_sessionmaker[AsyncSession],
+    progress: ScoringProgress,
+    chunk_size: int = DEFAULT_SCORING_CHUNK_SIZE,
+) -> ScoringProgress:
+    """Recomputes every user's score chunk by chunk in keyset order, updating
+    ``progress`` as it goes. Each chunk is its own transaction, so API writes are
+    never blocked for longer than one chunk's update."""
+    today = date.today()
+    after = 0
+    async with session_factory() as session:
+        while True:
+            after, read, changed = await _score_chunk(session, after, chunk_size, today)
+            progress.users_done += read
+            progress.users_changed += changed
+            progress.elapsed = time.perf_counter() - progress.started_at
+            if read < chunk_size:
+                return progress
+            logger.info(
+                "credit scoring: %d/%d users, %d changed",
+                progress.users_done,
+                progress.users_total,
+                progress.users_changed,
+            )
+            # let request handlers in between chunks
+            await asyncio.sleep(0)
+
+
+class ScoringJob:
+    """The in-process credit scoring run: at most one at a time, started in the
+    background and polled for progress."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        chunk_size: int = DEFAULT_SCORING_CHUNK_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.progress: ScoringProgress | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> ScoringProgress:
+        """Starts a run unless one is in progress; returns the current run."""
+        if self.running:
+            assert self.progress is not None
+            return self.progress
+        self.progress = ScoringProgress(
+            status="running", users_total=0, started_at=time.perf_counter()
+        )
+        self._task = asyncio.create_task(self._run(self.progress))
+        return self.progress
+
+    async def _run(self, progress: ScoringProgress) -> None:
+        try:
+            async with self.session_factory() as session:
+                progress.users_total = (
+                    await session.scalar(select(func.count()).select_from(models.User))
+                    or 0
+                )
+            await rescore(self.session_factory, progress, self.chunk_size)
+        except asyncio.CancelledError:
+            progress.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception("credit scoring failed")
+            progress.status = "failed"
+            progress.error = str(e)
+        else:
+            progress.status = "done"
+        finally:
+            progress.elapsed = time.perf_counter() - progress.started_at
+
+    async def cancel(self) -> None:
+        if self._task is not None and self.running:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
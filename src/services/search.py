@@ -0,0 +1,86 @@
+import re
+from typing import Any
+
+from sqlalchemy import column, func, literal, literal_column, select, table
+
+from src.models import models
+from src.services import exceptions
+from src.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    CursorPage,
+    decode_cursor,
+    encode_cursor,
+)
+
+MAX_SEARCH_TERMS = 5
+
+
+def search_terms(query: str) -> list[str]:
+    """Lowercased words of the query; punctuation and FTS5 syntax are dropped."""
+    terms = re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise exceptions.InvalidFilterError(f"no words to search for in {query!r}")
+    return terms
+
+
+def _postgresql_ranked(model: Any, terms: list[str]):
+    # fuzzy: the words are matched against any part of the name by trigram
+    # word similarity, which the gin_trgm_ops index serves for the <% operator
+    query = " ".join(terms)
+    name = literal_column(models.PERSON_SEARCH_NAME)
+    return (
+        select(model.id)
+        .where(literal(query).op("<%")(name))
+        .order_by(func.word_similarity(query, name).desc(), model.id)
+    )
+
+
+def _sqlite_ranked(model: Any, terms: list[str]):
+    # prefix: every word must start a name word, ranked by bm25
+    name = models.search_table(model.__tablename__)
+    fts = table(name, column("rowid"), column("rank"))
+    match = " ".join(f'"{term}"*' for term in terms)
+    return (
+        select(fts.c.rowid)
+        .where(literal_column(name).match(match))
+        .order_by(fts.c.rank, fts.c.rowid)
+    )
+
+
+class PersonSearchMixin:
+    """Ranked name search over ``PersonModel`` rows through the indexes declared
+    in ``models``: the index yields a page of ids in rank order, then the rows
+    are loaded by primary key like any other list."""
+
+    async def search(
+        self,
+        query: str,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        **kwargs: Any,
+    ) -> CursorPage:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        session = self.repository.session  # type: ignore[attr-defined]
+        terms = search_terms(query)
+        ranked = (
+            _postgresql_ranked(model, terms)
+            if session.bind.dialect.name == "postgresql"
+            else _sqlite_ranked(model, terms)
+        )
+        # ranks are not a keyset: the cursor is the offset into the ranking
+        offset = 0 if cursor is None else decode_cursor(cursor)
+        if offset < 0:
+            raise exceptions.InvalidCursorError(f"invalid cursor {cursor!r}")
+        ids = (await session.scalars(ranked.offset(offset).limit(limit + 1))).all()
+        more = len(ids) > limit
+        ids = ids[:limit]
+        found = {
+            item.id: item
+            for item in await self.list(  # type: ignore[attr-defined]
+                model.id.in_(ids), **kwargs
+            )
+        }
+        return CursorPage(
+            items=[found[pk] for pk in ids if pk in found],
+            next_cursor=encode_cursor(offset + limit) if more else None,
+        )
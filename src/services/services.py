@@ -1,18 +1,60 @@
 from functools import cached_property
-from typing import Any, Iterable
+from typing import Any, Awaitable, Callable, Iterable, Sequence
 
+from advanced_alchemy.exceptions import NotFoundError
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
+from sqlalchemy import ColumnElement, Row, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from src.models import models
 from src.repositories import repositories
 from src.schemas import schemas as request_schemas
-from src.services import exceptions
-
-
-class BankService(SQLAlchemyAsyncRepositoryService[models.Bank]):  # type: ignore
+from src.services.amortization import AmortizationMixin
+from src.services.bank_totals import TOTALS, BankTotalsMixin, lock_banks
+from src.services.bulk import BulkCreateMixin
+from src.services.filtering import StatusFilterMixin
+from src.services.cache import NEGATIVE, CacheStats, EntityCache, bank_tags
+from src.services.deleting import ReturningDeleteMixin
+from src.services.importing import ImportMixin
+from src.services.ledger import LedgerMixin
+from src.services.loading import RelationExpansionMixin
+from src.services.pagination import KeysetPaginationMixin
+from src.services.search import PersonSearchMixin
+from src.services.streaming import StreamingMixin
+from src.services.transfers import TransferMixin
+from src.services.updating import ReturningUpdateMixin
+from src.services.upserting import OnConflict, UpsertMixin
+from src.services.versioning import ETagMixin
+
+
+class BankService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    UpsertMixin,
+    BankTotalsMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.Bank],
+):
     repository_type = repositories.BankRepository
+    etag_columns = TOTALS
+    relations = {
+        "users": models.Bank.users,
+        "employees": models.Bank.employees,
+        "offices": models.Bank.offices,
+        "atms": models.Bank.atms,
+    }
+
+    def __init__(
+        self, session: AsyncSession, cache: EntityCache | None = None, **repo_kwargs
+    ) -> None:
+        super().__init__(session=session, **repo_kwargs)
+        self.cache = cache
 
     @cached_property
     def _all_loads(self) -> tuple[_AbstractLoad, ...]:
@@ -23,89 +65,228 @@ class BankService(SQLAlchemyAsyncRepositoryService[models.Bank]):  # type: ignor
             selectinload(models.Bank.atms),
         )
 
-    async def get_by_id(self, pk) -> models.Bank:
-        return await super().get(pk, load=self._all_loads)
+    def cached(
+        self, field: str, value: Any, expand: Iterable[str] | None = None
+    ) -> models.Bank | None:
+        """The bank cached by ``field``, if any, without touching the database."""
+        if self.cache is None:
+            return None
+        key = ("bank", field, value, tuple(self.expansion(expand)))
+        bank = self.cache.get(key)
+        if bank is NEGATIVE:
+            raise NotFoundError(f"No item found when filtering by {field}={value}")
+        return bank
 
-    async def get_by_name(self, name: str) -> models.Bank:
-        return await self.get_one(
-            models.Bank.name == name,
-            load=self._all_loads,
+    async def _read_through(
+        self,
+        field: str,
+        value: Any,
+        expand: Iterable[str] | None,
+        load: Callable[[], Awaitable[models.Bank]],
+    ) -> models.Bank:
+        if self.cache is None:
+            return await load()
+        bank = self.cached(field, value, expand)
+        if bank is not None:
+            return bank
+        key = ("bank", field, value, tuple(self.expansion(expand)))
+        version = self.cache.version
+        try:
+            bank = await load()
+        except NotFoundError:
+            miss_tags = bank_tags(**{"bank_id" if field == "id" else field: value})
+            self.cache.put(key, NEGATIVE, miss_tags, version)
+            raise
+        self.repository.session.expunge(bank)
+        self.cache.put(key, bank, bank_tags(bank.id, bank.name), version)
+        return bank
+
+    async def get_by_id(self, pk, expand: Iterable[str] | None = None) -> models.Bank:
+        load = self.loads(expand)
+        return await self._read_through(
+            "id", pk, expand, lambda: self.get(pk, load=load)
         )
 
-    async def list(self) -> Iterable[models.Bank]:
-        return await super().list(load=self._all_loads)
+    async def get_by_name(
+        self, name: str, expand: Iterable[str] | None = None
+    ) -> models.Bank:
+        load = self.loads(expand)
+        return await self._read_through(
+            "name",
+            name,
+            expand,
+            lambda: self.get_one(models.Bank.name == name, load=load),
+        )
 
-    async def create(self, schema: request_schemas.BankCreate) -> models.Bank:
-        found = await self.exists(models.Bank.name == schema.name)
-        if found:
-            raise exceptions.AlreadyExistsError(
-                f"bank with {schema.name=} already exists"
-            )
-        return await super().create(schema.model_dump(), auto_commit=True)
+    async def etag_by_name(self, name: str, expand: Iterable[str] | None = None) -> str:
+        return await self.etag(models.Bank.name == name, expand=expand)
+
+    def cache_stats(self) -> CacheStats | None:
+        return self.cache.stats() if self.cache is not None else None
 
-    async def delete_by_id(self, pk) -> models.Bank:
-        return await super().delete(pk, load=self._all_loads, auto_commit=True)
+    async def list(self, *filters, **kwargs) -> Iterable[models.Bank]:
+        kwargs.setdefault("load", self._all_loads)
+        return await super().list(*filters, **kwargs)
+
+    async def create(
+        self, schema: request_schemas.BankCreate, on_conflict: OnConflict = "raise"
+    ) -> models.Bank:
+        return await self.insert_returning(
+            schema.model_dump(), conflict=("name",), on_conflict=on_conflict
+        )
 
     async def delete_by_name(self, name: str) -> models.Bank:
-        bank = await self.get_by_name(name)
-        await self.repository.session.delete(bank)
-        await self.repository.session.commit()
-        return bank
+        return await self.delete_returning(models.Bank.name == name)
 
     async def update_by_id(self, schema: request_schemas.BankUpdateById) -> models.Bank:
-        return await super().update(
-            {"name": schema.new_name},
-            schema.id,
-            auto_commit=True,
+        return await self.update_returning(
+            models.Bank.id == schema.id,
+            values={"name": schema.new_name},
+            load=self._all_loads,
         )
 
     async def update_by_name(
         self, schema: request_schemas.BankUpdateByName
     ) -> models.Bank:
-        bank = await self.get_by_name(schema.name)
-        bank.name = schema.new_name
-        await self.repository.session.commit()
-        return bank
+        return await self.update_returning(
+            models.Bank.name == schema.name,
+            values={"name": schema.new_name},
+            load=self._all_loads,
+            previous={"name": schema.name},
+        )
 
+    @cached_property
+    def _summary_statement(self) -> Select:
+        def per_bank(model, aggregate):
+            return (
+                select(model.bank_id, aggregate.label("value"))
+                .group_by(model.bank_id)
+                .subquery()
+            )
 
-class BankOfficeService(SQLAlchemyAsyncRepositoryService[models.BankOffice]):  # type: ignore
+        atms = per_bank(models.BankAtm, func.count())
+        offices = per_bank(models.BankOffice, func.count())
+        employees = per_bank(models.Employee, func.count())
+        # clients and balances are kept on the bank row by the totals triggers
+        statement = select(
+            models.Bank.id,
+            models.Bank.name,
+            models.Bank.client_count.label("clients"),
+            models.Bank.total_sum.label("payment_balance"),
+            models.Bank.loan_total,
+        )
+        for name, aggregate in (
+            ("atms", atms),
+            ("offices", offices),
+            ("employees", employees),
+        ):
+            statement = statement.outerjoin(
+                aggregate, aggregate.c.bank_id == models.Bank.id
+            ).add_columns(func.coalesce(aggregate.c.value, 0).label(name))
+        return statement.order_by(models.Bank.id)
+
+    async def summaries(self) -> Sequence[Row]:
+        result = await self.repository.session.execute(self._summary_statement)
+        return result.all()
+
+    async def summary_by_id(self, pk) -> Row:
+        result = await self.repository.session.execute(
+            self._summary_statement.where(models.Bank.id == pk)
+        )
+        summary = result.one_or_none()
+        if summary is None:
+            raise NotFoundError(f"No item found when filtering by id={pk}")
+        return summary
+
+
+class BankOfficeService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    StatusFilterMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.BankOffice],
+):
     repository_type = repositories.BankOfficeRepository
-
-    async def partial_update(self, pk, **attrs) -> models.BankOffice:
-        bank_office = await self.get(pk, load="*")
-        for k, v in attrs.items():
-            if hasattr(bank_office, k):
-                setattr(bank_office, k, v)
-        await self.repository.session.commit()
-        return bank_office
-
-
-class UserService(SQLAlchemyAsyncRepositoryService[models.User]):  # type: ignore
+    relations = {
+        "bank": models.BankOffice.bank,
+        "atms": models.BankOffice.atms,
+    }
+
+
+class UserService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    PersonSearchMixin,
+    BulkCreateMixin,
+    ImportMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.User],
+):
     repository_type = repositories.UserRepository
-
-    async def partial_update(self, pk: Any, **attrs) -> models.User:
-        user = await self.get(pk, load="*")
-        for k, v in attrs.items():
-            if hasattr(user, k):
-                setattr(user, k, v)
-        await self.repository.session.commit()
-        return user
-
-
-class EmployeeService(SQLAlchemyAsyncRepositoryService[models.Employee]):  # type: ignore
+    create_schema = request_schemas.UserCreate
+    relations = {
+        "banks": models.User.banks,
+        "credit_accounts": models.User.credit_accounts,
+        "payment_accounts": models.User.payment_accounts,
+    }
+
+    async def delete_by_id(self, pk: Any) -> models.User:
+        # the user's accounts go with it and run the totals triggers
+        await lock_banks(
+            self.repository.session,
+            select(models.PaymentAccount.id).where(models.PaymentAccount.user_id == pk),
+        )
+        return await super().delete_by_id(pk)
+
+
+class EmployeeService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    PersonSearchMixin,
+    StatusFilterMixin,
+    BulkCreateMixin,
+    ImportMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.Employee],
+):
     repository_type = repositories.EmployeeRepository
-
-    async def partial_update(self, pk: Any, **attrs) -> models.Employee:
-        employee = await self.get(pk, load="*")
-        for k, v in attrs.items():
-            if hasattr(employee, k):
-                setattr(employee, k, v)
-        await self.repository.session.commit()
-        return employee
-
-
-class CreditAccountService(SQLAlchemyAsyncRepositoryService[models.CreditAccount]):  # type: ignore
+    create_schema = request_schemas.EmployeeCreate
+    relations = {
+        "bank": models.Employee.bank,
+        "office": models.Employee.office,
+    }
+
+
+class CreditAccountService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    AmortizationMixin,
+    BulkCreateMixin,
+    ImportMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.CreditAccount],
+):
     repository_type = repositories.CreditAccountRepository
+    create_schema = request_schemas.CreditAccountCreate
+    locks_banks = True
+    relations = {
+        "user": models.CreditAccount.user,
+        "bank": models.CreditAccount.bank,
+        "employee": models.CreditAccount.employee,
+        "payment_account": models.CreditAccount.payment_account,
+    }
 
     @cached_property
     def _all_loads(self) -> tuple[_AbstractLoad, ...]:
@@ -116,37 +297,78 @@ class CreditAccountService(SQLAlchemyAsyncRepositoryService[models.CreditAccount
             selectinload(models.CreditAccount.user),
         )
 
-    async def list(self) -> Iterable[models.CreditAccount]:
-        return await super().list(load=self._all_loads)
-
-    async def partial_update(self, pk: Any, **attrs) -> models.CreditAccount:
-        m = await self.get(pk, load="*")
-        for k, v in attrs.items():
-            if hasattr(m, k):
-                setattr(m, k, v)
-        await self.repository.session.commit()
-        return m
-
-
-class PaymentAccountService(SQLAlchemyAsyncRepositoryService[models.PaymentAccount]):  # type: ignore
+    async def list(self, *filters, **kwargs) -> Iterable[models.CreditAccount]:
+        kwargs.setdefault("load", self._all_loads)
+        return await super().list(*filters, **kwargs)
+
+
+class PaymentAccountService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    BulkCreateMixin,
+    ImportMixin,
+    TransferMixin,
+    LedgerMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.PaymentAccount],
+):
     repository_type = repositories.PaymentAccountRepository
-
-    async def partial_update(self, pk: Any, **attrs) -> models.PaymentAccount:
-        m = await self.get(pk, load="*")
-        for k, v in attrs.items():
-            if hasattr(m, k):
-                setattr(m, k, v)
-        await self.repository.session.commit()
-        return m
-
-
-class BankAtmService(SQLAlchemyAsyncRepositoryService[models.BankAtm]):  # type: ignore
+    create_schema = request_schemas.PaymentAccountCreate
+    locks_banks = True
+    relations = {
+        "user": models.PaymentAccount.user,
+        "bank": models.PaymentAccount.bank,
+    }
+    # the balance served is the snapshot plus the pending ledger postings
+    etag_columns = ("current_balance",)
+    stream_columns = ("current_balance",)
+
+    async def delete_by_id(self, pk: Any) -> models.PaymentAccount:
+        session = self.repository.session
+        # the totals triggers lock the bank after the account, transfers lock
+        # it before: take it first here too
+        await lock_banks(session, [pk])
+        # RETURNING can't carry the correlated pending sum, read it beforehand
+        balance = await session.scalar(
+            select(models.PaymentAccount.current_balance).where(
+                models.PaymentAccount.id == pk
+            )
+        )
+        item = await super().delete_by_id(pk)
+        set_committed_value(item, "current_balance", balance)
+        return item
+
+
+class BankAtmService(  # type: ignore
+    RelationExpansionMixin,
+    ReturningUpdateMixin,
+    ReturningDeleteMixin,
+    StatusFilterMixin,
+    BulkCreateMixin,
+    ImportMixin,
+    KeysetPaginationMixin,
+    StreamingMixin,
+    ETagMixin,
+    SQLAlchemyAsyncRepositoryService[models.BankAtm],
+):
     repository_type = repositories.BankAtmRepository
-
-    async def partial_update(self, pk: Any, **attrs) -> models.BankAtm:
-        m = await self.get(pk, load="*")
-        for k, v in attrs.items():
-            if hasattr(m, k):
-                setattr(m, k, v)
-        await self.repository.session.commit()
-        return m
+    create_schema = request_schemas.BankAtmCreate
+    relations = {
+        "office": models.BankAtm.office,
+        "bank": models.BankAtm.bank,
+    }
+
+    def status_filters(
+        self,
+        bank_id: int | None = None,
+        status_all: str | None = None,
+        status_any: str | None = None,
+        office_id: int | None = None,
+    ) -> list[ColumnElement[bool]]:
+        filters = super().status_filters(bank_id, status_all, status_any)
+        if office_id is not None:
+            filters.append(models.BankAtm.office_id == office_id)
+        return filters
@@ -0,0 +1,32 @@
+from typing import Any, AsyncIterator, ClassVar, Sequence
+
+from sqlalchemy import select
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class StreamingMixin:
+    """Server-side cursor iteration: plain column rows (no ORM identity map) are
+    fetched ``chunk_size`` at a time with ``yield_per``, so memory stays flat
+    whatever the table size."""
+
+    # mapped SQL expressions the rows carry besides the table columns
+    stream_columns: ClassVar[tuple[str, ...]] = ()
+
+    async def stream(
+        self, *filters: Any, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[Sequence[Any]]:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        statement = (
+            select(
+                *model.__table__.columns,
+                *(getattr(model, name).label(name) for name in self.stream_columns),
+            )
+            .where(*filters)
+            .order_by(model.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        session = self.repository.session  # type: ignore[attr-defined]
+        result = await session.stream(statement)
+        async for partition in result.partitions():
+            yield partition
@@ -0,0 +1,127 @@
+import asyncio
+import random
+from dataclasses import dataclass
+
+from advanced_alchemy.exceptions import NotFoundError
+from sqlalchemy import select, update
+from sqlalchemy.exc import DBAPIError
+
+from src.models import models
+from src.services import exceptions
+from src.services.bank_totals import lock_banks
+from src.services.ledger import debit_failure, pending_total
+
+TRANSFER_ATTEMPTS = 5
+RETRY_BACKOFF = 0.005
+# serialization_failure, deadlock_detected
+_RETRYABLE_SQLSTATES = frozenset({"40001", "40P01"})
+_RETRYABLE_SQLITE_ERRORS = frozenset({"SQLITE_BUSY", "SQLITE_LOCKED"})
+
+
+@dataclass(slots=True)
+class TransferResult:
+    source_id: int
+    target_id: int
+    amount: int
+    source_balance: int
+    target_balance: int
+    attempts: int
+
+
+def is_retryable(error: DBAPIError) -> bool:
+    orig = error.orig
+    return (
+        getattr(orig, "sqlstate", None) in _RETRYABLE_SQLSTATES
+        or getattr(orig, "sqlite_errorname", None) in _RETRYABLE_SQLITE_ERRORS
+        or "database is locked" in str(orig)
+    )
+
+
+class TransferMixin:
+    """Moves money between two payment accounts in one transaction. Each side is a
+    single conditional ``UPDATE ... RETURNING`` (the debit only matches while the
+    balance, pending ledger postings included, covers the amount), so there is no
+    read-modify-write to lose; the banks whose totals change, then the accounts,
+    are locked in id order so concurrent transfers lock them in the same order,
+    and serialization failures and deadlocks are retried with jittered backoff."""
+
+    async def _apply(self, account_id: int, delta: int) -> bool:
+        account = models.PaymentAccount
+        statement = (
+            update(account)
+            .where(account.id == account_id)
+            # bulk UPDATEs bypass the mapper's version counter
+            .values(balance=account.balance + delta, version=account.version + 1)
+            .returning(account.id)
+        )
+        if delta < 0:
+            statement = statement.where(
+                account.balance + pending_total(account.id) >= -delta
+            )
+        result = await self.repository.session.execute(  # type: ignore[attr-defined]
+            statement
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def _transfer_once(
+        self, source_id: int, target_id: int, amount: int
+    ) -> tuple[int, int]:
+        session = self.repository.session  # type: ignore[attr-defined]
+        await lock_banks(session, (source_id, target_id))
+        for account_id in sorted((source_id, target_id)):
+            delta = -amount if account_id == source_id else amount
+            if not await self._apply(account_id, delta):
+                if account_id == source_id:
+                    raise await debit_failure(session, account_id)
+                raise NotFoundError(f"No payment account found with id={account_id}")
+        # RETURNING can't carry the correlated pending sum, read both afterwards
+        account = models.PaymentAccount
+        result = await session.execute(
+            select(account.id, account.balance + pending_total(account.id)).where(
+                account.id.in_((source_id, target_id))
+            )
+        )
+        balances = {pk: balance for pk, balance in result}
+        return balances[source_id], balances[target_id]
+
+    async def transfer(
+        self,
+        source_id: int,
+        target_id: int,
+        amount: int,
+        attempts: int = TRANSFER_ATTEMPTS,
+    ) -> TransferResult:
+        if source_id == target_id:
+            raise exceptions.InvalidTransferError("Cannot transfer to the same account")
+        if amount <= 0:
+            raise exceptions.InvalidTransferError("Amount must be positive")
+        session = self.repository.session  # type: ignore[attr-defined]
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                source_balance, target_balance = await self._transfer_once(
+                    source_id, target_id, amount
+                )
+                await session.commit()
+            except DBAPIError as e:
+                await session.rollback()
+                if not is_retryable(e):
+                    raise
+                if attempt >= attempts:
+                    raise exceptions.TransferConflictError(
+                        f"Transfer gave up after {attempts} attempts"
+                    ) from e
+                await asyncio.sleep(random.uniform(0, RETRY_BACKOFF * 2**attempt))
+            except BaseException:
+                await session.rollback()
+                raise
+            else:
+                return TransferResult(
+                    source_id=source_id,
+                    target_id=target_id,
+                    amount=amount,
+                    source_balance=source_balance,
+                    target_balance=target_balance,
+                    attempts=attempt,
+                )
@@ -0,0 +1,61 @@
+from typing import Any, Mapping, Sequence
+
+from advanced_alchemy.exceptions import NotFoundError
+from sqlalchemy import update
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+from src.services.cache import invalidate_updated
+
+# maintained by the database or the ORM, never written from a request
+_READ_ONLY_COLUMNS = frozenset({"id", "version"})
+
+
+class ReturningUpdateMixin:
+    """Updates in one round trip: ``UPDATE ... RETURNING`` writes only the given
+    columns, bumps the row version and hands back the updated row. Relations are
+    loaded only when ``load`` asks for them."""
+
+    async def partial_update(
+        self, pk: Any, load: Sequence[_AbstractLoad] = (), **attrs: Any
+    ) -> Any:
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        return await self.update_returning(model.id == pk, load=load, values=attrs)
+
+    async def update_returning(
+        self,
+        *filters: Any,
+        values: Mapping[str, Any],
+        load: Sequence[_AbstractLoad] = (),
+        previous: Mapping[str, Any] | None = None,
+    ) -> Any:
+        """Updates the one row matching ``filters``; unknown names in ``values``
+        are ignored and ``previous`` holds overwritten values the caller knows
+        (see ``invalidate_updated``)."""
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        session = self.repository.session  # type: ignore[attr-defined]
+        columns = model.__table__.columns.keys()
+        values = {
+            name: value
+            for name, value in values.items()
+            if name in columns and name not in _READ_ONLY_COLUMNS
+        }
+        if not values:
+            return await self.get_one(  # type: ignore[attr-defined]
+                *filters, load=list(load) or None
+            )
+        item = (
+            await session.scalars(
+                update(model)
+                .where(*filters)
+                .values(**values, version=model.version + 1)
+                .returning(model)
+                .options(*load)
+                .execution_options(invalidated_explicitly=True, populate_existing=True)
+            )
+        ).one_or_none()
+        if item is None:
+            await session.rollback()
+            raise NotFoundError("No item found when one was expected")
+        await invalidate_updated(session, item, values, previous)
+        await session.commit()
+        return item
@@ -0,0 +1,78 @@
+from typing import Any, Literal, Mapping, Sequence
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+from src.services import exceptions
+from src.services.cache import invalidate_updated
+
+# what an insert hitting an existing unique key does: fail with
+# AlreadyExistsError, overwrite the existing row with the given columns, or
+# leave it alone and return it
+type OnConflict = Literal["raise", "update", "existing"]
+
+
+class UpsertMixin:
+    """Creates with one ``INSERT ... ON CONFLICT`` on a unique key. An existence
+    check followed by an insert costs two round trips, and two concurrent
+    requests can both pass the check; the loser then fails with a raw
+    ``IntegrityError``."""
+
+    async def insert_returning(
+        self,
+        data: Mapping[str, Any],
+        conflict: Sequence[str],
+        on_conflict: OnConflict = "raise",
+        load: Sequence[_AbstractLoad] = (),
+    ) -> Any:
+        """Inserts ``data`` unless a row with the same ``conflict`` columns
+        exists, in which case ``on_conflict`` decides; returns the row."""
+        model = self.repository.model_type  # type: ignore[attr-defined]
+        session = self.repository.session  # type: ignore[attr-defined]
+        # dataclass defaults and factories (e.g. Bank.rating) apply as on create()
+        item = model(**data)
+        values = {
+            column.key: getattr(item, column.key)
+            for column in model.__table__.columns
+            if not column.primary_key
+            and column.key != "version"
+            and not (column.server_default and getattr(item, column.key) is None)
+        }
+        dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(model).values(**values, version=1)
+        updated: dict[str, Any] = {}
+        if on_conflict == "update":
+            updated = {
+                name: value for name, value in data.items() if name not in conflict
+            }
+            statement = statement.on_conflict_do_update(
+                index_elements=conflict,
+                set_={
+                    **{name: statement.excluded[name] for name in updated},
+                    "version": model.version + 1,
+                },
+            )
+        elif on_conflict == "existing":
+            # a no-op write to the key, so that RETURNING yields the existing row
+            statement = statement.on_conflict_do_update(
+                index_elements=conflict,
+                set_={name: statement.excluded[name] for name in conflict},
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=conflict)
+        row = (
+            await session.scalars(
+                statement.returning(model)
+                .options(*load)
+                .execution_options(invalidated_explicitly=True, populate_existing=True)
+            )
+        ).one_or_none()
+        if row is None:
+            await session.rollback()
+            key = ", ".join(f"{name}={data[name]!r}" for name in conflict)
+            raise exceptions.AlreadyExistsError(
+                f"{model.__tablename__} with {key} already exists"
+            )
+        await invalidate_updated(session, row, updated)
+        await session.commit()
+        return row
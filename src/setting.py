@@ -1,3 +1,5 @@
+from typing import Any, Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -6,14 +8,91 @@ class DbSettings(BaseSettings):
     user: str | None = Field(default=None, alias="DB_USER")
     password: str | None = Field(default=None, alias="DB_PASSWORD")
     db: str | None = Field(default=None, alias="DB_NAME")
-    host: int | None = Field(default=None, alias="DB_HOST")
-    port: int | None = Field(default=None, alias="DB_PORT")
+    host: str = Field(default="localhost", alias="DB_HOST")
+    port: int = Field(default=5432, alias="DB_PORT")
     engine: str | None = Field(default=None, alias="DB_ENGINE")
-    echo: bool | None = Field(True, alias="DB_ECHO")
+    echo: bool = Field(False, alias="DB_ECHO")
+    # warn about or fail requests that repeat a statement shape (N+1 loads)
+    query_debug: Literal["off", "warn", "raise"] = Field(
+        default="off", alias="DB_QUERY_DEBUG"
+    )
+    query_repeat_threshold: int = Field(default=5, alias="DB_QUERY_REPEAT_THRESHOLD")
+
+    pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    pool_warmup: int = Field(default=5, alias="DB_POOL_WARMUP")
+    statement_cache_size: int = Field(default=500, alias="DB_STATEMENT_CACHE_SIZE")
+
+    sqlite_path: str = Field(default="migrations/main.db", alias="DB_SQLITE_PATH")
+    sqlite_journal_mode: str = Field(default="WAL", alias="DB_SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="DB_SQLITE_SYNCHRONOUS")
+    sqlite_cache_size: int = Field(default=-64000, alias="DB_SQLITE_CACHE_SIZE")
+    sqlite_mmap_size: int = Field(default=268435456, alias="DB_SQLITE_MMAP_SIZE")
+
+    @property
+    def is_sqlite(self) -> bool:
+        return not self.engine
 
     @property
     def url(self) -> str:
-        if not self.engine:
-            return "sqlite+aiosqlite:///migrations/main.db"
+        if self.is_sqlite:
+            return f"sqlite+aiosqlite:///{self.sqlite_path}"
         else:
-            return f"postgresql+asyncpg://{self.user}:{self.password}@{5433}:{5432}/{self.db}"
+            return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.db}"
+
+    @property
+    def engine_options(self) -> dict[str, Any]:
+        options: dict[str, Any] = {
+            "echo": self.echo,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_pre_ping": self.pool_pre_ping,
+            "pool_recycle": self.pool_recycle,
+        }
+        if not self.is_sqlite:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": self.statement_cache_size
+            }
+        return options
+
+    @property
+    def sqlite_pragmas(self) -> dict[str, Any]:
+        return {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "cache_size": self.sqlite_cache_size,
+            "mmap_size": self.sqlite_mmap_size,
+            "foreign_keys": "ON",
+        }
+
+
+class CacheSettings(BaseSettings):
+    maxsize: int = Field(default=1024, alias="CACHE_MAXSIZE")
+    ttl: float = Field(default=30.0, alias="CACHE_TTL")
+    negative_ttl: float = Field(default=5.0, alias="CACHE_NEGATIVE_TTL")
+
+
+class IdempotencySettings(BaseSettings):
+    maxsize: int = Field(default=10000, alias="IDEMPOTENCY_MAXSIZE")
+    # how long a client may retry with the same key and get the stored response
+    ttl: float = Field(default=86400.0, alias="IDEMPOTENCY_TTL")
+
+
+class LedgerSettings(BaseSettings):
+    # seconds between compaction runs, 0 disables the background task
+    compaction_interval: float = Field(default=5.0, alias="LEDGER_COMPACTION_INTERVAL")
+    compaction_batch_size: int = Field(
+        default=5000, alias="LEDGER_COMPACTION_BATCH_SIZE"
+    )
+
+
+class ScoringSettings(BaseSettings):
+    chunk_size: int = Field(default=5000, alias="SCORING_CHUNK_SIZE")
+
+
+class ApiSettings(BaseSettings):
+    fast_json: bool = Field(default=False, alias="API_FAST_JSON")
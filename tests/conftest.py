@@ -0,0 +1,99 @@
+"""The app driven in-process through ``httpx.ASGITransport`` against a scratch
+SQLite file per test. Lifespan tasks (pool warm-up, ledger compaction) are not
+started; tests run compaction themselves."""
+
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+import pytest
+from dishka import AsyncContainer
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.seed import SeedSize, seed
+from src.main import create_app
+from src.models.base import Base
+
+pytest_plugins = ["src.pytest_plugin"]
+
+# small enough to seed quickly, large enough for every relation of the detail
+# routes to have rows
+SEED_SIZE = SeedSize(banks=5, users=40)
+
+USER = {
+    "first_name": "first",
+    "second_name": "second",
+    "patronymic_name": None,
+    "date_of_birth": "1990-01-01",
+    "work_place": None,
+}
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def app(tmp_path, monkeypatch) -> AsyncIterator[FastAPI]:
+    monkeypatch.setenv("DB_SQLITE_PATH", str(tmp_path / "app.db"))
+    monkeypatch.setenv("DB_ECHO", "false")
+    app = create_app()
+    container: AsyncContainer = app.state.dishka_container
+    engine = await container.get(AsyncEngine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield app
+    # disposes the engine too
+    await container.close()
+
+
+@pytest.fixture
+def container(app: FastAPI) -> AsyncContainer:
+    """``async with container() as request: await request.get(SomeService)``"""
+    return app.state.dishka_container
+
+
+@pytest.fixture
+async def client(app: FastAPI) -> AsyncIterator[httpx.AsyncClient]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+async def seeded(container: AsyncContainer) -> None:
+    await seed(await container.get(AsyncEngine), SEED_SIZE)
+
+
+@pytest.fixture
+async def banks(client: httpx.AsyncClient) -> list[int]:
+    """Two banks (ids 1 and 2) and a user (id 1) in the empty database."""
+    for name in ("bank1", "bank2"):
+        response = await client.put("/bank/", json={"name": name})
+        assert response.status_code == 201, response.text
+    response = await client.put("/user/", json=USER)
+    assert response.status_code == 201, response.text
+    return [1, 2]
+
+
+@pytest.fixture
+def open_accounts(
+    client: httpx.AsyncClient, banks: list[int]
+) -> Callable[..., Awaitable[list[int]]]:
+    """``await open_accounts(100, 5, bank_id=2)``: one payment account of the
+    user per balance, returns their ids."""
+
+    async def open_accounts(*balances: int, bank_id: int = 1) -> list[int]:
+        response = await client.put(
+            "/bank/payment/account/bulk",
+            json=[
+                {"balance": balance, "user_id": 1, "bank_id": bank_id}
+                for balance in balances
+            ],
+        )
+        assert response.status_code == 201, response.text
+        assert response.json()["errors"] == []
+        return response.json()["ids"]
+
+    return open_accounts
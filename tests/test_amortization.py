@@ -0,0 +1,159 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.services.amortization import annuity_payment, project, schedule
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def loans(client, open_accounts):
+    """Post ``(amount, yearly rate, months, start)`` loans to bank 1."""
+    (account,) = await open_accounts(0)
+    employee = {
+        "first_name": "first",
+        "second_name": "second",
+        "patronymic_name": None,
+        "date_of_birth": "1990-01-01",
+        "position": "clerk",
+        "salary": 1,
+    }
+    response = await client.put("/employee/", json=employee)
+    assert response.status_code == 201, response.text
+
+    async def post(*loans: tuple[int, int, int, date]) -> None:
+        for amount, rate, months, start in loans:
+            loan = {
+                "loan_start_date": start.isoformat(),
+                "loan_end_date": start.isoformat(),
+                "load_duration_mounts": months,
+                "loan_amount": amount,
+                "mounthly_payment": 0,
+                "interest_rate": rate,
+                "user_id": 1,
+                "bank_id": 1,
+                "payment_account_id": account,
+                "employee_id": 1,
+            }
+            response = await client.put("/bank/credit/account/", json=loan)
+            assert response.status_code == 201, response.text
+
+    return post
+
+
+@pytest.mark.parametrize(
+    "principal, rate, months, payment",
+    [(1200, 12, 12, 106.62), (1200, 0, 12, 100.0), (100_000, 6, 360, 599.55)],
+)
+def test_annuity_payment(principal, rate, months, payment):
+    value = annuity_payment(
+        np.array([principal]), np.array([rate]) / 1200, np.array([months])
+    )
+    assert round(float(value[0]), 2) == payment
+
+
+def test_schedule_repays_the_principal():
+    payment, payments, interest, repaid, balance = schedule(1200, 12, 12)
+    assert np.allclose(payments, payment)
+    assert interest[0] == pytest.approx(12.0)
+    assert repaid.sum() == pytest.approx(1200)
+    assert balance[-1] == pytest.approx(0, abs=1e-9)
+    assert np.all(np.diff(interest) < 0)
+
+
+def test_projection_matches_the_sum_of_the_schedules():
+    rnd = np.random.default_rng(0)
+    count, horizon = 200, 48
+    principal = rnd.integers(1_000, 100_000, count)
+    rate = rnd.choice([0, 5, 9, 12], count)
+    months = rnd.integers(1, 60, count)
+    start = rnd.integers(-30, 40, count)
+
+    expected = np.zeros((4, horizon))
+    for p, r, n, s in zip(principal, rate, months, start):
+        _, payments, interest, repaid, balance = schedule(p, r, n)
+        opening = np.concatenate(([p], balance))
+        for month in range(horizon):
+            k = month - s
+            if 0 <= k < n:
+                expected[:3, month] += payments[k], interest[k], repaid[k]
+            # outstanding at the end of the month, counting loans not yet paid
+            # out; loans starting later add their principal when they start
+            if k >= 0:
+                expected[3, month] += opening[min(k + 1, n)]
+    actual = np.array(project(principal, rate, months, start, horizon))
+    assert np.allclose(actual, expected)
+
+
+async def test_schedule_route(client, loans):
+    await loans((1200, 12, 12, date(2024, 1, 15)))
+    response = await client.get("/bank/credit/account/schedule/1")
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["payment"], body["total_interest"]) == (106.62, 79.42)
+    rows = body["rows"]
+    assert len(rows) == 12
+    assert rows[0] == {
+        "number": 1,
+        "month": "2024-02-01",
+        "payment": 106.62,
+        "interest": 12.0,
+        "principal": 94.62,
+        "balance": 1105.38,
+    }
+    assert (rows[-1]["month"], rows[-1]["balance"]) == ("2025-01-01", 0.0)
+
+
+async def test_schedule_of_an_unknown_loan(client, banks):
+    response = await client.get("/bank/credit/account/schedule/9")
+    assert response.status_code == 400
+
+
+async def test_portfolio_route(client, loans):
+    await loans(
+        (1200, 12, 12, date(2024, 1, 1)),
+        (600, 0, 6, date(2024, 3, 1)),
+    )
+    response = await client.get(
+        "/bank/portfolio/1", params={"start": "2024-02-01", "months": 14}
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["bank_id"], body["loans"]) == (1, 2)
+    months = body["months"]
+    assert [m["month"] for m in months[:3]] == [
+        "2024-02-01",
+        "2024-03-01",
+        "2024-04-01",
+    ]
+    # the first instalments are due in February and in April
+    assert months[0] == {
+        "month": "2024-02-01",
+        "payment": 106.62,
+        "interest": 12.0,
+        "principal": 94.62,
+        "outstanding": 1105.38,
+    }
+    assert (months[1]["payment"], months[1]["outstanding"]) == (106.62, 1009.82)
+    # the second loan is outstanding from its first instalment, paid at once
+    assert (months[2]["payment"], months[2]["outstanding"]) == (206.62, 1413.3)
+    assert sum(m["principal"] for m in months) == pytest.approx(1800, abs=0.05)
+    assert months[-1]["outstanding"] == 0.0
+
+
+async def test_portfolio_runs_until_the_last_loan_ends(client, loans):
+    await loans((600, 0, 6, date(2024, 1, 1)))
+    response = await client.get("/bank/portfolio/1", params={"start": "2024-01-01"})
+    months = response.json()["months"]
+    assert [m["payment"] for m in months] == [0.0] + [100.0] * 6
+
+
+async def test_portfolio_of_an_unknown_bank(client, banks):
+    response = await client.get("/bank/portfolio/9")
+    assert response.status_code == 400
+    # a bank without loans still projects empty months
+    response = await client.get("/bank/portfolio/1", params={"months": 2})
+    assert response.status_code == 200
+    assert [m["outstanding"] for m in response.json()["months"]] == [0.0, 0.0]
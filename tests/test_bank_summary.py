@@ -0,0 +1,31 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def put(client, path: str, body: dict) -> None:
+    response = await client.put(path, json=body)
+    assert response.status_code == 201, response.text
+
+
+async def test_summaries_count_the_rows_of_each_bank(client, banks):
+    await put(client, "/bank/office/", {"name": "office", "rental": 10})
+    for name in ("atm1", "atm2"):
+        atm = {"name": name, "amortization": 1, "office_id": 1, "bank_id": 1}
+        await put(client, "/bank/atm/", atm)
+    for balance in (10, 5):
+        account = {"balance": balance, "user_id": 1, "bank_id": 1}
+        await put(client, "/bank/payment/account/", account)
+
+    empty = {"atms": 0, "offices": 0, "employees": 0, "clients": 0, "loan_total": 0}
+    expected = [
+        {"id": 1, "name": "bank1", **empty, "atms": 2, "payment_balance": 15},
+        {"id": 2, "name": "bank2", **empty, "payment_balance": 0},
+    ]
+    assert (await client.get("/bank/summary/")).json() == expected
+    assert (await client.get("/bank/summary/2")).json() == expected[1]
+
+
+async def test_summary_of_an_unknown_bank(client):
+    response = await client.get("/bank/summary/9")
+    assert response.status_code == 400
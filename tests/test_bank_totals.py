@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.models import models
+from src import bank_totals
+from src.services import services
+from src.services.bank_totals import BankTotalsDrift
+
+pytestmark = pytest.mark.anyio
+
+ACCOUNT = "/bank/payment/account"
+
+
+async def payment_balance(client, bank_id: int) -> int:
+    return (await client.get(f"/bank/summary/{bank_id}")).json()["payment_balance"]
+
+
+async def verify(container) -> list[BankTotalsDrift]:
+    async with container() as request:
+        return await (await request.get(services.BankService)).verify_totals()
+
+
+async def test_totals_follow_account_writes(client, container, open_accounts):
+    first, _ = await open_accounts(100, 20)
+    (other,) = await open_accounts(7, bank_id=2)
+    assert [await payment_balance(client, pk) for pk in (1, 2)] == [120, 7]
+
+    response = await client.post(
+        f"{ACCOUNT}/transfer",
+        json={"source_id": first, "target_id": other, "amount": 40},
+    )
+    assert response.status_code == 200
+    assert [await payment_balance(client, pk) for pk in (1, 2)] == [80, 47]
+    assert await verify(container) == []
+
+
+async def test_served_bank_sees_the_new_totals(client, open_accounts):
+    bank = await client.get("/bank/1", params={"pk": 1})
+    assert bank.json()["total_sum"] == 0
+    await open_accounts(25)
+    bank = await client.get(
+        "/bank/1",
+        params={"pk": 1},
+        headers={"If-None-Match": bank.headers["ETag"]},
+    )
+    assert bank.status_code == 200
+    assert bank.json()["total_sum"] == 25
+
+
+async def test_postings_reach_the_totals_on_compaction(
+    client, container, open_accounts
+):
+    (account,) = await open_accounts(10)
+    response = await client.post(
+        f"{ACCOUNT}/postings", json={"payment_account_id": account, "amount": 5}
+    )
+    assert response.status_code == 201
+    assert await payment_balance(client, 1) == 10
+    assert await verify(container) == []
+
+    async with container() as request:
+        await (await request.get(services.PaymentAccountService)).compact_ledger()
+    assert await payment_balance(client, 1) == 15
+    assert await verify(container) == []
+
+
+async def test_seeded_totals_are_consistent(container, seeded):
+    assert await verify(container) == []
+
+
+async def test_drift_is_reported_and_rebuilt(client, container, open_accounts):
+    await open_accounts(30)
+    engine = await container.get(AsyncEngine)
+    async with engine.begin() as connection:
+        await connection.execute(
+            update(models.Bank.__table__)
+            .where(models.Bank.id == 1)
+            .values(total_sum=99)
+        )
+    assert await verify(container) == [BankTotalsDrift(1, "total_sum", 99, 30)]
+
+    async with container() as request:
+        assert await (await request.get(services.BankService)).rebuild_totals() == 1
+    assert await verify(container) == []
+    assert await payment_balance(client, 1) == 30
+
+
+async def test_command_line_check(container, open_accounts):
+    await open_accounts(30)
+    engine = await container.get(AsyncEngine)
+    async with engine.begin() as connection:
+        await connection.execute(
+            update(models.Bank.__table__)
+            .where(models.Bank.id == 1)
+            .values(total_sum=99)
+        )
+    drift = [BankTotalsDrift(1, "total_sum", 99, 30)]
+    assert await bank_totals.run(rebuild=False) == (drift, 0)
+    assert await bank_totals.run(rebuild=True) == (drift, 1)
+    assert await bank_totals.run(rebuild=False) == ([], 0)
@@ -0,0 +1,77 @@
+import pytest
+
+from src.services import services
+
+pytestmark = pytest.mark.anyio
+
+BULK = "/bank/payment/account/bulk"
+
+
+def account(balance) -> dict:
+    return {"balance": balance, "user_id": 1, "bank_id": 1}
+
+
+async def balances(client) -> list[int]:
+    page = (await client.get("/bank/payment/account/")).json()
+    return [item["balance"] for item in page["items"]]
+
+
+async def test_valid_items_are_created_and_invalid_ones_reported(client, banks):
+    items = [account(10), account("ten"), {"balance": 5}, account(7)]
+    response = await client.put(BULK, json=items)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["ids"] == [1, 2]
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    assert body["errors"][0]["errors"][0]["loc"] == ["balance"]
+    assert {e["loc"][0] for e in body["errors"][1]["errors"]} == {"user_id", "bank_id"}
+    assert await balances(client) == [10, 7]
+
+
+async def test_atomic_batch_writes_nothing_on_an_invalid_item(client, banks):
+    response = await client.put(
+        BULK, params={"atomic": True}, json=[account(10), account(None)]
+    )
+    assert response.status_code == 422
+    assert [error["index"] for error in response.json()["detail"]] == [1]
+    assert await balances(client) == []
+
+
+async def test_items_spanning_several_batches(container, banks):
+    async with container() as request:
+        service = await request.get(services.PaymentAccountService)
+        result = await service.bulk_create([account(i) for i in range(5)], batch_size=2)
+    assert result.ids == [1, 2, 3, 4, 5]
+    assert result.errors == []
+
+
+async def test_missing_references_are_item_errors(client, banks):
+    items = [
+        account(10),
+        {"balance": 1, "user_id": 9, "bank_id": 1},
+        {"balance": 2, "user_id": 9, "bank_id": 7},
+        account(7),
+    ]
+    response = await client.put(BULK, json=items)
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["ids"] == [1, 2]
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    assert body["errors"][0]["errors"] == [
+        {
+            "type": "foreign_key",
+            "loc": ["user_id"],
+            "msg": "user 9 does not exist",
+            "input": 9,
+        }
+    ]
+    assert [e["loc"] for e in body["errors"][1]["errors"]] == [
+        ["bank_id"],
+        ["user_id"],
+    ]
+    assert await balances(client) == [10, 7]
+
+    response = await client.put(BULK, params={"atomic": True}, json=items)
+    assert response.status_code == 422
+    assert [error["index"] for error in response.json()["detail"]] == [1, 2]
+    assert await balances(client) == [10, 7]
@@ -0,0 +1,70 @@
+import pytest
+
+from src.services.cache import NEGATIVE, EntityCache, bank_tags
+
+pytestmark = pytest.mark.anyio
+
+
+async def get(client, path: str, **params):
+    return await client.get(path, params={"pk": 1, **params})
+
+
+async def test_repeated_reads_hit_the_cache(client, banks):
+    await get(client, "/bank/1")
+    before = (await client.get("/bank/cache/stats/")).json()
+    assert (await get(client, "/bank/1")).json()["name"] == "bank1"
+    after = (await client.get("/bank/cache/stats/")).json()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+async def test_child_write_evicts_the_bank(client, banks):
+    assert (await get(client, "/bank/1", expand="atms")).json()["atms"] == []
+    await client.put("/bank/office/", json={"name": "office", "rental": 1})
+    atm = {"name": "atm", "amortization": 1, "office_id": 1, "bank_id": 1}
+    assert (await client.put("/bank/atm/", json=atm)).status_code == 201
+    atms = (await get(client, "/bank/1", expand="atms")).json()["atms"]
+    assert [a["name"] for a in atms] == ["atm"]
+
+
+async def test_rename_evicts_every_key_of_the_bank(client, banks):
+    await get(client, "/bank/1")
+    await client.get("/bank/name/bank1")
+    response = await client.patch("/bank/", json={"name": "bank1", "new_name": "new"})
+    assert response.status_code == 200
+    assert (await client.get("/bank/name/bank1")).status_code == 400
+    assert (await client.get("/bank/name/new")).status_code == 200
+    assert (await get(client, "/bank/1")).json()["name"] == "new"
+
+
+async def test_cached_miss_is_evicted_by_create(client):
+    assert (await client.get("/bank/name/late")).status_code == 400
+    assert (await client.put("/bank/", json={"name": "late"})).status_code == 201
+    assert (await client.get("/bank/name/late")).status_code == 200
+
+
+def test_lru_bound_and_ttl(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("src.services.cache.time.monotonic", lambda: now)
+    cache = EntityCache(maxsize=2, ttl=10, negative_ttl=1)
+    cache.put("a", 1, bank_tags(1))
+    cache.put("b", 2, bank_tags(2))
+    cache.get("a")
+    cache.put("c", NEGATIVE, bank_tags(name="c"))
+    # b was the least recently used
+    assert [cache.get(key) for key in "abc"] == [1, None, NEGATIVE]
+    now = 105.0
+    assert (cache.get("a"), cache.get("c")) == (1, None)
+    now = 111.0
+    assert cache.get("a") is None
+
+
+def test_load_racing_a_write_is_not_stored():
+    cache = EntityCache(maxsize=10, ttl=10, negative_ttl=1)
+    version = cache.version
+    cache.invalidate(*bank_tags(1))
+    cache.put("a", 1, bank_tags(1), version)
+    assert cache.get("a") is None
+    cache.put("a", 1, bank_tags(1), cache.version)
+    cache.invalidate(*bank_tags(1))
+    assert cache.get("a") is None
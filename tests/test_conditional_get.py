@@ -0,0 +1,65 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_user(client, etag: str | None = None):
+    headers = {} if etag is None else {"If-None-Match": etag}
+    return await client.get("/user/1", params={"pk": 1}, headers=headers)
+
+
+async def test_matching_etag_is_not_modified(client, banks):
+    first = await get_user(client)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert etag.startswith('"') and etag.endswith('"')
+
+    response = await get_user(client, etag)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.parametrize(
+    "header, status",
+    [
+        ("*", 304),
+        ("W/{etag}", 304),
+        ('"other", {etag}', 304),
+        ('"other"', 200),
+    ],
+)
+async def test_if_none_match_forms(client, banks, header, status):
+    etag = (await get_user(client)).headers["ETag"]
+    response = await get_user(client, header.format(etag=etag))
+    assert response.status_code == status
+
+
+async def test_update_changes_the_etag(client, banks):
+    etag = (await get_user(client)).headers["ETag"]
+    response = await client.patch("/user/", json={"id": 1, "work_place": "bank"})
+    assert response.status_code == 200
+    response = await get_user(client, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["work_place"] == "bank"
+
+
+async def test_expanded_relations_are_part_of_the_etag(client, banks):
+    async def etag(*expand: str) -> str:
+        # a bare ?expand= leaves every relation out
+        params = {"pk": 1, "expand": list(expand) or ""}
+        return (await client.get("/bank/1", params=params)).headers["ETag"]
+
+    bare, with_atms = await etag(), await etag("atms")
+    assert bare != with_atms
+    await client.put("/bank/office/", json={"name": "office", "rental": 1})
+    atm = {"name": "atm", "amortization": 1, "office_id": 1, "bank_id": 1}
+    await client.put("/bank/atm/", json=atm)
+    assert await etag() == bare
+    assert await etag("atms") != with_atms
+
+
+async def test_unknown_entity(client):
+    response = await get_user(client, "*")
+    assert response.status_code == 400
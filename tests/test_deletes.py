@@ -0,0 +1,145 @@
+from datetime import date
+
+import pytest
+
+from src.services import services
+
+pytestmark = pytest.mark.anyio
+
+ACCOUNT = "/bank/payment/account"
+
+
+async def put(client, path: str, body: dict) -> None:
+    response = await client.put(path, json=body)
+    assert response.status_code == 201, response.text
+
+
+@pytest.fixture
+async def atms(client, banks) -> None:
+    """Office 1 of bank 1 with ATMs 1-7, statuses 0-6; ATM 8 in bank 2."""
+    await put(client, "/bank/office/", {"name": "office", "rental": 1})
+    for status in range(7):
+        atm = {"name": f"atm{status}", "amortization": 1, "office_id": 1}
+        await put(client, "/bank/atm/", {**atm, "bank_id": 1, "status": status})
+    atm = {"name": "other", "amortization": 1, "office_id": 1, "bank_id": 2}
+    await put(client, "/bank/atm/", {**atm, "status": 1})
+
+
+async def atm_names(client) -> list[str]:
+    page = (await client.get("/bank/atm/", params={"limit": 100})).json()
+    return [atm["name"] for atm in page["items"]]
+
+
+async def test_bank_delete_is_one_statement(client, atms, max_statements):
+    with max_statements(1, "DELETE /bank/{pk}") as log:
+        response = await client.delete("/bank/1")
+    assert response.status_code == 200, response.text
+    assert (response.json()["id"], response.json()["name"]) == (1, "bank1")
+    (statement,) = log.shapes
+    assert statement.startswith("DELETE FROM bank ") and " RETURNING " in statement
+
+    # the ATMs of the bank went with it, the office is shared
+    assert await atm_names(client) == ["other"]
+    assert (await client.get("/bank/1", params={"pk": 1})).status_code == 400
+    assert (await client.delete("/bank/1")).status_code == 400
+
+
+async def test_delete_by_name(client, banks):
+    response = await client.delete("/bank/name/bank2")
+    assert response.status_code == 200
+    assert response.json()["id"] == 2
+    assert (await client.get("/bank/name/bank2")).status_code == 400
+
+
+async def test_deleted_account_leaves_the_totals(client, open_accounts):
+    first, _ = await open_accounts(100, 20)
+    response = await client.delete(f"{ACCOUNT}/{first}", params={"pk": first})
+    assert response.status_code == 200, response.text
+    assert response.json()["balance"] == 100
+    summary = (await client.get("/bank/summary/1")).json()
+    assert summary["payment_balance"] == 20
+
+
+async def test_referenced_employee_is_not_deleted(client, open_accounts):
+    (account,) = await open_accounts(0)
+    employee = {
+        "first_name": "first",
+        "second_name": "second",
+        "patronymic_name": None,
+        "date_of_birth": "1990-01-01",
+        "position": "clerk",
+        "salary": 1,
+    }
+    await put(client, "/employee/", employee)
+    start = date(2024, 1, 1).isoformat()
+    loan = {
+        "loan_start_date": start,
+        "loan_end_date": start,
+        "load_duration_mounts": 12,
+        "loan_amount": 1200,
+        "mounthly_payment": 100,
+        "interest_rate": 10,
+        "user_id": 1,
+        "bank_id": 1,
+        "payment_account_id": account,
+        "employee_id": 1,
+    }
+    await put(client, "/bank/credit/account/", loan)
+    response = await client.delete("/employee/1", params={"pk": 1})
+    assert response.status_code == 409
+    assert (await client.get("/employee/1", params={"pk": 1})).status_code == 200
+
+    response = await client.delete("/bank/credit/account/1", params={"pk": 1})
+    assert response.status_code == 200
+    assert (await client.delete("/employee/1", params={"pk": 1})).status_code == 200
+
+
+@pytest.mark.parametrize(
+    "params, deleted, batches, left",
+    [
+        # statuses 1, 3 and 5 of bank 1
+        (
+            {"bank_id": 1, "status_all": "Active"},
+            3,
+            2,
+            ["atm0", "atm2", "atm4", "atm6", "other"],
+        ),
+        (
+            {"status_any": "HaveMoney,WorkToDespenseMoney"},
+            5,
+            3,
+            ["atm0", "atm1", "other"],
+        ),
+        ({"office_id": 1, "batch_size": 100}, 8, 1, []),
+    ],
+)
+async def test_bulk_delete_in_batches(client, atms, params, deleted, batches, left):
+    response = await client.delete("/bank/atm/", params={"batch_size": 2, **params})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"deleted": deleted, "batches": batches}
+    assert await atm_names(client) == left
+
+
+async def test_batch_boundary(container, atms):
+    async with container() as request:
+        service = await request.get(services.BankAtmService)
+        result = await service.delete_in_batches(
+            *service.status_filters(1, None, None), batch_size=7
+        )
+    # a full last batch takes one more statement to find nothing left
+    assert (result.deleted, result.batches) == (7, 1)
+
+
+@pytest.mark.parametrize(
+    "path, params, status",
+    [
+        ("/bank/atm/", {}, 400),
+        ("/bank/office/", {}, 400),
+        ("/bank/atm/", {"bank_id": 1, "batch_size": 0}, 422),
+        ("/bank/office/", {"status_any": "Sleeping"}, 400),
+    ],
+)
+async def test_bulk_delete_needs_a_filter(client, atms, path, params, status):
+    response = await client.delete(path, params=params)
+    assert response.status_code == status
+    assert len(await atm_names(client)) == 8
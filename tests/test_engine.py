@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.main import lifespan
+from src.setting import DbSettings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_sqlite_pragmas(container):
+    engine = await container.get(AsyncEngine)
+    async with engine.connect() as connection:
+        pragmas = {
+            name: (await connection.execute(text(f"PRAGMA {name}"))).scalar()
+            for name in ("journal_mode", "synchronous", "foreign_keys")
+        }
+    # synchronous=NORMAL reads back as 1
+    assert pragmas == {"journal_mode": "wal", "synchronous": 1, "foreign_keys": 1}
+
+
+async def test_lifespan_warms_up_the_pool(app, container):
+    setting = await container.get(DbSettings)
+    engine = await container.get(AsyncEngine)
+    await engine.dispose()
+    assert engine.pool.checkedin() == 0
+    async with lifespan(app):
+        assert engine.pool.checkedin() == setting.pool_warmup
+
+
+def test_postgres_url(monkeypatch):
+    for name, value in {
+        "DB_ENGINE": "postgresql",
+        "DB_USER": "user",
+        "DB_PASSWORD": "secret",
+        "DB_HOST": "db",
+        "DB_PORT": "6432",
+        "DB_NAME": "bank",
+    }.items():
+        monkeypatch.setenv(name, value)
+    setting = DbSettings()
+    assert setting.url == "postgresql+asyncpg://user:secret@db:6432/bank"
+    assert setting.engine_options["connect_args"] == {
+        "prepared_statement_cache_size": 500
+    }
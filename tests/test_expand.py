@@ -0,0 +1,62 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+BANK = {"name", "rating", "total_sum", "client_count", "loan_total"}
+
+
+@pytest.fixture
+async def atm(client) -> None:
+    """Bank 1 with office 1 holding ATM 1."""
+    for path, body in (
+        ("/bank/", {"name": "bank"}),
+        ("/bank/office/", {"name": "office", "rental": 10}),
+        (
+            "/bank/atm/",
+            {"name": "atm", "amortization": 1, "office_id": 1, "bank_id": 1},
+        ),
+    ):
+        response = await client.put(path, json=body)
+        assert response.status_code == 201, response.text
+
+
+@pytest.mark.parametrize(
+    "expand, relations",
+    [
+        # a bare ?expand= leaves every relation out, no ?expand= includes all
+        ([""], set()),
+        (None, {"users", "employees", "offices", "atms"}),
+        (["atms"], {"atms"}),
+        (["atms", "users"], {"atms", "users"}),
+        (
+            ["users", "employees", "offices", "atms"],
+            {"users", "employees", "offices", "atms"},
+        ),
+    ],
+)
+async def test_bank_carries_the_expanded_relations(client, atm, expand, relations):
+    params = {"pk": 1} if expand is None else {"pk": 1, "expand": expand}
+    response = await client.get("/bank/1", params=params)
+    assert response.status_code == 200, response.text
+    bank = response.json()
+    assert bank.keys() == BANK | relations
+    if "atms" in relations:
+        assert [a["name"] for a in bank["atms"]] == ["atm"]
+    if "users" in relations:
+        assert bank["users"] == []
+
+
+async def test_list_items_carry_the_expanded_relations(client, atm):
+    response = await client.get("/bank/", params={"expand": "atms"})
+    (bank,) = response.json()["items"]
+    assert bank.keys() == BANK | {"atms"}
+
+    response = await client.get("/bank/atm/", params={"expand": "bank"})
+    (item,) = response.json()["items"]
+    assert "office" not in item
+    assert item["bank"]["name"] == "bank"
+
+
+async def test_unknown_relation_is_rejected(client, atm):
+    response = await client.get("/bank/1", params={"pk": 1, "expand": "loans"})
+    assert response.status_code == 422
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from src.services import services
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_export_streams_one_object_per_line(client, banks):
+    response = await client.get("/bank/export/")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+    assert json.loads(lines[0])["name"] == "bank1"
+
+
+async def test_export_of_an_empty_table(client):
+    response = await client.get("/user/export/")
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+async def test_rows_come_in_chunks(client, container):
+    for i in range(5):
+        await client.put("/bank/", json={"name": f"bank{i}"})
+    async with container() as request:
+        service = await request.get(services.BankService)
+        sizes = [len(partition) async for partition in service.stream(chunk_size=2)]
+    assert sizes == [2, 2, 1]
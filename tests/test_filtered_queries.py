@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+pytestmark = pytest.mark.anyio
+
+# (bank_id, status_all, status_any) of ATM list requests, all with several
+# filter expressions of the same shape and different values
+ATM_FILTERS = [
+    (1, "Active", None),
+    (2, "HaveMoney", None),
+    (3, "Active,HaveMoney", None),
+    (1, None, "WorkToDespenseMoney,AbleWithdraw"),
+    (2, "AbleWithdraw", "Active,HaveMoney"),
+]
+
+
+async def expected_names(engine, bank_id, status_all, status_any) -> list[str]:
+    """The same filter as plain SQL, outside the repository's statement cache."""
+    masks = {"Active": 1, "HaveMoney": 2, "WorkToDespenseMoney": 4, "AbleWithdraw": 8}
+    all_mask = sum(masks[n] for n in status_all.split(",")) if status_all else 0
+    any_mask = sum(masks[n] for n in status_any.split(",")) if status_any else 0
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text(
+                "SELECT name FROM bank_atm WHERE bank_id = :bank_id"
+                " AND (status & :all_mask) = :all_mask"
+                " AND (:any_mask = 0 OR (status & :any_mask) != 0) ORDER BY id"
+            ),
+            {"bank_id": bank_id, "all_mask": all_mask, "any_mask": any_mask},
+        )
+        return list(result.scalars())
+
+
+async def atm_names(client, bank_id, status_all, status_any) -> list[str]:
+    params = {"bank_id": bank_id, "limit": 2}
+    if status_all:
+        params["status_all"] = status_all
+    if status_any:
+        params["status_any"] = status_any
+    names = []
+    while True:
+        page = (await client.get("/bank/atm/", params=params)).json()
+        names += [atm["name"] for atm in page["items"]]
+        if page["next_cursor"] is None:
+            return names
+        params["cursor"] = page["next_cursor"]
+
+
+async def test_filters_keep_their_own_values(client, container, seeded):
+    engine = await container.get(AsyncEngine)
+    for filters in ATM_FILTERS:
+        assert await atm_names(client, *filters) == await expected_names(
+            engine, *filters
+        )
+
+
+async def test_concurrent_filtered_requests(client, container, seeded):
+    engine = await container.get(AsyncEngine)
+    expected = [await expected_names(engine, *filters) for filters in ATM_FILTERS]
+    for _ in range(3):
+        got = await asyncio.gather(
+            *(atm_names(client, *filters) for filters in ATM_FILTERS)
+        )
+        assert got == expected
+
+
+async def test_combined_flags_round_trip(client, banks):
+    await client.put("/bank/office/", json={"name": "office", "rental": 1})
+    atm = {"name": "atm", "amortization": 1, "office_id": 1, "bank_id": 1}
+    response = await client.put("/bank/atm/", json={**atm, "status": 1 | 8})
+    assert response.status_code == 201, response.text
+    (item,) = (await client.get("/bank/atm/", params={"status_all": "Active"})).json()[
+        "items"
+    ]
+    assert item["status"] == 9
+    params = {"status_all": "Active,HaveMoney"}
+    assert (await client.get("/bank/atm/", params=params)).json()["items"] == []
+
+
+@pytest.mark.parametrize("param", ["status_all", "status_any"])
+async def test_unknown_member(client, param):
+    response = await client.get("/employee/", params={param: "IsRemote,Sleeping"})
+    assert response.status_code == 400
+    assert "Sleeping" in response.json()["detail"]
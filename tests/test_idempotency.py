@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from src.routes import idempotency
+from src.schemas.schemas import BankCreate
+
+pytestmark = pytest.mark.anyio
+
+ACCOUNT = "/bank/payment/account"
+
+
+class Created(BaseModel):
+    name: str
+    call: int
+
+
+def key(value: str) -> dict[str, str]:
+    return {"Idempotency-Key": value}
+
+
+async def accounts(client) -> list[dict]:
+    return (await client.get(f"{ACCOUNT}/")).json()["items"]
+
+
+async def test_replay_returns_the_first_response(client, banks):
+    body = {"balance": 10, "user_id": 1, "bank_id": 1}
+    first = await client.put(f"{ACCOUNT}/", json=body, headers=key("k1"))
+    again = await client.put(f"{ACCOUNT}/", json=body, headers=key("k1"))
+    assert first.status_code == again.status_code == 201
+    assert first.json() == again.json()
+    assert len(await accounts(client)) == 1
+
+    other = await client.put(f"{ACCOUNT}/", json=body, headers=key("k2"))
+    assert other.status_code == 201
+    assert len(await accounts(client)) == 2
+
+
+async def test_replayed_posting_is_applied_once(client, open_accounts):
+    (account,) = await open_accounts(0)
+    body = {"payment_account_id": account, "amount": 5}
+    responses = await asyncio.gather(
+        *(
+            client.post(f"{ACCOUNT}/postings", json=body, headers=key("p1"))
+            for _ in range(3)
+        )
+    )
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.json()["id"] for response in responses}) == 1
+    balance = (await client.get(f"{ACCOUNT}/balance/{account}")).json()
+    assert (balance["balance"], balance["pending_postings"]) == (5, 1)
+
+
+async def test_key_reused_with_another_body(client, banks):
+    await client.put("/bank/", json={"name": "first"}, headers=key("k"))
+    response = await client.put("/bank/", json={"name": "second"}, headers=key("k"))
+    assert response.status_code == 422
+    assert "already used with another request" in response.json()["detail"]
+
+
+async def test_failures_are_not_stored(client, open_accounts):
+    body = {"source_id": 1, "target_id": 2, "amount": 10}
+    transfer = f"{ACCOUNT}/transfer"
+    response = await client.post(transfer, json=body, headers=key("t"))
+    assert response.status_code == 400
+
+    await open_accounts(10, 0)
+    response = await client.post(transfer, json=body, headers=key("t"))
+    assert response.status_code == 200
+    assert response.json()["source_balance"] == 0
+    again = await client.post(transfer, json=body, headers=key("t"))
+    assert again.json() == response.json()
+
+
+async def test_store_expires_and_evicts(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: now)
+    store = idempotency.IdempotencyStore(maxsize=2, ttl=10)
+    calls = []
+
+    async def run(key: str, name: str = "bank") -> dict:
+        async def handler():
+            calls.append(key)
+            return {"name": name, "call": len(calls)}
+
+        return await store.run(key, BankCreate(name=name), Created, handler)
+
+    assert (await run("a"))["call"] == 1
+    assert (await run("a"))["call"] == 1
+    await run("b")
+    await run("c")
+    # "a" was the least recently used of three
+    assert (await run("a"))["call"] == 4
+    now = 11.0
+    assert (await run("a"))["call"] == 5
+    assert calls == ["a", "b", "c", "a", "a"]
@@ -0,0 +1,77 @@
+import pytest
+
+from src.models import models
+from src.services import services
+
+pytestmark = pytest.mark.anyio
+
+IMPORT = "/bank/payment/account/import"
+
+
+async def balances(client) -> list[int]:
+    page = (await client.get("/bank/payment/account/", params={"limit": 500})).json()
+    return [item["balance"] for item in page["items"]]
+
+
+async def test_csv_upload(client, banks):
+    csv = "balance,user_id,bank_id\n10,1,1\nten,1,1\n,1,2\n5,1,2\n"
+    response = await client.put(IMPORT, files={"file": ("accounts.csv", csv)})
+    assert response.status_code == 201, response.text
+    report = response.json()
+    assert (report["rows_imported"], report["rows_failed"]) == (2, 2)
+    assert [error["index"] for error in report["errors"]] == [1, 2]
+    assert await balances(client) == [10, 5]
+
+
+async def test_ndjson_upload_reports_malformed_lines(client, banks):
+    ndjson = '{"balance": 1, "user_id": 1, "bank_id": 1}\n{oops\n\n'
+    response = await client.put(
+        IMPORT, params={"fmt": "ndjson"}, files={"file": ("accounts", ndjson)}
+    )
+    report = response.json()
+    assert (report["rows_imported"], report["rows_failed"]) == (1, 1)
+
+
+async def test_missing_references_are_row_errors(client, banks):
+    csv = "balance,user_id,bank_id\n10,1,1\n3,1,9\n5,1,2\n"
+    response = await client.put(IMPORT, files={"file": ("accounts.csv", csv)})
+    report = response.json()
+    assert (report["rows_imported"], report["rows_failed"]) == (2, 1)
+    (error,) = report["errors"]
+    assert (error["index"], error["errors"][0]["loc"]) == (1, ["bank_id"])
+    assert await balances(client) == [10, 5]
+
+
+def rows(count: int, fail_after: int | None = None):
+    for i in range(count):
+        if i == fail_after:
+            raise ConnectionError("source went away")
+        yield {"balance": i, "user_id": 1, "bank_id": 1}
+
+
+async def test_interrupted_import_resumes_from_its_checkpoint(client, container, banks):
+    async with container() as request:
+        service = await request.get(services.PaymentAccountService)
+        with pytest.raises(ConnectionError):
+            await service.import_rows(rows(10, fail_after=5), "accounts", chunk_size=2)
+
+    # the chunks committed before the failure stay, the partial one does not
+    assert await balances(client) == [0, 1, 2, 3]
+    async with container() as request:
+        service = await request.get(services.PaymentAccountService)
+        report = await service.import_rows(rows(10), "accounts", chunk_size=2)
+        checkpoint = await service.repository.session.get(
+            models.ImportCheckpoint, "accounts"
+        )
+    assert (report.rows_skipped, report.rows_imported) == (4, 6)
+    assert checkpoint.rows_done == 10
+    assert await balances(client) == list(range(10))
+
+
+async def test_import_without_checkpoint_starts_over(client, container, banks):
+    for _ in range(2):
+        async with container() as request:
+            service = await request.get(services.PaymentAccountService)
+            report = await service.import_rows(rows(3))
+        assert (report.rows_skipped, report.rows_imported) == (0, 3)
+    assert await balances(client) == [0, 1, 2] * 2
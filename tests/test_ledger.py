@@ -0,0 +1,96 @@
+import pytest
+
+from src.services import services
+
+pytestmark = pytest.mark.anyio
+
+ACCOUNT = "/bank/payment/account"
+
+
+async def post(client, account: int, amount: int):
+    return await client.post(
+        f"{ACCOUNT}/postings", json={"payment_account_id": account, "amount": amount}
+    )
+
+
+async def compact(container) -> int:
+    async with container() as request:
+        service = await request.get(services.PaymentAccountService)
+        return await service.compact_ledger()
+
+
+async def test_postings_are_served_before_compaction(client, open_accounts):
+    (account,) = await open_accounts(100)
+    assert (await post(client, account, 20)).status_code == 201
+    assert (await post(client, account, -50)).status_code == 201
+
+    balance = (await client.get(f"{ACCOUNT}/balance/{account}")).json()
+    assert balance == {
+        "payment_account_id": account,
+        "balance": 70,
+        "snapshot_balance": 100,
+        "pending_postings": 2,
+    }
+    detail = await client.get(f"{ACCOUNT}/{account}", params={"pk": account})
+    assert (detail.json()["balance"], detail.json()["snapshot_balance"]) == (70, 100)
+    (row,) = (await client.get(f"{ACCOUNT}/", params={"expand": ""})).json()["items"]
+    assert row["balance"] == 70
+
+
+async def test_compaction_folds_postings_into_the_balance(
+    client, container, open_accounts
+):
+    first, second = await open_accounts(100, 0)
+    for account, amount in ((first, -30), (first, 5), (second, 7)):
+        assert (await post(client, account, amount)).status_code == 201
+
+    assert await compact(container) == 3
+    assert await compact(container) == 0
+
+    for account, expected in ((first, 75), (second, 7)):
+        balance = (await client.get(f"{ACCOUNT}/balance/{account}")).json()
+        assert balance["balance"] == balance["snapshot_balance"] == expected
+        assert balance["pending_postings"] == 0
+    history = (await client.get(f"{ACCOUNT}/postings/{first}")).json()["items"]
+    assert [(p["amount"], p["compacted"]) for p in history] == [(5, True), (-30, True)]
+
+
+async def test_compaction_in_batches(client, container, open_accounts):
+    (account,) = await open_accounts(0)
+    for _ in range(5):
+        await post(client, account, 1)
+    async with container() as request:
+        service = await request.get(services.PaymentAccountService)
+        assert await service.compact_ledger(batch_size=2) == 2
+    balance = (await client.get(f"{ACCOUNT}/balance/{account}")).json()
+    assert (balance["balance"], balance["snapshot_balance"]) == (5, 2)
+
+
+async def test_debit_cannot_overdraw(client, open_accounts):
+    (account,) = await open_accounts(50)
+    assert (await post(client, account, -30)).status_code == 201
+    response = await post(client, account, -21)
+    assert response.status_code == 400
+    assert "insufficient funds" in response.json()["detail"]
+    assert (await post(client, account, -20)).status_code == 201
+    balance = (await client.get(f"{ACCOUNT}/balance/{account}")).json()
+    assert (balance["balance"], balance["pending_postings"]) == (0, 2)
+
+
+async def test_posting_to_a_missing_account(client, banks):
+    for amount in (10, -10):
+        response = await post(client, 9, amount)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "No payment account found with id=9"
+
+
+async def test_posting_changes_the_etag(client, open_accounts):
+    (account,) = await open_accounts(10)
+    params = {"pk": account, "expand": ""}
+    etag = (await client.get(f"{ACCOUNT}/{account}", params=params)).headers["ETag"]
+    await post(client, account, 1)
+    response = await client.get(
+        f"{ACCOUNT}/{account}", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["balance"] == 11
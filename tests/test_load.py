@@ -0,0 +1,36 @@
+import pytest
+
+from benchmarks import load
+from benchmarks.seed import SeedSize
+
+pytestmark = pytest.mark.anyio
+
+
+def test_summarize():
+    result = load.summarize([i / 1000 for i in range(1, 101)], errors=2, seconds=2.0)
+    assert (result.requests, result.errors, result.rps) == (100, 2, 50.0)
+    assert (result.p50_ms, result.p95_ms, result.p99_ms) == (50.5, 95.05, 99.01)
+
+
+def test_compare_returns_the_worst_p95_regression(capsys):
+    def report(**p95: float) -> dict:
+        return {
+            "results": {
+                name: {"rps": 1.0, "p50_ms": 1.0, "p95_ms": ms, "p99_ms": 1.0}
+                for name, ms in p95.items()
+            }
+        }
+
+    worst = load.compare(report(a=15.0, b=5.0, c=1.0), report(a=10.0, b=10.0))
+    assert worst == 50.0
+    assert "(no baseline)" in capsys.readouterr().out
+
+
+# ``app`` points DB_SQLITE_PATH at a scratch file, which run() seeds
+async def test_every_endpoint_answers(app):
+    size = SeedSize(banks=5, users=20)
+    report = await load.run(size, list(load.ENDPOINTS), 10, 2, concurrency=3)
+    assert report["meta"]["dialect"] == "sqlite"
+    assert report["results"].keys() == load.ENDPOINTS.keys()
+    for result in report["results"].values():
+        assert (result["requests"], result["errors"]) == (10, 0)
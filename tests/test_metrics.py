@@ -0,0 +1,48 @@
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from src.metrics import Metrics
+
+pytestmark = pytest.mark.anyio
+
+
+def _samples(text: str) -> dict[tuple[str, frozenset], float]:
+    return {
+        (sample.name, frozenset(sample.labels.items())): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+async def test_requests_are_recorded_by_route_template(client, container, banks):
+    metrics = await container.get(Metrics)
+    for pk in (1, 2):
+        response = await client.get(f"/bank/summary/{pk}")
+        assert response.status_code == 200
+    await client.get("/nowhere")
+
+    labels = {"method": "GET", "route": "/bank/summary/{pk}"}
+    sample = metrics.registry.get_sample_value
+    assert (
+        sample("http_request_duration_seconds_count", {**labels, "status": "200"}) == 2
+    )
+    assert sample("http_request_sql_statements_count", labels) == 2
+    # one aggregate query per summary
+    assert sample("http_request_sql_statements_sum", labels) == 2
+    assert sample("http_request_db_duration_seconds_sum", labels) > 0
+    assert sample("http_request_pool_wait_seconds_count", labels) == 2
+    unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+    assert sample("http_request_duration_seconds_count", unmatched) == 1
+
+
+async def test_metrics_endpoint(client, banks):
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+    assert samples[("db_pool_size", frozenset())] == 10
+    assert samples[("db_pool_connections_in_use", frozenset())] == 0
+    created = {("method", "PUT"), ("route", "/bank/"), ("status", "201")}
+    assert samples[("http_request_duration_seconds_count", frozenset(created))] == 2
+    # scrapes are not recorded
+    assert not any(("route", "/metrics") in labels for _, labels in samples)
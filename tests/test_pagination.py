@@ -0,0 +1,64 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_banks(client, *names: str) -> None:
+    for name in names:
+        response = await client.put("/bank/", json={"name": name})
+        assert response.status_code == 201, response.text
+
+
+async def walk(client, **params) -> list[list[str]]:
+    """The bank names of every page, following next_cursor."""
+    pages = []
+    while True:
+        response = await client.get("/bank/", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append([bank["name"] for bank in page["items"]])
+        if page["next_cursor"] is None:
+            return pages
+        params["cursor"] = page["next_cursor"]
+
+
+async def test_pages_follow_the_ids(client):
+    await create_banks(client, *(f"bank{i}" for i in range(1, 6)))
+    assert await walk(client, limit=2) == [
+        ["bank1", "bank2"],
+        ["bank3", "bank4"],
+        ["bank5"],
+    ]
+    assert await walk(client, limit=2, reverse=True) == [
+        ["bank5", "bank4"],
+        ["bank3", "bank2"],
+        ["bank1"],
+    ]
+    assert await walk(client, limit=5) == [
+        ["bank1", "bank2", "bank3", "bank4", "bank5"]
+    ]
+
+
+async def test_cursor_is_stable_across_writes(client):
+    await create_banks(client, *(f"bank{i}" for i in range(1, 6)))
+    first = (await client.get("/bank/", params={"limit": 2})).json()
+    # rows before the cursor going away, or new ones after it, neither skip nor
+    # repeat rows of the next page (an OFFSET would skip bank3 here)
+    assert (await client.delete("/bank/1")).status_code == 200
+    await create_banks(client, "bank6")
+    response = await client.get(
+        "/bank/", params={"limit": 2, "cursor": first["next_cursor"]}
+    )
+    assert [bank["name"] for bank in response.json()["items"]] == ["bank3", "bank4"]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "bm90IGFuIGlk"])
+async def test_invalid_cursor_is_rejected(client, cursor):
+    response = await client.get("/bank/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"invalid cursor {cursor!r}"
+
+
+async def test_limit_is_bounded(client):
+    assert (await client.get("/bank/", params={"limit": 0})).status_code == 422
+    assert (await client.get("/bank/", params={"limit": 501})).status_code == 422
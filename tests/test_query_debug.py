@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+from src.main import create_app
+from src.query_debug import (
+    RepeatedStatementError,
+    RepeatedStatementWarning,
+    StatementLog,
+    normalize,
+    track_statements,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_normalize():
+    assert (
+        normalize(
+            "SELECT *\n  FROM bank WHERE id IN (?, ?, ?) AND name = 'a''b' AND x > $1 LIMIT 20"
+        )
+        == "SELECT * FROM bank WHERE id IN (...) AND name = ? AND x > ? LIMIT ?"
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, raised", [("raise", RepeatedStatementError), ("warn", None)]
+)
+def test_repeats_past_the_threshold(mode, raised):
+    log = StatementLog(threshold=2, mode=mode, label="GET /x")
+    log.record("SELECT ?")
+    log.record("SELECT ?")
+    if raised:
+        with pytest.raises(raised, match="GET /x repeated more than 2 times"):
+            log.record("SELECT ?")
+    else:
+        with pytest.warns(RepeatedStatementWarning):
+            log.record("SELECT ?")
+    assert log.total == 3
+
+
+async def test_nested_logs_see_every_statement(client, banks):
+    with track_statements() as outer:
+        await client.get("/bank/summary/1")
+        with track_statements() as inner:
+            await client.get("/bank/summary/2")
+    assert (outer.total, inner.total) == (2, 1)
+    assert len(outer.shapes) == 1
+
+
+async def test_max_statements_reports_the_shapes(client, banks, max_statements):
+    with pytest.raises(AssertionError, match="executed 2 statements") as error:
+        with max_statements(1, "summaries"):
+            await client.get("/bank/summary/1")
+            await client.get("/bank/summary/2")
+    assert "   2 x SELECT" in str(error.value)
+
+
+async def test_debug_middleware_fails_repeating_requests(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_SQLITE_PATH", str(tmp_path / "debug.db"))
+    monkeypatch.setenv("DB_QUERY_DEBUG", "raise")
+    monkeypatch.setenv("DB_QUERY_REPEAT_THRESHOLD", "0")
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        with pytest.raises(RepeatedStatementError, match="GET /bank/"):
+            await c.get("/bank/")
+    await app.state.dishka_container.close()
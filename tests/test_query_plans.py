@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import make_url
+
+from benchmarks import query_plans
+from benchmarks.query_plans import Statement, _sqlite_scans
+from benchmarks.seed import SeedSize, UnsafeSeedTarget, check_scratch
+
+pytestmark = pytest.mark.anyio
+
+
+def _plan(*details: str) -> list[tuple]:
+    return [(i, 0, 0, detail) for i, detail in enumerate(details)]
+
+
+@pytest.mark.parametrize(
+    "sql, details, scans",
+    [
+        ("SELECT * FROM bank", ["SCAN bank"], ["bank"]),
+        ("SELECT * FROM bank LIMIT 10", ["SCAN bank"], []),
+        # a filter can make the walk read the whole table before LIMIT stops it
+        ("SELECT * FROM bank WHERE rating > ? LIMIT 10", ["SCAN bank"], ["bank"]),
+        (
+            "SELECT * FROM bank WHERE id IN (SELECT bank_id FROM atm LIMIT 5)",
+            ["SCAN bank"],
+            ["bank"],
+        ),
+        (
+            "SELECT * FROM bank ORDER BY name LIMIT 10",
+            ["SCAN bank", "USE TEMP B-TREE FOR ORDER BY"],
+            ["bank"],
+        ),
+        ("SELECT * FROM atm", ["SCAN atm"], []),
+        (
+            "SELECT * FROM bank WHERE id = ?",
+            ["SEARCH bank USING INTEGER PRIMARY KEY (rowid=?)"],
+            [],
+        ),
+    ],
+)
+def test_sqlite_scans(sql, details, scans):
+    assert _sqlite_scans(Statement(sql, ()), _plan(*details), {"bank"}) == scans
+
+
+# ``app`` points DB_SQLITE_PATH at a scratch file, which run() seeds
+async def test_no_route_scans_a_large_table(app, capsys):
+    # every bank table counts as large, but a page of banks still picks only a
+    # small part of the users
+    assert await query_plans.run(SeedSize(users=1000), verbose=False)
+    assert "FAIL" not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["sqlite+aiosqlite:///migrations/main.db", "postgresql+asyncpg://u:p@db/bank"],
+)
+def test_seed_refuses_the_application_database(url):
+    # only the URL is looked at, no driver needed
+    engine = SimpleNamespace(url=make_url(url))
+    with pytest.raises(UnsafeSeedTarget, match="refusing to drop the schema"):
+        check_scratch(engine)
@@ -0,0 +1,93 @@
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import models
+from src.services.scoring import ScoringJob, ScoringProgress, credit_scores, rescore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "income, obligations, balances, score",
+    [
+        # no debt, nothing saved, no income
+        (0, 0, 0, 50),
+        # debt at the affordability limit, a full reserve, full income
+        (10000, 6000, 60000, 50),
+        (10000, 0, 60000, 100),
+        # payments without income
+        (0, 100, 0, 0),
+        (1000, 300, 1000, 45),
+    ],
+)
+def test_credit_scores(income, obligations, balances, score):
+    scores = credit_scores(
+        np.array([income], dtype=float),
+        np.array([obligations], dtype=float),
+        np.array([balances], dtype=float),
+    )
+    assert scores.tolist() == [score]
+
+
+async def scores(container) -> dict[int, float]:
+    async with container() as request:
+        session = await request.get(AsyncSession)
+        rows = await session.execute(
+            select(models.User.id, models.User.bank_credit_score)
+        )
+        return dict(rows.all())
+
+
+async def test_rescore_in_chunks(container, seeded):
+    factory = await container.get(async_sessionmaker[AsyncSession])
+    before = await scores(container)
+    progress = await rescore(factory, ScoringProgress("running", 40), chunk_size=7)
+    after = await scores(container)
+    assert progress.users_done == len(after) == 40
+    assert progress.users_changed == sum(before[pk] != after[pk] for pk in after)
+    assert progress.users_changed > 0
+    assert all(0 <= score <= 100 for score in after.values())
+
+    again = await rescore(factory, ScoringProgress("running", 40), chunk_size=7)
+    assert (again.users_done, again.users_changed) == (40, 0)
+    assert await scores(container) == after
+
+
+async def test_recompute_route(client, container, seeded):
+    response = await client.post("/user/scores/recompute")
+    assert response.status_code == 202
+    assert response.json()["status"] == "running"
+    job = await container.get(ScoringJob)
+    # a second request while running reports the same run
+    assert job.start() is job.progress
+    while job.running:
+        await asyncio.sleep(0.01)
+
+    progress = (await client.get("/user/scores/progress")).json()
+    assert progress["status"] == "done"
+    assert progress["users_total"] == progress["users_done"] == 40
+    assert progress["error"] is None
+
+
+async def test_rescored_user_gets_a_new_etag(client, container, banks):
+    first = await client.get("/user/1", params={"pk": 1})
+    await client.post("/user/scores/recompute")
+    job = await container.get(ScoringJob)
+    while job.running:
+        await asyncio.sleep(0.01)
+    assert job.progress.users_changed == 1
+    response = await client.get(
+        "/user/1", params={"pk": 1}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    score = response.json()["bank_credit_score"]
+    assert score != first.json()["bank_credit_score"]
+
+
+async def test_progress_before_any_run(client):
+    response = await client.get("/user/scores/progress")
+    assert (response.status_code, response.json()) == (200, None)
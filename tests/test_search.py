@@ -0,0 +1,90 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+PEOPLE = [
+    ("Anna", "Smith", None),
+    ("Annabel", "Annaford", "Annovna"),
+    ("Bob", "Jones", None),
+    ("Johanna", "Brown", None),
+    ("Ann", "Smithson", None),
+]
+
+
+@pytest.fixture
+async def people(client) -> None:
+    for first, second, patronymic in PEOPLE:
+        user = {
+            "first_name": first,
+            "second_name": second,
+            "patronymic_name": patronymic,
+            "date_of_birth": "1990-01-01",
+            "work_place": None,
+        }
+        response = await client.put("/user/", json=user)
+        assert response.status_code == 201, response.text
+        employee = {**user, "position": "clerk", "salary": 1}
+        del employee["work_place"]
+        response = await client.put("/employee/", json=employee)
+        assert response.status_code == 201, response.text
+
+
+async def search(client, q: str, path: str = "/user/search", **params) -> list[str]:
+    response = await client.get(path, params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return [
+        f"{item['first_name']} {item['second_name']}"
+        for item in response.json()["items"]
+    ]
+
+
+@pytest.mark.parametrize("path", ["/user/search", "/employee/search"])
+async def test_every_word_must_prefix_a_name(client, people, path):
+    assert await search(client, "smith", path) == ["Anna Smith", "Ann Smithson"]
+    assert await search(client, "ann smith", path) == ["Anna Smith", "Ann Smithson"]
+    assert await search(client, "SMITHS, ann!", path) == ["Ann Smithson"]
+    assert await search(client, "jo", path) == ["Bob Jones", "Johanna Brown"]
+    assert await search(client, "nobody", path) == []
+
+
+async def test_more_matching_names_rank_first(client, people):
+    names = await search(client, "ann")
+    # Johanna only contains the prefix
+    assert sorted(names) == ["Ann Smithson", "Anna Smith", "Annabel Annaford"]
+    assert names[0] == "Annabel Annaford"
+
+
+async def test_pages_follow_the_ranking(client, people):
+    ranked = await search(client, "ann")
+    response = await client.get("/user/search", params={"q": "ann", "limit": 2})
+    page = response.json()
+    assert [i["first_name"] for i in page["items"]] == [
+        name.split()[0] for name in ranked[:2]
+    ]
+    rest = await search(client, "ann", limit=2, cursor=page["next_cursor"])
+    assert rest == ranked[2:]
+
+
+async def test_index_follows_updates(client, people):
+    response = await client.patch("/user/", json={"id": 3, "second_name": "Smith"})
+    assert response.status_code == 200, response.text
+    assert sorted(await search(client, "smith")) == [
+        "Ann Smithson",
+        "Anna Smith",
+        "Bob Smith",
+    ]
+    assert await search(client, "jones") == []
+
+
+async def test_expanded_results(client, people):
+    response = await client.get(
+        "/user/search", params={"q": "bob", "expand": ["banks"]}
+    )
+    (item,) = response.json()["items"]
+    assert item["banks"] == []
+
+
+@pytest.mark.parametrize("params", [{"q": "***"}, {"q": "ann", "cursor": "garbage"}])
+async def test_bad_queries(client, people, params):
+    response = await client.get("/user/search", params=params)
+    assert response.status_code == 400
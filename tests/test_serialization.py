@@ -0,0 +1,77 @@
+import orjson
+import pytest
+
+from src.routes import response_models
+from src.routes.response_models import Page
+from src.routes.serialization import ResponseRenderer
+from src.services import services
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def rows(client, banks) -> None:
+    await client.put("/bank/office/", json={"name": "office", "rental": 1})
+    for status in (1, None):
+        atm = {"name": "atm", "amortization": 1, "office_id": 1, "bank_id": 1}
+        response = await client.put("/bank/atm/", json={**atm, "status": status})
+        assert response.status_code == 201, response.text
+    account = {"balance": 5, "user_id": 1, "bank_id": 2}
+    await client.put("/bank/payment/account/", json=account)
+
+
+@pytest.mark.parametrize(
+    "service_type, detail, expand",
+    [
+        (services.BankService, response_models.BankDetail, ()),
+        (services.BankService, response_models.BankDetail, ("atms", "users")),
+        (services.BankAtmService, response_models.BankAtmDetail, ("bank", "office")),
+        (
+            services.UserService,
+            response_models.UserDetail,
+            ("banks", "payment_accounts", "credit_accounts"),
+        ),
+    ],
+)
+async def test_fast_path_renders_the_same_json(
+    container, rows, service_type, detail, expand
+):
+    shape = response_models.expanded(detail, expand)
+    async with container() as request:
+        service = await request.get(service_type)
+        page = await service.paginate(load=service.loads(expand))
+    assert page.items
+    fast = ResponseRenderer(fast=True).render_page(shape, page)
+    default = ResponseRenderer().render_page(shape, page)
+    assert orjson.loads(fast.body) == default.model_dump(mode="json")
+    assert isinstance(default, Page)
+
+
+class TestSetting:
+    @pytest.fixture(params=[False, True], ids=["pydantic", "orjson"])
+    def fast_json(self, request, monkeypatch) -> bool:
+        monkeypatch.setenv("API_FAST_JSON", str(request.param).lower())
+        return request.param
+
+    @pytest.fixture
+    def app(self, fast_json, app):
+        return app
+
+    async def test_routes_answer_alike(self, client, rows):
+        detail = (await client.get("/bank/1", params={"pk": 1})).json()
+        # the bank without its relations
+        bank = {name: v for name, v in detail.items() if not isinstance(v, list)}
+        response = await client.get("/bank/atm/", params={"expand": "bank"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {
+            "items": [
+                {"name": "atm", "amortization": 1, "status": 1, "bank": bank},
+                {"name": "atm", "amortization": 1, "status": None, "bank": bank},
+            ],
+            "next_cursor": None,
+        }
+        response = await client.get("/bank/1", params={"pk": 1, "expand": "atms"})
+        assert response.status_code == 200
+        # relations come in no particular order
+        assert {atm["status"] for atm in response.json()["atms"]} == {1, None}
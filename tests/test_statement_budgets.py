@@ -0,0 +1,83 @@
+"""Statement budgets of the read routes the load benchmark drives: one statement
+per list page, one ``selectinload`` per expanded relation and the ETag lookup
+on detail routes, whatever the number of rows."""
+
+import pytest
+
+from benchmarks.load import ENDPOINTS
+from src.services.cache import EntityCache
+
+pytestmark = pytest.mark.anyio
+
+BUDGETS = {
+    "GET /bank/": 1,
+    "GET /bank/?expand=all": 5,
+    # the ETag lookup, then the bank, which later requests get from the cache
+    "GET /bank/{id}": 2,
+    "GET /bank/name/{name}": 2,
+    "GET /bank/summary/{pk}": 1,
+    "GET /bank/office/": 1,
+    "GET /bank/atm/": 1,
+    "GET /employee/": 1,
+    "GET /user/": 1,
+    "GET /user/?expand=all": 4,
+    "GET /user/{id}": 2,
+    "GET /bank/credit/account/": 1,
+    "GET /bank/credit/account/?expand=all": 5,
+    "GET /bank/credit/account/{id}": 2,
+    "GET /bank/payment/account/": 1,
+}
+
+
+def test_every_endpoint_has_a_budget():
+    assert BUDGETS.keys() == ENDPOINTS.keys()
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+async def test_statement_budget(client, seeded, max_statements, endpoint):
+    path, params = ENDPOINTS[endpoint](3)
+    with max_statements(BUDGETS[endpoint], endpoint):
+        response = await client.get(path, params=params)
+    assert response.status_code == 200, response.text
+
+
+async def test_cached_bank_runs_no_statement(client, seeded, max_statements):
+    first = await client.get("/bank/3", params={"pk": 3})
+    with max_statements(0, "GET /bank/{id} cached"):
+        response = await client.get("/bank/3", params={"pk": 3})
+        conditional = await client.get(
+            "/bank/3",
+            params={"pk": 3},
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert conditional.status_code == 304
+
+
+async def test_conditional_get_skips_the_body(client, seeded, max_statements):
+    first = await client.get("/user/3", params={"pk": 3})
+    with max_statements(1, "GET /user/{id} If-None-Match"):
+        response = await client.get(
+            "/user/3",
+            params={"pk": 3},
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+    assert response.status_code == 304
+
+
+# every relation expanded: a conditional GET still reads none of them
+@pytest.mark.parametrize(
+    "path, params", [("/bank/3", {"pk": 3}), ("/bank/name/bank3", {})]
+)
+async def test_conditional_bank_get_loads_nothing(
+    client, container, seeded, max_statements, path, params
+):
+    first = await client.get(path, params=params)
+    (await container.get(EntityCache)).clear()
+    with max_statements(1, f"GET {path} If-None-Match"):
+        response = await client.get(
+            path, params=params, headers={"If-None-Match": first.headers["ETag"]}
+        )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from benchmarks import transfers
+from benchmarks.seed import SeedSize
+
+pytestmark = pytest.mark.anyio
+
+TRANSFER = "/bank/payment/account/transfer"
+
+
+async def balances(client, *ids: int) -> list[int]:
+    return [
+        (await client.get(f"/bank/payment/account/balance/{pk}")).json()["balance"]
+        for pk in ids
+    ]
+
+
+async def test_transfer_moves_the_amount(client, open_accounts):
+    source, target = await open_accounts(100, 5)
+    response = await client.post(
+        TRANSFER, json={"source_id": source, "target_id": target, "amount": 30}
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["source_balance"], body["target_balance"]) == (70, 35)
+    assert body["attempts"] == 1
+    assert await balances(client, source, target) == [70, 35]
+
+
+@pytest.mark.parametrize(
+    "amount, source, target, detail",
+    [
+        (101, 1, 2, "insufficient funds"),
+        (10, 1, 1, "same account"),
+        (10, 1, 9, "No payment account found with id=9"),
+        (10, 9, 1, "No payment account found with id=9"),
+    ],
+)
+async def test_rejected_transfer_changes_nothing(
+    client, open_accounts, amount, source, target, detail
+):
+    await open_accounts(100, 5)
+    response = await client.post(
+        TRANSFER, json={"source_id": source, "target_id": target, "amount": amount}
+    )
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+    assert await balances(client, 1, 2) == [100, 5]
+
+
+async def test_concurrent_transfers_never_overdraw(client, open_accounts):
+    source, target = await open_accounts(50, 0)
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                TRANSFER, json={"source_id": source, "target_id": target, "amount": 10}
+            )
+            for _ in range(8)
+        )
+    )
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200] * 5 + [400] * 3
+    assert await balances(client, source, target) == [0, 50]
+
+
+async def test_transfer_counts_pending_postings(client, open_accounts):
+    source, target = await open_accounts(10, 0)
+    response = await client.post(
+        "/bank/payment/account/postings",
+        json={"payment_account_id": source, "amount": -5},
+    )
+    assert response.status_code == 201
+    response = await client.post(
+        TRANSFER, json={"source_id": source, "target_id": target, "amount": 6}
+    )
+    assert response.status_code == 400
+    response = await client.post(
+        TRANSFER, json={"source_id": source, "target_id": target, "amount": 5}
+    )
+    assert response.status_code == 200
+    assert await balances(client, source, target) == [0, 5]
+
+
+async def test_transfer_bumps_both_versions(client, open_accounts):
+    source, target = await open_accounts(100, 5)
+    before = [
+        (await client.get(f"/bank/payment/account/{pk}", params={"pk": pk})).headers[
+            "ETag"
+        ]
+        for pk in (source, target)
+    ]
+    await client.post(
+        TRANSFER, json={"source_id": source, "target_id": target, "amount": 1}
+    )
+    for pk, etag in zip((source, target), before):
+        response = await client.get(
+            f"/bank/payment/account/{pk}",
+            params={"pk": pk},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 200
+
+
+# ``app`` points DB_SQLITE_PATH at a scratch file, which run() seeds
+async def test_benchmark_keeps_the_total(app):
+    size = SeedSize(banks=2, users=10)
+    assert await transfers.run(size, hot=3, transfers=40, concurrency=8, max_amount=50)
+
+
+async def test_balance_cannot_be_patched(client, open_accounts):
+    (account,) = await open_accounts(10)
+    response = await client.patch(
+        "/bank/payment/account/", json={"id": account, "balance": 1000}
+    )
+    assert response.status_code == 405
+    assert await balances(client, account) == [10]
@@ -0,0 +1,74 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_patch_is_one_update(client, banks, max_statements):
+    first = await client.get("/user/1", params={"pk": 1})
+    # the UPDATE, then the user's banks to evict from the cache
+    with max_statements(2, "PATCH /user/") as log:
+        response = await client.patch(
+            "/user/", json={"id": 1, "first_name": "renamed", "work_place": "bank"}
+        )
+    assert response.status_code == 200, response.text
+    (update,) = [shape for shape in log.shapes if shape.startswith("UPDATE user")]
+    assert " RETURNING " in update
+    assert (response.json()["first_name"], response.json()["work_place"]) == (
+        "renamed",
+        "bank",
+    )
+    assert response.json()["second_name"] == "second"
+    # the version moved on
+    response = await client.get(
+        "/user/1", params={"pk": 1}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "renamed"
+
+
+async def test_patch_without_changes_is_a_read(client, banks):
+    first = await client.get("/user/1", params={"pk": 1})
+    response = await client.patch("/user/", json={"id": 1})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "first"
+    response = await client.get(
+        "/user/1", params={"pk": 1}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("body", [{"id": 9, "first_name": "x"}, {"id": 9}])
+async def test_patch_of_an_unknown_row(client, banks, body):
+    response = await client.patch("/user/", json=body)
+    assert response.status_code == 400
+
+
+async def test_patch_renders_the_loaded_relations(client, banks, max_statements):
+    await client.put("/bank/office/", json={"name": "office", "rental": 1})
+    atm = {"name": "atm", "amortization": 1, "office_id": 1, "bank_id": 2}
+    await client.put("/bank/atm/", json=atm)
+    # the UPDATE, then one selectinload per relation
+    with max_statements(3, "PATCH /bank/atm/"):
+        response = await client.patch("/bank/atm/", json={"id": 1, "amortization": 7})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["amortization"], body["bank"]["name"], body["office"]["name"]) == (
+        7,
+        "bank2",
+        "office",
+    )
+
+
+async def test_bank_rename_keeps_the_bank(client, open_accounts):
+    await open_accounts(40)
+    before = (await client.get("/bank/1", params={"pk": 1})).json()
+    response = await client.patch("/bank/", json={"name": "bank1", "new_name": "b1"})
+    assert response.status_code == 200, response.text
+    renamed = response.json()
+    assert renamed["name"] == "b1"
+    assert (renamed["rating"], renamed["total_sum"]) == (before["rating"], 40)
+
+    # the cached bank is gone under both names
+    assert (await client.get("/bank/name/bank1")).status_code == 400
+    assert (await client.get("/bank/name/b1")).json()["rating"] == before["rating"]
+    assert (await client.get("/bank/1", params={"pk": 1})).json()["name"] == "b1"
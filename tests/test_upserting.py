@@ -0,0 +1,91 @@
+import pytest
+
+from src.schemas.schemas import BankCreate
+from src.services import exceptions, services
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_duplicate_bank_name_is_rejected(client):
+    assert (await client.put("/bank/", json={"name": "bank"})).status_code == 201
+    response = await client.put("/bank/", json={"name": "bank"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "bank with name='bank' already exists"
+    banks = (await client.get("/bank/")).json()["items"]
+    assert [bank["name"] for bank in banks] == ["bank"]
+
+
+async def test_create_is_one_statement(client, max_statements):
+    with max_statements(1, "PUT /bank/") as log:
+        response = await client.put("/bank/", json={"name": "bank"})
+    assert response.status_code == 201
+    (insert,) = log.shapes
+    assert "ON CONFLICT (name) DO NOTHING RETURNING" in insert
+
+
+async def test_on_conflict(container):
+    async with container() as request:
+        service = await request.get(services.BankService)
+        created = await service.create(BankCreate(name="bank"))
+        assert created.version == 1
+
+        with pytest.raises(exceptions.AlreadyExistsError):
+            await service.create(BankCreate(name="bank"))
+
+        existing = await service.create(BankCreate(name="bank"), "existing")
+        assert (existing.id, existing.version) == (created.id, 1)
+        assert existing.rating == created.rating
+
+        updated = await service.create(BankCreate(name="bank"), "update")
+        assert (updated.id, updated.version) == (created.id, 2)
+
+        other = await service.create(BankCreate(name="other"), "existing")
+        assert other.id != created.id
+        assert await service.count() == 2
+
+
+async def test_on_conflict_parameter(client):
+    async def put(on_conflict: str):
+        return await client.put(
+            "/bank/", json={"name": "bank"}, params={"on_conflict": on_conflict}
+        )
+
+    async def etag() -> str:
+        bank = await client.get("/bank/name/bank", params={"expand": ""})
+        return bank.headers["ETag"]
+
+    created = await put("raise")
+    first = await etag()
+    existing = await put("existing")
+    assert existing.status_code == 201
+    assert existing.json() == created.json()
+    assert await etag() == first
+
+    updated = await put("update")
+    assert updated.status_code == 201
+    assert updated.json() == created.json()
+    assert await etag() != first
+
+    assert (await put("replace")).status_code == 422
+    banks = (await client.get("/bank/", params={"expand": ""})).json()["items"]
+    assert [bank["name"] for bank in banks] == ["bank"]
+
+
+async def test_idempotency_key_covers_on_conflict(client):
+    await client.put("/bank/", json={"name": "bank"})
+    headers = {"Idempotency-Key": "k"}
+    response = await client.put(
+        "/bank/",
+        json={"name": "bank"},
+        params={"on_conflict": "existing"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    response = await client.put(
+        "/bank/",
+        json={"name": "bank"},
+        params={"on_conflict": "update"},
+        headers=headers,
+    )
+    assert response.status_code == 422
+    assert "already used with another request" in response.json()["detail"]